@@ -0,0 +1,102 @@
+from collision import within
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SCHEDULE_BATCH_MIN = 48  # Below this many items the per-item checks beat gathering numpy arrays
+
+
+class ActiveRegion:
+    """Level-of-detail scheduler for a wrapping world: how far each entity steps this tick.
+
+    Call begin_tick() once per tick with the focus (normally the camera centre) and any anchors,
+    (x, y, radius) zones that must always be simulated exactly, such as gravity wells or a drone's
+    aggro range around the player. step_of() then gives an entity's time step:
+
+    - 1 within active_radius of the focus or inside an anchor (full rate)
+    - reduced_interval once every reduced_interval ticks within reduced_radius, 0 on the others
+    - 0 beyond reduced_radius (frozen until it comes back in range)
+
+    Reduced entities are staggered by a slot handed out the first time each one is scheduled (kept in
+    its lod_slot, None until then), so the ring's cost is spread over the ticks and removing one entity
+    never shifts another's phase, which would drop or double up its reduced steps.
+    reduced_radius=None puts the whole world outside active_radius in the reduced ring;
+    active_radius=None runs everything at full rate.
+    """
+
+    def __init__(self, world_width, world_height, active_radius=800, reduced_radius=1400, reduced_interval=4):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.active_radius = active_radius
+        self.reduced_radius = reduced_radius
+        self.reduced_interval = reduced_interval
+        self.ticks = 0
+        self.next_slot = 0
+        self.focus = (0.0, 0.0)
+        self.anchors = []
+        self.counts = {"full": 0, "reduced": 0, "frozen": 0}
+
+    def begin_tick(self, focus_x, focus_y, anchors=()):
+        self.ticks += 1
+        self.focus = (focus_x, focus_y)
+        self.anchors = list(anchors)
+        self.counts = {"full": 0, "reduced": 0, "frozen": 0}
+
+    def slot_of(self, item):
+        if item.lod_slot is None:
+            item.lod_slot = self.next_slot
+            self.next_slot += 1
+        return item.lod_slot
+
+    def _near(self, x, y, cx, cy, radius):
+        return within(x, y, cx, cy, radius, self.world_width, self.world_height)
+
+    def step_of(self, x, y, slot=0):
+        if self.active_radius is None or self._near(x, y, self.focus[0], self.focus[1], self.active_radius):
+            self.counts["full"] += 1
+            return 1
+        for ax, ay, radius in self.anchors:
+            if self._near(x, y, ax, ay, radius):
+                self.counts["full"] += 1
+                return 1
+        if self.reduced_radius is None or self._near(x, y, self.focus[0], self.focus[1], self.reduced_radius):
+            self.counts["reduced"] += 1
+            return self.reduced_interval if (slot + self.ticks) % self.reduced_interval == 0 else 0
+        self.counts["frozen"] += 1
+        return 0
+
+    def _wrapped_sq(self, xs, ys, cx, cy):
+        dx = (xs - cx) % self.world_width;
+        dy = (ys - cy) % self.world_height
+        dx = np.minimum(dx, self.world_width - dx);
+        dy = np.minimum(dy, self.world_height - dy)
+        return dx * dx + dy * dy
+
+    def _schedule_batch(self, items):
+        count = len(items)
+        xs = np.fromiter((item.x for item in items), float, count)
+        ys = np.fromiter((item.y for item in items), float, count)
+        focus_sq = self._wrapped_sq(xs, ys, self.focus[0], self.focus[1])
+        full = focus_sq < self.active_radius * self.active_radius
+        for ax, ay, radius in self.anchors: full |= self._wrapped_sq(xs, ys, ax, ay) < radius * radius
+        if self.reduced_radius is None: reduced = ~full
+        else: reduced = ~full & (focus_sq < self.reduced_radius * self.reduced_radius)
+        slots = np.fromiter((self.slot_of(item) for item in items), int, count)
+        due_reduced = reduced & ((slots + self.ticks) % self.reduced_interval == 0)
+        self.counts["full"] += int(full.sum())
+        self.counts["reduced"] += int(reduced.sum())
+        self.counts["frozen"] += count - int(full.sum()) - int(reduced.sum())
+        dts = np.where(full, 1, np.where(due_reduced, self.reduced_interval, 0)).tolist()
+        return [(item, dt) for item, dt in zip(items, dts) if dt]
+
+    def schedule(self, items):
+        # (item, dt) for every item that steps this tick, in list order
+        if np is not None and self.active_radius is not None and len(items) >= SCHEDULE_BATCH_MIN:
+            return self._schedule_batch(items)
+        due = []
+        for item in items:
+            dt = self.step_of(item.x, item.y, self.slot_of(item))
+            if dt: due.append((item, dt))
+        return due
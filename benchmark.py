@@ -0,0 +1,399 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout pure JSON
+import pygame
+
+from headless import InputFrame, HeldKeys, IDLE
+from profiling import Profiler, PHASES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DIRECTION_KEYS = {(0, -1): pygame.K_UP, (0, 1): pygame.K_DOWN, (-1, 0): pygame.K_LEFT, (1, 0): pygame.K_RIGHT}
+
+
+def grid_cycle(width, height):
+    # Closed tour over the whole grid (height must be even): along row 0, serpentine through
+    # columns 1.. on the remaining rows, then back up column 0. A snake shorter than the tour
+    # can follow it forever without touching itself.
+    route = [(x, 0) for x in range(width)]
+    for y in range(1, height):
+        xs = range(width - 1, 0, -1) if y % 2 == 1 else range(1, width)
+        route.extend((x, y) for x in xs)
+    route.extend((0, y) for y in range(height - 1, 0, -1))
+    return route
+
+
+class CycleFollower:
+    """Input source that steers a grid snake's head along grid_cycle()."""
+
+    def __init__(self, width, height, held=()):
+        self.route = grid_cycle(width, height)
+        self.index = {pos: i for i, pos in enumerate(self.route)}
+        self.held = HeldKeys(held)
+
+    def body(self, length, head_index=None):
+        # Positions head-first, trailing back along the tour
+        if head_index is None: head_index = length - 1
+        return [self.route[(head_index - i) % len(self.route)] for i in range(length)]
+
+    def heading(self, body):
+        return body[0][0] - body[1][0], body[0][1] - body[1][1]
+
+    def __call__(self, head, direction):
+        nxt = self.route[(self.index[head] + 1) % len(self.route)]
+        wanted = (nxt[0] - head[0], nxt[1] - head[1])
+        return InputFrame((DIRECTION_KEYS[wanted],) if wanted != direction else (), self.held)
+
+
+class Scenario:
+    """A canned, seeded game state plus the inputs that keep it running.
+
+    setup(game) builds the state, maintain(game) runs untimed before every tick to hold the load
+    steady (re-growing, topping up counters), inputs(game, tick) returns that tick's InputFrame and
+    counts(game) reports entity totals for the output.
+    """
+
+    def __init__(self, name, module, description, setup, maintain, inputs, counts):
+        self.name = name
+        self.module = module
+        self.description = description
+        self.setup = setup
+        self.maintain = maintain
+        self.inputs = inputs
+        self.counts = counts
+
+
+# --- No-Clip: 300-segment snake, permanently phasing ---
+NO_CLIP_LENGTH = 300
+
+
+def _no_clip_setup(game):
+    import no_clip_snake as mode
+    game.follower = CycleFollower(mode.GRID_WIDTH, mode.GRID_HEIGHT)
+    game.snake.set_body(game.follower.body(NO_CLIP_LENGTH))
+    game.snake.direction = game.follower.heading(game.snake.body)
+    game.food.spawn_randomly(game.snake.body)
+
+
+def _no_clip_maintain(game):
+    snake = game.snake
+    snake.is_phasing = True
+    snake.phase_energy = snake.phase_energy_max
+    snake.phasing_sickness = snake.phasing_sickness_max * 0.6  # Enough for the glitch overlay
+    snake.grow_pending = 0
+    snake.truncate(NO_CLIP_LENGTH)
+
+
+def _no_clip_inputs(game, tick):
+    return game.follower(game.snake.body[0], game.snake.direction)
+
+
+def _no_clip_counts(game):
+    return {"segments": len(game.snake.body), "particles": len(game.particle_system)}
+
+
+# --- Symbiotic Anarchy: 200 segments with a spread of happiness ---
+SYMBIOTIC_LENGTH = 200
+
+
+def _symbiotic_setup(game):
+    import symbiotic_anarchy_snake as mode
+    game.follower = CycleFollower(mode.GRID_WIDTH, mode.GRID_HEIGHT)
+    positions = game.follower.body(SYMBIOTIC_LENGTH)
+    game.snake.set_body([mode.SEGMENT_TYPES[i % len(mode.SEGMENT_TYPES)] for i in range(len(positions))], positions)
+    game.snake.direction = game.follower.heading(positions)
+    game.food.spawn_randomly(game.snake.positions)
+
+
+def _symbiotic_maintain(game):
+    import symbiotic_anarchy_snake as mode
+    game.snake.truncate(SYMBIOTIC_LENGTH)
+    body = game.snake.body
+    body.happiness[0] = mode.HAPPINESS_MAX * 0.75
+    for i in range(1, len(body)):
+        # Cycles through miserable (smoke), content and ecstatic (sparkles) segments; never detaches
+        body.happiness[i] = 5 + (i * 37) % 95
+    body.refresh()
+
+
+def _symbiotic_inputs(game, tick):
+    return game.follower(game.snake.positions[0], game.snake.direction)
+
+
+def _symbiotic_counts(game):
+    return {"segments": len(game.snake.body), "particles": len(game.particle_system)}
+
+
+# --- Ouroboros Paradox: 20 loops' worth of echoes ---
+OUROBOROS_ECHOES = 20
+OUROBOROS_LENGTH = 12
+
+
+def _ouroboros_setup(game):
+    import ouroboros_paradox_snake as mode
+    echo_types = ["obstacle", "solid_edible", "phased"]
+    game.echoes = []
+    for k in range(OUROBOROS_ECHOES):
+        # One echo per row from row 2 down, clear of the snake's lane (row 0) and the exit
+        length = 12 + k % 8
+        body = [(5 + length - 1 - i, 2 + k) for i in range(length)]
+        game.echoes.append(mode.EchoSnake(body, echo_types[k % 3], k + 1, game.rng))
+    game.loop_count = OUROBOROS_ECHOES + 1
+    game.snake.set_body([(OUROBOROS_LENGTH - 1 - i, 0) for i in range(OUROBOROS_LENGTH)])
+    game.snake.direction = (1, 0)
+    game.spawn_initial_food()
+
+
+def _ouroboros_maintain(game):
+    game.current_loop_ticks = 0  # Hold the loop open so the echo count stays fixed
+    game.snake.grow_pending = 0
+    game.snake.truncate(OUROBOROS_LENGTH)
+
+
+def _ouroboros_counts(game):
+    return {"echoes": len(game.echoes), "echo_segments": sum(len(e.body) for e in game.echoes),
+            "foods": len(game.foods), "particles": len(game.particle_system)}
+
+
+# --- Bio-Mechanical God: 60 bodies, 5 drones, 3 nebulas, 100-segment serpent firing ---
+BIO_BODIES = 60
+BIO_FIELD_BODIES = 400
+BIO_DRONES = 5
+BIO_NEBULAS = 3
+BIO_SEGMENTS = 100
+BIO_MODULES = ["weapon"] * 10 + ["shield"] * 5 + ["thruster"] * 5
+BIO_BODY_TYPES = ["asteroid"] * 8 + ["tech_debris_thruster", "tech_debris_shield", "tech_debris_weapon", "comet"]
+
+
+def _bio_spawn_drone(game, mode, index):
+    head = game.player.head
+    angle = index * 2 * math.pi / BIO_DRONES
+    game.enemy_drones.append(mode.EnemyDrone(head.x + 260 * math.cos(angle), head.y + 260 * math.sin(angle), game.rng))
+
+
+def _bio_setup(game, bodies=BIO_BODIES):
+    import bio_mechanical_snake as mode
+    head = game.player.head
+    game.celestial_bodies = []
+    for i in range(bodies):
+        game.spawn_celestial_body(BIO_BODY_TYPES[i % len(BIO_BODY_TYPES)], min_dist_from_player=150)
+    game.enemy_drones = []
+    for i in range(BIO_DRONES): _bio_spawn_drone(game, mode, i)
+    game.nebula_clouds = [mode.NebulaCloud(head.x, head.y, 300, rng=game.rng)]  # Serpent starts inside one
+    for i in range(BIO_NEBULAS - 1):
+        game.nebula_clouds.append(mode.NebulaCloud(game.rng.uniform(0, mode.Game.WORLD_WIDTH),
+                                                   game.rng.uniform(0, mode.Game.WORLD_HEIGHT),
+                                                   game.rng.uniform(200, 350), rng=game.rng))
+    game.singularities = [mode.Singularity(head.x + dx, head.y, 12, 80, game.rng) for dx in (-1200, 1200)]
+    for i in range(BIO_SEGMENTS - 1):
+        game.player.grow(BIO_MODULES[i] if i < len(BIO_MODULES) else "generic")
+    game.player.toggle_shield()
+
+
+def _bio_maintain(game, bodies=BIO_BODIES):
+    import bio_mechanical_snake as mode
+    while len(game.player.segments) < BIO_SEGMENTS: game.player.grow("generic")
+    while len(game.enemy_drones) < BIO_DRONES: _bio_spawn_drone(game, mode, len(game.enemy_drones))
+    while len(game.celestial_bodies) < bodies:
+        game.spawn_celestial_body(game.rng.choice(BIO_BODY_TYPES), min_dist_from_player=300)
+    del game.celestial_bodies[bodies:]  # Drone wrecks and pickups respawn extra debris
+    if not game.player.shield_active: game.player.toggle_shield()
+
+
+BIO_HELD = HeldKeys({pygame.K_SPACE, pygame.K_UP, pygame.K_a})  # Fire while circling
+
+
+def _bio_inputs(game, tick):
+    return InputFrame((), BIO_HELD)
+
+
+def _bio_counts(game):
+    return {"bodies": len(game.celestial_bodies), "drones": len(game.enemy_drones),
+            "nebulas": len(game.nebula_clouds), "segments": len(game.player.segments),
+            "projectiles": len(game.projectiles), "particles": len(game.particle_system)}
+
+
+SCENARIOS = {s.name: s for s in [
+    Scenario("no_clip_phasing_300", "no_clip_snake", "No-Clip: 300-segment snake phasing continuously",
+             _no_clip_setup, _no_clip_maintain, _no_clip_inputs, _no_clip_counts),
+    Scenario("symbiotic_200", "symbiotic_anarchy_snake", "Symbiotic Anarchy: 200 segments, mixed happiness",
+             _symbiotic_setup, _symbiotic_maintain, _symbiotic_inputs, _symbiotic_counts),
+    Scenario("ouroboros_20_loops", "ouroboros_paradox_snake", "Ouroboros Paradox: 20 loops of echoes on screen",
+             _ouroboros_setup, _ouroboros_maintain, lambda game, tick: IDLE, _ouroboros_counts),
+    Scenario("bio_battle", "bio_mechanical_snake",
+             "Bio-Mechanical: 60 bodies, 5 drones, 3 nebulas, 100-segment serpent firing",
+             _bio_setup, _bio_maintain, _bio_inputs, _bio_counts),
+    Scenario("bio_asteroid_field", "bio_mechanical_snake",
+             f"Bio-Mechanical: {BIO_FIELD_BODIES} bodies, 5 drones, 3 nebulas, 100-segment serpent firing",
+             lambda game: _bio_setup(game, BIO_FIELD_BODIES), lambda game: _bio_maintain(game, BIO_FIELD_BODIES),
+             _bio_inputs, _bio_counts),
+]}
+
+
+MICRO_SHOTS = 40  # Enemy shots tested against every segment per frame
+
+
+def collision_micro(seed, frames):
+    """Per-frame cost of the Bio-Mechanical contact tests done as linear scans, per distance test.
+
+    One frame is head-vs-body pickups, body-vs-nebula drag checks and MICRO_SHOTS shots against the whole
+    serpent, over the bio_asteroid_field layout. sqrt distance() < r, distance_sq() < r * r and within() all
+    take the same unwrapped inputs, so speedup compares like with like; the wrap-aware in_reach() that the
+    mode uses for wrapping entities is timed alongside but does more work per test.
+    """
+    import bio_mechanical_snake as mode
+    game = mode.Game(seed=seed, headless=True)
+    _bio_setup(game, BIO_FIELD_BODIES)
+    head = game.player.head
+    bodies = [(body.x, body.y, body.radius) for body in game.celestial_bodies]
+    segments = [(segment.x, segment.y, segment.radius) for segment in game.player.segments]
+    nebulas = [(nebula.x, nebula.y, nebula.radius) for nebula in game.nebula_clouds]
+    shots = [(game.rng.uniform(0, mode.Game.WORLD_WIDTH), game.rng.uniform(0, mode.Game.WORLD_HEIGHT), 4)
+             for _ in range(MICRO_SHOTS)]
+
+    def sqrt_test(x1, y1, x2, y2, reach):
+        return mode.distance((x1, y1), (x2, y2)) < reach
+
+    def squared_test(x1, y1, x2, y2, reach):
+        return mode.distance_sq(x1, y1, x2, y2) < reach * reach
+
+    def frame(test):
+        hits = 0
+        for x, y, r in bodies:
+            hits += test(head.x, head.y, x, y, head.radius + r)
+            for nx, ny, nr in nebulas: hits += test(nx, ny, x, y, nr)
+        for sx, sy, sr in shots:
+            for x, y, r in segments: hits += test(sx, sy, x, y, sr + r)
+        return hits
+
+    result = {"frames": frames, "bodies": len(bodies), "segments": len(segments), "shots": len(shots)}
+    for label, test in (("distance", sqrt_test), ("distance_sq", squared_test), ("within", mode.within),
+                        ("in_reach", mode.in_reach)):
+        result[f"{label}_hits"] = frame(test)
+        start = time.perf_counter()
+        for _ in range(frames): frame(test)
+        result[f"{label}_ms_per_frame"] = round((time.perf_counter() - start) * 1000.0 / frames, 4)
+    result["speedup"] = round(result["distance_ms_per_frame"] / max(result["distance_sq_ms_per_frame"], 1e-9), 2)
+    return result
+
+
+POOL_CAP = 2000  # Particles held in each pool by pool_micro
+POOL_EMITS = 20  # Single-particle emits per frame once the pool is full
+
+
+def pool_micro(seed, frames):
+    """Per-frame cost of a drop_lowest_alpha particle pool held at its cap, for each backend.
+
+    Every frame does POOL_EMITS one-particle emits into a full pool of immortal particles, then update(),
+    with the default chunked eviction and with evict_fraction=0 (one eviction per emit) for comparison.
+    """
+    import random
+    import particles
+    backends = {"list": particles.ListParticleSystem}
+    if np is not None: backends["array"] = particles.ArrayParticleSystem
+    result = {"frames": frames, "cap": POOL_CAP, "emits_per_frame": POOL_EMITS}
+    for name, backend in backends.items():
+        for label, fraction in (("chunked", particles.OVERFLOW_EVICT_FRACTION), ("per_emit", 0.0)):
+            rng = random.Random(seed)
+            system = backend(max_particles=POOL_CAP, overflow_policy=particles.OVERFLOW_DROP_LOWEST_ALPHA,
+                             rng=random.Random(seed), evict_fraction=fraction)
+            for _ in range(POOL_CAP):
+                system.emit(rng.uniform(0, 800), rng.uniform(0, 600), 1, (255, 200, 80, rng.randrange(1, 256)), 3,
+                            float("inf"), shrink_rate=0, fade_rate=0)
+            start = time.perf_counter()
+            for _ in range(frames):
+                for _ in range(POOL_EMITS):
+                    system.emit(rng.uniform(0, 800), rng.uniform(0, 600), 1, (255, 200, 80, 255), 3, float("inf"),
+                                shrink_rate=0, fade_rate=0)
+                system.update()
+            result[f"{name}_{label}_ms_per_frame"] = round((time.perf_counter() - start) * 1000.0 / frames, 4)
+    return result
+
+
+def run_scenario(scenario, ticks, warmup, seed, headless=False, csv_dir=None):
+    mode = __import__(scenario.module)
+    game = mode.Game(seed=seed, headless=headless)
+    profiler = Profiler()
+    game.profiler = profiler
+    scenario.setup(game)
+    restarts = 0
+    for tick in range(warmup + ticks):
+        if tick == warmup: profiler.reset()
+        if getattr(game, "game_over_flag", False) or getattr(game, "win_flag", False) or \
+                getattr(game, "level_cleared", False):
+            game.reset_game() if hasattr(game, "reset_game") else game.reset_level()
+            scenario.setup(game)
+            restarts += 1
+        scenario.maintain(game)
+        game.step(scenario.inputs(game, tick))
+        game.render()
+        if not headless:
+            profiler.begin()
+            pygame.display.flip()
+            profiler.lap("flip")
+        profiler.end_frame()
+    if csv_dir: profiler.write_csv(os.path.join(csv_dir, f"{scenario.name}.csv"))
+    summary = profiler.summary()
+    return {"description": scenario.description, "module": scenario.module, "ticks": ticks, "warmup": warmup,
+            "restarts": restarts, "counts": scenario.counts(game),
+            "phases_ms": dict(summary["phases"], frame=summary["frame"]), "sections_ms": summary["sections"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seeded per-phase frame timings for the Snake 2 modes (JSON).")
+    parser.add_argument("scenarios", nargs="*", help=f"subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--headless", action="store_true", help="draw offscreen and skip the flip phase")
+    parser.add_argument("--label", default="", help="free-form tag stored in the output, e.g. a commit id")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    parser.add_argument("--csv", metavar="DIR", help="also write per-frame section timings to DIR/<scenario>.csv")
+    parser.add_argument("--micro", action="store_true",
+                        help="also time the collision tests and a full particle pool in isolation")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown: parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    if args.csv: os.makedirs(args.csv, exist_ok=True)
+
+    results = {
+        "label": args.label,
+        "seed": args.seed,
+        "phases": list(PHASES),
+        "environment": {"python": platform.python_version(), "pygame": pygame.version.ver,
+                        "numpy": np.__version__ if np is not None else None,
+                        "platform": platform.platform(), "headless": args.headless},
+        "scenarios": {},
+    }
+    for name in args.scenarios or SCENARIOS:
+        results["scenarios"][name] = run_scenario(SCENARIOS[name], args.ticks, args.warmup, args.seed, args.headless,
+                                                    args.csv)
+    if args.micro:
+        results["collision_micro"] = collision_micro(args.seed, args.ticks)
+        results["pool_micro"] = pool_micro(args.seed, args.ticks)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
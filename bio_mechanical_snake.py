@@ -1,22 +1,42 @@
 import pygame
 import random
 import sys
+import itertools
 import math
+from array import array
+
+from collision import SpatialHash, distance_sq, within, wrap_delta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from active_region import ActiveRegion
+from postfx import RowWave
+from profiling import NULL_PROFILER, handle_profiler_keys
+from sprite_cache import SpriteCache, angle_bucket, bucket_angle, phase_bucket, bucket_phase, blank_sprite, \
+    blit_centered
+from starfield import Starfield
+from timestep import PositionHistory, run_fixed_timestep
 
 # Attempt to import ParticleSystem
 try:
-    from particles import Particle, ParticleSystem  # Assuming particles.py is in the same directory
+    from particles import Particle, ParticleSystem, StaticParticleLayer, \
+        OVERFLOW_DROP_LOWEST_ALPHA  # particles.py in the same directory
 except ImportError:
     print("particles.py not found, defining Particle classes locally for bio_mechanical_snake.py")
 
 
     # --- PASTE Particle and ParticleSystem classes from particles.py here if running standalone ---
+    OVERFLOW_DROP_LOWEST_ALPHA = "drop_lowest_alpha"
+
+
     class Particle:
         def __init__(self, x, y, color, size, lifespan, velocity_x_range=(-1, 1), velocity_y_range=(-1, 1), gravity=0,
-                     shrink_rate=0.05, fade_rate=5):
+                     shrink_rate=0.05, fade_rate=5, rng=random):
             self.x = x;
             self.y = y;
-            self.size = random.uniform(size * 0.7, size * 1.3);
+            self.size = rng.uniform(size * 0.7, size * 1.3);
             self.initial_size = self.size
             self.color = list(color);
             if len(self.color) == 3:
@@ -24,10 +44,10 @@ except ImportError:
             elif len(self.color) == 4:
                 self.color[3] = min(255, max(0, int(self.color[3])))
             self.initial_alpha = self.color[3]
-            self.lifespan = random.uniform(lifespan * 0.8, lifespan * 1.2);
+            self.lifespan = rng.uniform(lifespan * 0.8, lifespan * 1.2);
             self.initial_lifespan = self.lifespan
-            self.vx = random.uniform(velocity_x_range[0], velocity_x_range[1]);
-            self.vy = random.uniform(velocity_y_range[0], velocity_y_range[1])
+            self.vx = rng.uniform(velocity_x_range[0], velocity_x_range[1]);
+            self.vy = rng.uniform(velocity_y_range[0], velocity_y_range[1])
             self.gravity = gravity;
             self.shrink_rate = shrink_rate;
             self.fade_rate = fade_rate
@@ -55,14 +75,16 @@ except ImportError:
 
 
     class ParticleSystem:
-        def __init__(self):
+        def __init__(self, *args, rng=None, **kwargs):
             self.particles = []
+            self.rng = rng if rng is not None else random
 
         def add_particle(self, particle_instance):
             self.particles.append(particle_instance)
 
         def emit(self, x, y, count, color, base_size, base_lifespan, **kwargs):
-            for _ in range(count): self.particles.append(Particle(x, y, color, base_size, base_lifespan, **kwargs))
+            for _ in range(count): self.particles.append(
+                Particle(x, y, color, base_size, base_lifespan, rng=self.rng, **kwargs))
 
         def update(self):
             for i in range(len(self.particles) - 1, -1, -1):
@@ -73,14 +95,44 @@ except ImportError:
 
         def clear(self):
             self.particles.clear()
+
+        def __len__(self):
+            return len(self.particles)
+
+
+    class StaticParticleLayer:
+        def __init__(self, particles, *args, **kwargs):
+            self.system = ParticleSystem()
+            for p in particles: self.system.add_particle(p)
+
+        def update(self):
+            self.system.update()
+
+        def draw(self, surface, camera_offset_x=0, camera_offset_y=0):
+            self.system.draw(surface, camera_offset_x, camera_offset_y)
     # --- END OF PASTED PARTICLE CLASSES ---
 
 # --- Constants ---
 SCREEN_WIDTH = 1000;
 SCREEN_HEIGHT = 750;
 FPS = 30
+MAX_PARTICLES = 4000  # Hard cap for the shared particle pool; the faintest particles are dropped first
+NEBULA_DRIFT_FRAMES = 2  # Pre-rendered drift frames per nebula (each ~2.5MB for the largest clouds)
+NEBULA_DRIFT_FRAME_TICKS = 33  # Nebula dust drifts <= 0.03px/tick, so ~1px between frames
+BODY_BATCH_MIN = 16  # Below this many bodies the per-object physics loop beats the numpy pass
+NEBULA_DRAG = 0.96
+SPRITES = SpriteCache()  # Pre-rendered segment, drone and body sprites shared by every Game
+ASTEROID_BATCH_MIN = 24  # On-screen asteroids needed before outlines are transformed with numpy
+COLLISION_CELL_SIZE = 150  # Spatial hash cell edge; a bit over the largest body/drone reach
+ACTIVE_RADIUS = 800  # Full-rate simulation around the camera centre (the screen's half-diagonal is 625)
+REDUCED_RADIUS = 1400  # Past this from the camera centre bodies, drones and singularities freeze
+REDUCED_INTERVAL = 4  # Entities between the two radii step every 4th tick with a 4x time step
+DRONE_AGGRO_RANGE = 350  # Drones open fire inside this distance of the serpent's head
+PLAYER_WELL_RADIUS = DRONE_AGGRO_RANGE + 100  # Always full rate near the head; covers a reduced step's travel
+SINGULARITY_WELL_RADIUS = 450  # Always full rate near a black hole, where its pull dominates
 DEEP_SPACE_BLUE = (5, 0, 25);
 STAR_COLORS = [(255, 255, 255), (220, 220, 255), (255, 255, 200), (255, 200, 200)]
+STAR_BANDS = ((0.05, 45), (0.15, 45), (0.27, 45), (0.4, 45))  # (parallax factor, stars per screen), far to near
 WHITE_COLOR = (255, 255, 255);
 GREY_COLOR = (128, 128, 128);
 DARK_GREY_COLOR = (50, 50, 50);
@@ -112,6 +164,11 @@ def normalize_vector(v): l = math.sqrt(v[0] ** 2 + v[1] ** 2);return (0, 0) if l
 def distance(p1, p2): return math.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2)
 
 
+def in_reach(x1, y1, x2, y2, reach):
+    # Contact test between entities that wrap around the world: squared distance with per-axis rejection, no sqrt
+    return within(x1, y1, x2, y2, reach, Game.WORLD_WIDTH, Game.WORLD_HEIGHT)
+
+
 def angle_to_vector(angle_rad): return (math.cos(angle_rad), math.sin(angle_rad))
 
 
@@ -121,40 +178,9 @@ def vector_to_angle(vx, vy): return math.atan2(vy, vx)
 def lerp(a, b, t): return a + (b - a) * t
 
 
-class Star:
-    def __init__(self, x, y, world_w, world_h):
-        self.x = x;
-        self.y = y;
-        self.world_w = world_w;
-        self.world_h = world_h;
-        self.color = random.choice(STAR_COLORS)
-        self.base_size = random.randint(1, 3);
-        self.parallax_factor = random.uniform(0.05, 0.4)
-        self.twinkle_speed = random.uniform(0.05, 0.2);
-        self.twinkle_timer = random.uniform(0, math.pi * 2);
-        self.current_size = self.base_size
-
-    def update(self):
-        self.twinkle_timer += self.twinkle_speed
-        if self.twinkle_timer > math.pi * 2: self.twinkle_timer -= math.pi * 2
-        self.current_size = self.base_size + math.sin(self.twinkle_timer) * 0.5
-
-    def draw(self, surface, cam_x, cam_y):
-        self.update();
-        if self.current_size < 0.5: return
-        cam_world_offset_x = (cam_x * self.parallax_factor) // self.world_w;
-        cam_world_offset_y = (cam_y * self.parallax_factor) // self.world_h
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-                draw_x_wrapped = self.x - (cam_x - (cam_world_offset_x + i) * self.world_w) * self.parallax_factor
-                draw_y_wrapped = self.y - (cam_y - (cam_world_offset_y + j) * self.world_h) * self.parallax_factor
-                if 0 <= draw_x_wrapped <= SCREEN_WIDTH and 0 <= draw_y_wrapped <= SCREEN_HEIGHT:
-                    pygame.draw.circle(surface, self.color, (int(draw_x_wrapped), int(draw_y_wrapped)),
-                                       int(self.current_size))
-
-
 class Projectile:
-    def __init__(self, x, y, angle_rad, speed, color, damage, owner_type="player", p_system_ref=None):
+    def __init__(self, x, y, angle_rad, speed, color, damage, owner_type="player", p_system_ref=None, rng=random):
+        self.rng = rng
         self.x = x;
         self.y = y;
         self.radius = 3 if owner_type == "player" else 4;
@@ -176,7 +202,8 @@ class Projectile:
         self.lifespan -= 1;
         self.trail_cooldown_counter -= 1
         if self.p_system_ref and self.trail_cooldown_counter <= 0:
-            self.p_system_ref.emit(self.x, self.y, 1, self.color[:3] + (random.randint(80, 150),), self.radius * 0.6, 8,
+            self.p_system_ref.emit(self.x, self.y, 1, self.color[:3] + (self.rng.randint(80, 150),),
+                                   self.radius * 0.6, 8,
                                    velocity_x_range=(-0.1, 0.1), velocity_y_range=(-0.1, 0.1), shrink_rate=0.15,
                                    fade_rate=15)
             self.trail_cooldown_counter = self.trail_emit_cooldown
@@ -189,7 +216,8 @@ class Projectile:
 
 
 class CelestialBody:
-    def __init__(self, x, y, r, c, type="asteroid", val=1, custom_vel=None):
+    def __init__(self, x, y, r, c, type="asteroid", val=1, custom_vel=None, rng=random):
+        self.rng = rng
         self.x = x;
         self.y = y;
         self.radius = r;
@@ -197,63 +225,68 @@ class CelestialBody:
         self.color = c;
         self.type = type;
         self.value = val
-        self.velocity = list(custom_vel) if custom_vel else [random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5)]
+        self.velocity = list(custom_vel) if custom_vel else [self.rng.uniform(-0.5, 0.5), self.rng.uniform(-0.5, 0.5)]
         self.mass = r;
-        self.rotation_angle = random.uniform(0, math.pi * 2);
-        self.rotation_speed = random.uniform(-0.02, 0.02) if type == "asteroid" else 0
+        self.rotation_angle = self.rng.uniform(0, math.pi * 2);
+        self.rotation_speed = self.rng.uniform(-0.02, 0.02) if type == "asteroid" else 0
         self.affected_by_nebula = False;
-        self.pulse_anim = random.uniform(0, math.pi * 2)
+        self.pulse_anim = self.rng.uniform(0, math.pi * 2)
+        self.unit_vertices = asteroid_unit_vertices(self.rng) if type == "asteroid" else None
+        self.lod_slot = None  # ActiveRegion stagger slot
 
-    def update(self, gravity_sources=[], p_system_ref=None):
+    def update(self, gravity_sources=[], p_system_ref=None, dt=1):
         self.affected_by_nebula = False;
         original_max_speed = 2 if self.type != "comet" else 7
         for gx, gy, gmass, gtype in gravity_sources:
-            dist_val = distance((self.x, self.y), (gx, gy));
-            if dist_val < 1: dist_val = 1
+            dx = gx - self.x;
+            dy = gy - self.y
+            length = math.sqrt(dx * dx + dy * dy)  # One sqrt serves both the falloff and the direction
+            if length == 0: continue
+            dist_val = length if length > 1 else 1
             pull_str_f = 0.05;
             if gtype == "black_hole": pull_str_f = 0.6;
             if dist_val < gmass * 0.1: pull_str_f *= 4
-            force_mag = (gmass / (dist_val * dist_val)) * pull_str_f
-            direction = normalize_vector((gx - self.x, gy - self.y))
-            self.velocity[0] += direction[0] * force_mag;
-            self.velocity[1] += direction[1] * force_mag
+            force_mag = (gmass / (dist_val * dist_val)) * pull_str_f / length * dt
+            self.velocity[0] += dx * force_mag;
+            self.velocity[1] += dy * force_mag
         current_max_speed = original_max_speed
         speed = math.sqrt(self.velocity[0] ** 2 + self.velocity[1] ** 2)
         if speed > current_max_speed: self.velocity = [(v / speed) * current_max_speed for v in self.velocity]
-        self.x += self.velocity[0];
-        self.y += self.velocity[1];
-        self.rotation_angle += self.rotation_speed
-        self.pulse_anim = (self.pulse_anim + 0.1) % (math.pi * 2)
+        self.x += self.velocity[0] * dt;
+        self.y += self.velocity[1] * dt;
+        self.animate(p_system_ref, dt)
+        self.x %= Game.WORLD_WIDTH;
+        self.y %= Game.WORLD_HEIGHT
+
+    def animate(self, p_system_ref=None, dt=1):
+        # Per-body spin, pulse and comet tail; runs after the move, before the world wrap
+        self.rotation_angle += self.rotation_speed * dt
+        self.pulse_anim = (self.pulse_anim + 0.1 * dt) % (math.pi * 2)
         self.radius = self.base_radius + math.sin(
             self.pulse_anim) * 1 if self.type == "constellation_shard" else self.base_radius
-        if self.type == "comet" and p_system_ref and random.random() < 0.8:
+        if self.type == "comet" and p_system_ref and self.rng.random() < 0.8:
             tail_angle = vector_to_angle(-self.velocity[0], -self.velocity[1])
-            p_system_ref.emit(self.x, self.y, 2, COMET_TAIL_BASE_COLOR[:3] + (random.randint(50, 120),),
-                              self.radius * random.uniform(0.4, 0.8), random.randint(20, 40),
+            p_system_ref.emit(self.x, self.y, 2, COMET_TAIL_BASE_COLOR[:3] + (self.rng.randint(50, 120),),
+                              self.radius * self.rng.uniform(0.4, 0.8), self.rng.randint(20, 40),
                               velocity_x_range=(math.cos(tail_angle) * 0.5 - 0.3, math.cos(tail_angle) * 0.5 + 0.3),
                               velocity_y_range=(math.sin(tail_angle) * 0.5 - 0.3, math.sin(tail_angle) * 0.5 + 0.3),
-                              shrink_rate=0.1, fade_rate=3 + random.randint(0, 3))
-        self.x %= Game.WORLD_WIDTH;
-        self.y %= Game.WORLD_HEIGHT
+                              shrink_rate=0.1, fade_rate=3 + self.rng.randint(0, 3))
 
-    def draw(self, surface, cam_x, cam_y):
+    def draw(self, surface, cam_x, cam_y, points=None):
+        # points: this asteroid's outline already placed on screen (see asteroid_polygons)
         dx = int(self.x - cam_x);
         dy = int(self.y - cam_y)
         if self.type == "asteroid":
-            points = [];
-            num_sides = random.choice([5, 6, 7])
-            for i in range(num_sides):
-                angle = self.rotation_angle + (math.pi * 2 / num_sides * i)
-                r_offset = self.radius * random.uniform(0.75, 1.25)
-                px = dx + r_offset * math.cos(angle);
-                py = dy + r_offset * math.sin(angle)
-                points.append((px, py))
+            if points is None: points = asteroid_polygons([self], cam_x, cam_y)[0]
             pygame.draw.polygon(surface, self.color, points)
             pygame.draw.polygon(surface, tuple(int(c // 1.5) for c in self.color), points, 2)  # Ensure int
         else:
-            pygame.draw.circle(surface, self.color, (dx, dy), int(self.radius))
+            outlined = self.type.startswith("tech_debris") or self.type == "constellation_shard"
+            radius = int(self.radius)
+            sprite = SPRITES.get(("body", self.color, radius, outlined),
+                                 lambda: render_body_sprite(self.color, radius, outlined))
+            blit_centered(surface, sprite, dx, dy)
         if self.type.startswith("tech_debris") or self.type == "constellation_shard":
-            pygame.draw.circle(surface, WHITE_COLOR, (dx, dy), int(self.radius), 2)
             if random.random() < 0.05:
                 glint_angle = random.uniform(0, math.pi * 2);
                 glint_len = self.radius * 1.5
@@ -264,25 +297,142 @@ class CelestialBody:
                 pygame.draw.line(surface, WHITE_COLOR, (int(gx_s), int(gy_s)), (int(gx_e), int(gy_e)), 1)
 
 
+def asteroid_unit_vertices(rng):
+    # Outline of a radius-1 asteroid at rotation 0, rolled once at spawn
+    num_sides = rng.choice([5, 6, 7])
+    vertices = []
+    for i in range(num_sides):
+        angle = math.pi * 2 / num_sides * i
+        r_offset = rng.uniform(0.75, 1.25)
+        vertices.append((r_offset * math.cos(angle), r_offset * math.sin(angle)))
+    return tuple(vertices)
+
+
+def asteroid_polygons(asteroids, cam_x, cam_y):
+    """Screen-space outlines for a list of asteroids: each unit shape rotated, scaled and moved into place.
+
+    With numpy and enough asteroids every vertex is transformed in one batch; otherwise it costs one
+    cos/sin pair per asteroid.
+    """
+    if np is None or len(asteroids) < ASTEROID_BATCH_MIN:
+        polygons = []
+        for body in asteroids:
+            dx = int(body.x - cam_x);
+            dy = int(body.y - cam_y)
+            c = math.cos(body.rotation_angle) * body.radius;
+            s = math.sin(body.rotation_angle) * body.radius
+            polygons.append([(dx + ux * c - uy * s, dy + ux * s + uy * c) for ux, uy in body.unit_vertices])
+        return polygons
+    counts = [len(body.unit_vertices) for body in asteroids]
+    unit = np.array([vertex for body in asteroids for vertex in body.unit_vertices])
+    angles = np.array([body.rotation_angle for body in asteroids])
+    radii = np.array([body.radius for body in asteroids])
+    c = np.repeat(np.cos(angles) * radii, counts);
+    s = np.repeat(np.sin(angles) * radii, counts)
+    dx = np.repeat(np.array([int(body.x - cam_x) for body in asteroids], dtype=float), counts);
+    dy = np.repeat(np.array([int(body.y - cam_y) for body in asteroids], dtype=float), counts)
+    points = np.column_stack((dx + unit[:, 0] * c - unit[:, 1] * s, dy + unit[:, 0] * s + unit[:, 1] * c)).tolist()
+    polygons = []
+    start = 0
+    for count in counts:
+        polygons.append(points[start:start + count])
+        start += count
+    return polygons
+
+
+def draw_celestial_bodies(surface, bodies, cam_x, cam_y):
+    # Draws on-screen bodies in list order; the asteroid outlines among them are placed in one batch
+    width, height = surface.get_size()
+    visible = [body for body in bodies if -body.radius * 2 < body.x - cam_x < width + body.radius * 2 and
+               -body.radius * 2 < body.y - cam_y < height + body.radius * 2]
+    polygons = iter(asteroid_polygons([body for body in visible if body.unit_vertices is not None], cam_x, cam_y))
+    for body in visible:
+        body.draw(surface, cam_x, cam_y, next(polygons) if body.unit_vertices is not None else None)
+
+
+def update_celestial_bodies(bodies, gravity_sources, nebula_clouds, p_system_ref=None, dts=None):
+    """One physics tick for every body: gravity, speed clamp, move, world wrap and nebula drag.
+
+    With numpy and enough bodies the positions and velocities are gathered into arrays and stepped in
+    one pass per gravity source; the results are written back before each body's animate() so comet
+    tails and spin see the same state as CelestialBody.update(). dts optionally gives each body's time
+    step (see ActiveRegion): a body with dt=4 integrates four ticks in one explicit Euler step.
+    """
+    if dts is None: dts = [1] * len(bodies)
+    if np is None or len(bodies) < BODY_BATCH_MIN:
+        for body, dt in zip(bodies, dts):
+            body.update(gravity_sources, p_system_ref, dt);
+            body.affected_by_nebula = any(n.is_inside(body.x, body.y) for n in nebula_clouds)
+            if body.affected_by_nebula: body.velocity = [v * NEBULA_DRAG ** dt for v in body.velocity]
+        return
+    count = len(bodies)
+    steps = np.array(dts, dtype=float)
+    xs = np.fromiter((b.x for b in bodies), float, count)
+    ys = np.fromiter((b.y for b in bodies), float, count)
+    vx = np.fromiter((b.velocity[0] for b in bodies), float, count)
+    vy = np.fromiter((b.velocity[1] for b in bodies), float, count)
+    max_speed = np.fromiter((7.0 if b.type == "comet" else 2.0 for b in bodies), float, count)
+    for gx, gy, gmass, gtype in gravity_sources:
+        dx = gx - xs;
+        dy = gy - ys
+        length = np.hypot(dx, dy)
+        dist_val = np.maximum(length, 1.0)
+        pull_str_f = np.where(dist_val < gmass * 0.1, 4.0, 1.0) * (0.6 if gtype == "black_hole" else 0.05)
+        force_mag = gmass / (dist_val * dist_val) * pull_str_f
+        scale = np.divide(force_mag, length, out=np.zeros(count), where=length > 0) * steps
+        vx += dx * scale;
+        vy += dy * scale
+    speed = np.hypot(vx, vy)
+    clamp = np.where(speed > max_speed, max_speed / np.maximum(speed, 1e-12), 1.0)
+    vx *= clamp;
+    vy *= clamp
+    xs += vx * steps;
+    ys += vy * steps
+    wrapped_x = xs % Game.WORLD_WIDTH;
+    wrapped_y = ys % Game.WORLD_HEIGHT
+    in_nebula = np.zeros(count, dtype=bool)
+    for nebula in nebula_clouds:
+        ndx = wrapped_x - nebula.x;  # Unwrapped, like NebulaCloud.is_inside
+        ndy = wrapped_y - nebula.y
+        in_nebula |= ndx * ndx + ndy * ndy < nebula.radius * nebula.radius
+    drag = np.where(in_nebula, NEBULA_DRAG ** steps, 1.0)
+    columns = zip(xs.tolist(), ys.tolist(), vx.tolist(), vy.tolist(), wrapped_x.tolist(), wrapped_y.tolist(),
+                  in_nebula.tolist(), (vx * drag).tolist(), (vy * drag).tolist())
+    for body, dt, (x, y, bvx, bvy, wx, wy, inside, dvx, dvy) in zip(bodies, dts, columns):
+        body.x = x;
+        body.y = y;
+        body.velocity = [bvx, bvy]
+        body.animate(p_system_ref, dt)
+        body.x = wx;
+        body.y = wy
+        body.affected_by_nebula = inside
+        body.velocity = [dvx, dvy]
+
+
 class NebulaCloud:
-    def __init__(self, x, y, radius, density_factor=0.0005):
+    def __init__(self, x, y, radius, density_factor=0.0005, rng=random):
+        self.rng = rng
         self.x = x;
         self.y = y;
-        self.radius = radius;
-        self.particles = ParticleSystem()
+        self.radius = radius
+        dust = []
         num_particles = int(math.pi * radius ** 2 * density_factor)
         for _ in range(num_particles):
-            px_offset = random.uniform(-radius, radius);
-            py_offset = random.uniform(-radius, radius)
-            if distance((0, 0), (px_offset, py_offset)) < radius:
-                particle_color = random.choice(NEBULA_PARTICLE_COLORS)
-                self.particles.add_particle(
-                    Particle(x + px_offset, y + py_offset, particle_color[:3] + (random.randint(10, 40),),
-                             random.uniform(15, 45), float('inf'), velocity_x_range=(-0.03, 0.03),
-                             velocity_y_range=(-0.03, 0.03), gravity=0, shrink_rate=0, fade_rate=0))
+            px_offset = self.rng.uniform(-radius, radius);
+            py_offset = self.rng.uniform(-radius, radius)
+            if px_offset * px_offset + py_offset * py_offset < radius * radius:
+                particle_color = self.rng.choice(NEBULA_PARTICLE_COLORS)
+                dust.append(
+                    Particle(x + px_offset, y + py_offset, particle_color[:3] + (self.rng.randint(10, 40),),
+                             self.rng.uniform(15, 45), float('inf'), velocity_x_range=(-0.03, 0.03),
+                             velocity_y_range=(-0.03, 0.03), gravity=0, shrink_rate=0, fade_rate=0, rng=self.rng))
+        # The dust never fades or shrinks, so it is baked once into a static layer and drawn as a single blit
+        self.particles = StaticParticleLayer(dust, drift_frames=NEBULA_DRIFT_FRAMES,
+                                             frame_ticks=NEBULA_DRIFT_FRAME_TICKS)
 
     def is_inside(self, px, py):
-        return distance((self.x, self.y), (px, py)) < self.radius
+        # Unwrapped: the dust is not drawn across the world seam, so neither side of it may feel the drag
+        return within(self.x, self.y, px, py, self.radius)
 
     def update(self):
         self.particles.update()
@@ -292,35 +442,38 @@ class NebulaCloud:
 
 
 class Singularity:
-    def __init__(self, x, y, radius, event_horizon_radius):
+    def __init__(self, x, y, radius, event_horizon_radius, rng=random):
+        self.rng = rng
         self.x = x;
         self.y = y;
         self.radius = radius;
         self.event_horizon_radius = event_horizon_radius
         self.color = BLACK_HOLE_CORE_COLOR;
         self.gravity_mass = 2500
+        self.lod_slot = None  # ActiveRegion stagger slot
         self.accretion_particles = []
         for _ in range(120):
             self.accretion_particles.append(
-                [random.uniform(0, math.pi * 2), random.uniform(radius * 1.2, event_horizon_radius * 1.6),
-                 random.uniform(0.005, 0.025), random.randint(0, len(BLACK_HOLE_ACCRETION_COLORS) - 1)])
+                [self.rng.uniform(0, math.pi * 2), self.rng.uniform(radius * 1.2, event_horizon_radius * 1.6),
+                 self.rng.uniform(0.005, 0.025), self.rng.randint(0, len(BLACK_HOLE_ACCRETION_COLORS) - 1)])
 
-    def update(self, p_system_ref):
+    def update(self, p_system_ref, dt=1):
         for p_data in self.accretion_particles:
-            p_data[0] += p_data[2];
-            p_data[1] -= 0.025
-            if p_data[1] < self.radius * 1.05: p_data[1] = random.uniform(self.event_horizon_radius * 1.3,
+            p_data[0] += p_data[2] * dt;
+            p_data[1] -= 0.025 * dt
+            if p_data[1] < self.radius * 1.05: p_data[1] = self.rng.uniform(self.event_horizon_radius * 1.3,
                                                                           self.event_horizon_radius * 1.6);p_data[
-                0] = random.uniform(0, math.pi * 2)
-        if p_system_ref and random.random() < 0.25:
-            angle_to_center = random.uniform(0, math.pi * 2);
-            dist_from_edge = self.event_horizon_radius * random.uniform(1.6, 2.8)
+                0] = self.rng.uniform(0, math.pi * 2)
+        if p_system_ref and self.rng.random() < 0.25:
+            angle_to_center = self.rng.uniform(0, math.pi * 2);
+            dist_from_edge = self.event_horizon_radius * self.rng.uniform(1.6, 2.8)
             s_x = self.x + math.cos(angle_to_center) * dist_from_edge;
             s_y = self.y + math.sin(angle_to_center) * dist_from_edge
-            suck_vel_mag = random.uniform(0.5, 1.0);
+            suck_vel_mag = self.rng.uniform(0.5, 1.0);
             suck_dir = normalize_vector((self.x - s_x, self.y - s_y))
-            p_system_ref.emit(s_x, s_y, 1, random.choice(BLACK_HOLE_ACCRETION_COLORS)[:3] + (random.randint(80, 150),),
-                              random.uniform(1, 4), random.randint(15, 25), shrink_rate=0.15, fade_rate=8,
+            p_system_ref.emit(s_x, s_y, 1,
+                              self.rng.choice(BLACK_HOLE_ACCRETION_COLORS)[:3] + (self.rng.randint(80, 150),),
+                              self.rng.uniform(1, 4), self.rng.randint(15, 25), shrink_rate=0.15, fade_rate=8,
                               velocity_x_range=(suck_dir[0] * suck_vel_mag - 0.1, suck_dir[0] * suck_vel_mag + 0.1),
                               velocity_y_range=(suck_dir[1] * suck_vel_mag - 0.1, suck_dir[1] * suck_vel_mag + 0.1))
 
@@ -337,74 +490,74 @@ class Singularity:
 
 
 class EnemyDrone:
-    def __init__(self, x, y):
+    def __init__(self, x, y, rng=random):
+        self.rng = rng
         self.x = x;
         self.y = y;
         self.radius = 9;
+        self.lod_slot = None  # ActiveRegion stagger slot
         self.color = ENEMY_DRONE_COLOR;
-        self.speed = random.uniform(1.2, 1.8)
+        self.speed = self.rng.uniform(1.2, 1.8)
         self.health = 40;
-        self.shoot_cooldown_max = random.uniform(1.2, 2.0) * FPS;
-        self.shoot_cooldown = random.randint(0, int(self.shoot_cooldown_max))
+        self.shoot_cooldown_max = self.rng.uniform(1.2, 2.0) * FPS;
+        self.shoot_cooldown = self.rng.randint(0, int(self.shoot_cooldown_max))
         self.target_angle = 0;
-        self.current_angle = random.uniform(0, math.pi * 2);
+        self.current_angle = self.rng.uniform(0, math.pi * 2);
         self.turn_speed = 0.04
         self.dodge_timer = 0;
         self.dodge_direction = 0
 
-    def update(self, player_head_pos, projectiles_list_ref, p_system_ref):
+    def update(self, player_head_pos, projectiles_list_ref, p_system_ref, dt=1):
         dx = player_head_pos[0] - self.x;
         dy = player_head_pos[1] - self.y;
         dist_to_player = math.sqrt(dx ** 2 + dy ** 2)
         if dist_to_player < 0.1: dist_to_player = 0.1
         self.target_angle = vector_to_angle(dx, dy)
         angle_diff = (self.target_angle - self.current_angle + math.pi) % (2 * math.pi) - math.pi
-        if angle_diff > self.turn_speed:
-            self.current_angle += self.turn_speed
-        elif angle_diff < -self.turn_speed:
-            self.current_angle -= self.turn_speed
+        turn = self.turn_speed * dt
+        if angle_diff > turn:
+            self.current_angle += turn
+        elif angle_diff < -turn:
+            self.current_angle -= turn
         else:
             self.current_angle = self.target_angle
         if self.dodge_timer > 0:
-            self.dodge_timer -= 1;
+            self.dodge_timer -= dt;
             perp_angle = self.current_angle + self.dodge_direction * (math.pi / 2)
-            self.x += math.cos(perp_angle) * self.speed * 0.7;
-            self.y += math.sin(perp_angle) * self.speed * 0.7
+            self.x += math.cos(perp_angle) * self.speed * 0.7 * dt;
+            self.y += math.sin(perp_angle) * self.speed * 0.7 * dt
         else:
-            desired_distance = random.uniform(180, 250)
+            desired_distance = self.rng.uniform(180, 250)
             if dist_to_player > desired_distance:
-                self.x += math.cos(self.current_angle) * self.speed;
-                self.y += math.sin(self.current_angle) * self.speed
+                self.x += math.cos(self.current_angle) * self.speed * dt;
+                self.y += math.sin(self.current_angle) * self.speed * dt
             elif dist_to_player < desired_distance - 30:
-                self.x -= math.cos(self.current_angle) * self.speed * 0.5;
+                self.x -= math.cos(self.current_angle) * self.speed * 0.5 * dt;
                 self.y -= math.sin(
-                    self.current_angle) * self.speed * 0.5
-            if random.random() < 0.01: self.dodge_timer = int(0.5 * FPS);self.dodge_direction = random.choice([-1, 1])
+                    self.current_angle) * self.speed * 0.5 * dt
+            if self.rng.random() < 1 - 0.99 ** dt:  # 1% a tick, compounded over a reduced step
+                self.dodge_timer = int(0.5 * FPS);self.dodge_direction = self.rng.choice([-1, 1])
         self.x %= Game.WORLD_WIDTH;
         self.y %= Game.WORLD_HEIGHT
-        self.shoot_cooldown -= 1
-        if self.shoot_cooldown <= 0 and dist_to_player < 350:
+        self.shoot_cooldown -= dt
+        if self.shoot_cooldown <= 0 and dist_to_player < DRONE_AGGRO_RANGE:
             projectiles_list_ref.append(
-                Projectile(self.x, self.y, self.current_angle, 5, ENEMY_PROJECTILE_COLOR, 8, "enemy", p_system_ref))
+                Projectile(self.x, self.y, self.current_angle, 5, ENEMY_PROJECTILE_COLOR, 8, "enemy", p_system_ref,
+                           self.rng))
             self.shoot_cooldown = self.shoot_cooldown_max
         return self.health > 0
 
     def take_damage(self, amount, p_system_ref):
         self.health -= amount
-        if p_system_ref: p_system_ref.emit(self.x, self.y, random.randint(4, 7), (200, 200, 100, 200),
-                                           random.uniform(2, 4), 10, velocity_x_range=(-1.2, 1.2),
+        if p_system_ref: p_system_ref.emit(self.x, self.y, self.rng.randint(4, 7), (200, 200, 100, 200),
+                                           self.rng.uniform(2, 4), 10, velocity_x_range=(-1.2, 1.2),
                                            velocity_y_range=(-1.2, 1.2), shrink_rate=0.25)
 
     def draw(self, surface, cam_x, cam_y):
-        points = [];
-        num_points = 5
-        for i in range(num_points):
-            angle_offset = (2 * math.pi / num_points) * i;
-            px = self.x + self.radius * math.cos(self.current_angle + angle_offset);
-            py = self.y + self.radius * math.sin(self.current_angle + angle_offset)
-            points.append((int(px - cam_x), int(py - cam_y)))
-        pygame.draw.polygon(surface, self.color, points)
-        pygame.draw.polygon(surface, WHITE_COLOR, points, 1)
+        bucket = angle_bucket(self.current_angle)
+        sprite = SPRITES.get(("drone", self.color, self.radius, bucket),
+                             lambda: render_drone_sprite(self.color, self.radius, bucket_angle(bucket)))
+        blit_centered(surface, sprite, int(self.x - cam_x), int(self.y - cam_y))
         engine_x = self.x - math.cos(self.current_angle) * self.radius * 0.8;
         engine_y = self.y - math.sin(self.current_angle) * self.radius * 0.8
         engine_glow_color = (255, random.randint(80, 120), random.randint(80, 120), 150 + random.randint(0, 50))
@@ -412,80 +565,241 @@ class EnemyDrone:
                            self.radius // 2.5)
 
 
+def render_disc_sprite(color, radius):
+    sprite = blank_sprite(radius + 1)
+    pygame.draw.circle(sprite, color[:3], (radius + 1, radius + 1), radius)
+    return sprite
+
+
+def render_body_sprite(color, radius, outlined):
+    sprite = render_disc_sprite(color, radius)
+    if outlined: pygame.draw.circle(sprite, WHITE_COLOR, (radius + 1, radius + 1), radius, 2)
+    return sprite
+
+
+def render_drone_sprite(color, radius, angle):
+    half = radius + 2
+    sprite = blank_sprite(half)
+    points = [(int(half + radius * math.cos(angle + (2 * math.pi / 5) * i)),
+               int(half + radius * math.sin(angle + (2 * math.pi / 5) * i))) for i in range(5)]
+    pygame.draw.polygon(sprite, color, points)
+    pygame.draw.polygon(sprite, WHITE_COLOR, points, 1)
+    return sprite
+
+
+def render_segment_sprite(seg_type, color, radius, inner, head_bucket):
+    # Body, outline and module detail of one segment; the head also gets its heading line and eyes
+    is_head = head_bucket is not None
+    half = int(radius * 1.3) + 3 if is_head else radius + 1
+    sprite = blank_sprite(half)
+    c = (half, half)
+    if is_head:
+        head_angle = bucket_angle(head_bucket)
+        pygame.draw.circle(sprite, SNAKE_HEAD_COLOR, c, radius)
+        indicator_len = radius * 1.3;
+        end_x = half + indicator_len * math.cos(head_angle);
+        end_y = half + indicator_len * math.sin(head_angle)
+        pygame.draw.line(sprite, WHITE_COLOR, c, (int(end_x), int(end_y)), 3)
+        eye_angle_offset = math.pi / 6;
+        eye_dist = radius * 0.5;
+        eye_r = radius * 0.2
+        for sign in [-1, 1]:
+            eye_x = half + eye_dist * math.cos(head_angle + sign * eye_angle_offset);
+            eye_y = half + eye_dist * math.sin(head_angle + sign * eye_angle_offset)
+            pygame.draw.circle(sprite, pygame.Color("black"), (int(eye_x), int(eye_y)), int(eye_r))
+            pygame.draw.circle(sprite, pygame.Color("white"), (int(eye_x) + 1, int(eye_y) - 1), int(eye_r * 0.5))
+    else:
+        pygame.draw.circle(sprite, color, c, radius)
+    outline_c = tuple(int(v // 1.5) for v in (SNAKE_HEAD_COLOR if is_head else color))
+    pygame.draw.circle(sprite, outline_c, c, radius, 2)
+    if seg_type == "thruster": pygame.draw.circle(sprite, color, c, radius)
+    if inner is not None: pygame.draw.circle(sprite, inner[0], c, inner[1])
+    return sprite
+
+
+SEGMENT_TYPES = ("generic", "thruster", "shield", "weapon")  # Index = type code stored in SegmentChain
+
+
 class Segment:
-    def __init__(self, x, y, r, type="generic"):
-        self.x = x;
-        self.y = y;
-        self.radius = r;
-        self.type = type
+    """View onto one slot of a SegmentChain; position, radius and type live in the chain's arrays."""
+
+    def __init__(self, chain, index, rng=random):
+        self.rng = rng
+        self.chain = chain;
+        self.index = index
+        type = self.type
         self.color_map = {"generic": SNAKE_BASE_COLOR, "thruster": THRUSTER_MODULE_COLOR, "shield": SHIELD_MODULE_COLOR,
                           "weapon": WEAPON_MODULE_COLOR}
         self.color = self.color_map.get(type, SNAKE_BASE_COLOR);
         self.is_shield_active = False;
         self.shield_health = 0
-        self.pulse_anim = random.uniform(0, math.pi * 2);
+        self.pulse_anim = self.rng.uniform(0, math.pi * 2);
         self.pulse_speed = 0.05
 
+    @property
+    def x(self):
+        return self.chain.xs[self.index]
+
+    @x.setter
+    def x(self, value):
+        self.chain.xs[self.index] = value
+
+    @property
+    def y(self):
+        return self.chain.ys[self.index]
+
+    @y.setter
+    def y(self, value):
+        self.chain.ys[self.index] = value
+
+    @property
+    def radius(self):
+        return self.chain.radii[self.index]
+
+    @property
+    def type(self):
+        return SEGMENT_TYPES[self.chain.type_codes[self.index]]
+
     def update_animation(self):
         self.pulse_anim += self.pulse_speed;
         if self.pulse_anim > math.pi * 2: self.pulse_anim -= math.pi * 2
 
     def draw(self, surface, cam_x, cam_y, is_head=False, head_angle=0):
-        self.update_animation();
         dx = int(self.x - cam_x);
         dy = int(self.y - cam_y)
         current_radius = self.radius * (0.95 + abs(math.sin(self.pulse_anim)) * 0.05) if not is_head else self.radius
-        if is_head:
-            pygame.draw.circle(surface, SNAKE_HEAD_COLOR, (dx, dy), int(current_radius))
-            indicator_len = current_radius * 1.3;
-            end_x = dx + indicator_len * math.cos(head_angle);
-            end_y = dy + indicator_len * math.sin(head_angle)
-            pygame.draw.line(surface, WHITE_COLOR, (dx, dy), (int(end_x), int(end_y)), 3)
-            eye_angle_offset = math.pi / 6;
-            eye_dist = current_radius * 0.5;
-            eye_r = current_radius * 0.2
-            for sign in [-1, 1]:
-                eye_x = dx + eye_dist * math.cos(head_angle + sign * eye_angle_offset);
-                eye_y = dy + eye_dist * math.sin(head_angle + sign * eye_angle_offset)
-                pygame.draw.circle(surface, pygame.Color("black"), (int(eye_x), int(eye_y)), int(eye_r))
-                pygame.draw.circle(surface, pygame.Color("white"), (int(eye_x) + 1, int(eye_y) - 1), int(eye_r * 0.5))
-        else:
-            pygame.draw.circle(surface, self.color, (dx, dy), int(current_radius))
-        outline_c = tuple(int(c // 1.5) for c in (SNAKE_HEAD_COLOR if is_head else self.color))
-        pygame.draw.circle(surface, outline_c, (dx, dy), int(current_radius), 2)
-        if self.type == "shield" and self.is_shield_active and self.shield_health > 0:
-            shield_cap_factor = 1.0
-            if GodSerpent.instance and GodSerpent.instance.shield_module_count > 0:
-                shield_cap_factor = GodSerpent.SHIELD_MAX_HEALTH_PER_MODULE * GodSerpent.instance.shield_module_count
-            else:
-                shield_cap_factor = GodSerpent.SHIELD_MAX_HEALTH_PER_MODULE
-            if shield_cap_factor == 0: shield_cap_factor = GodSerpent.SHIELD_MAX_HEALTH_PER_MODULE
-
-            alpha = 80 + int(120 * (self.shield_health / shield_cap_factor))
-            shield_c = (SHIELD_MODULE_COLOR[0], SHIELD_MODULE_COLOR[1], SHIELD_MODULE_COLOR[2], max(0, min(255, alpha)))
+        seg_type = self.type
+        if seg_type == "shield" and self.is_shield_active and self.shield_health > 0:
+            # The halo is drawn solid over the whole segment, so it is all that shows
             shield_radius_factor = 1.3 + abs(math.sin(pygame.time.get_ticks() * 0.01 + self.pulse_anim)) * 0.1
-            pygame.draw.circle(surface, shield_c, (dx, dy), int(current_radius * shield_radius_factor))
-        elif self.type == "weapon":
-            pygame.draw.circle(surface, WHITE_COLOR, (dx, dy), int(current_radius // 3.5))
-        elif self.type == "thruster":
-            t_color_base = THRUSTER_MODULE_COLOR
-            pulse_val = abs(math.sin(pygame.time.get_ticks() * 0.01 + self.pulse_anim * 2))
-            t_color_final = (min(255, t_color_base[0] + int(pulse_val * 50)),
-                             min(255, t_color_base[1] + int(pulse_val * 30)), t_color_base[2],
-                             180 + int(pulse_val * 50))
-            pygame.draw.circle(surface, self.color, (dx, dy), int(current_radius))
-            pygame.draw.circle(surface, t_color_final, (dx, dy), int(current_radius * 0.65))
+            halo_radius = int(current_radius * shield_radius_factor)
+            sprite = SPRITES.get(("shield_halo", halo_radius), lambda: render_disc_sprite(SHIELD_MODULE_COLOR,
+                                                                                           halo_radius))
+            blit_centered(surface, sprite, dx, dy)
+            return
+        inner = None
+        if seg_type == "weapon":
+            inner = (WHITE_COLOR, int(current_radius // 3.5))
+        elif seg_type == "thruster":
+            pulse = phase_bucket(abs(math.sin(pygame.time.get_ticks() * 0.01 + self.pulse_anim * 2)))
+            pulse_val = bucket_phase(pulse)
+            inner = ((min(255, THRUSTER_MODULE_COLOR[0] + int(pulse_val * 50)),
+                      min(255, THRUSTER_MODULE_COLOR[1] + int(pulse_val * 30)), THRUSTER_MODULE_COLOR[2]),
+                     int(current_radius * 0.65))
+        radius = int(current_radius)
+        head_bucket = angle_bucket(head_angle) if is_head else None
+        key = ("segment", seg_type, self.color, radius, inner, head_bucket)
+        sprite = SPRITES.get(key, lambda: render_segment_sprite(seg_type, self.color, radius, inner, head_bucket))
+        blit_centered(surface, sprite, dx, dy)
+
+
+class SegmentChain:
+    """The serpent's body as parallel arrays (x, y, radius, type code), head first.
+
+    Indexing and iteration give Segment views, so drawing and collision code keep reading seg.x and
+    friends; follow() solves the follow-the-leader constraint directly on the arrays.
+    """
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.xs = array('d');
+        self.ys = array('d');
+        self.radii = array('d');
+        self.type_codes = array('B')
+        self.views = []
+
+    def __len__(self):
+        return len(self.views)
+
+    def __getitem__(self, index):
+        return self.views[index]
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def append(self, x, y, radius, seg_type="generic"):
+        self.xs.append(x);
+        self.ys.append(y);
+        self.radii.append(radius)
+        self.type_codes.append(SEGMENT_TYPES.index(seg_type) if seg_type in SEGMENT_TYPES else 0)
+        view = Segment(self, len(self.views), self.rng)
+        self.views.append(view)
+        return view
+
+    def of_type(self, seg_type):
+        code = SEGMENT_TYPES.index(seg_type)
+        return [view for view, c in zip(self.views, self.type_codes) if c == code]
+
+    def pop(self):
+        # The returned Segment is moved into a one-slot chain of its own so it stays readable
+        view = self.views.pop()
+        detached = SegmentChain(self.rng)
+        detached.xs.append(self.xs.pop());
+        detached.ys.append(self.ys.pop())
+        detached.radii.append(self.radii.pop());
+        detached.type_codes.append(self.type_codes.pop())
+        detached.views.append(view)
+        view.chain = detached;
+        view.index = 0
+        return view
+
+    def follow(self, spacing_factor, world_width, world_height):
+        """Pull each segment toward its (already moved) leader, head to tail, in a single pass.
+
+        Every follower chases the position its leader reached this tick, so the constraint is a
+        recurrence rather than an elementwise op; it runs as one tight loop over local lists with the
+        wrap correction inlined, and the arrays are rebuilt once at the end.
+        """
+        xs = self.xs.tolist();
+        ys = self.ys.tolist();
+        radii = self.radii.tolist()
+        half_w = world_width / 2;
+        half_h = world_height / 2;
+        sqrt = math.sqrt
+        lx = xs[0];
+        ly = ys[0];
+        lr = radii[0]
+        for i in range(1, len(xs)):
+            fx = xs[i];
+            fy = ys[i];
+            fr = radii[i]
+            target_d = (lr + fr) * spacing_factor
+            dx = lx - fx;
+            dy = ly - fy
+            if dx > half_w:
+                dx -= world_width
+            elif dx < -half_w:
+                dx += world_width
+            if dy > half_h:
+                dy -= world_height
+            elif dy < -half_h:
+                dy += world_height
+            current_d = sqrt(dx * dx + dy * dy)
+            if current_d > target_d and current_d > 0.1:
+                move_f = ((current_d - target_d) / current_d) * 0.6
+                if move_f > 1.0: move_f = 1.0
+                fx = (fx + dx * move_f) % world_width;
+                fy = (fy + dy * move_f) % world_height
+                xs[i] = fx;
+                ys[i] = fy
+            lx = fx;
+            ly = fy;
+            lr = fr
+        self.xs = array('d', xs);
+        self.ys = array('d', ys)
 
 
 class GodSerpent:
     SHIELD_MAX_HEALTH_PER_MODULE = 100;
     instance = None
 
-    def __init__(self, x, y):
+    def __init__(self, x, y, rng=random):
         GodSerpent.instance = self;
+        self.rng = rng
         self.base_radius = 12
-        self.segments = [Segment(x, y, self.base_radius)];
-        self.angle = random.uniform(0, math.pi * 2);
+        self.segments = SegmentChain(self.rng);
+        self.segments.append(x, y, self.base_radius)
+        self.angle = self.rng.uniform(0, math.pi * 2);
         self.speed = 0
         self.max_speed_base = 2.8;
         self.acceleration_base = 0.09;
@@ -531,8 +845,7 @@ class GodSerpent:
 
     def grow(self, seg_type="generic"):
         last_seg = self.segments[-1];
-        new_seg = Segment(last_seg.x, last_seg.y, self.base_radius, seg_type)
-        self.segments.append(new_seg);
+        self.segments.append(last_seg.x, last_seg.y, self.base_radius, seg_type);
         self.length_score += 1
         if seg_type == "thruster":
             self.thruster_module_count += 1
@@ -566,32 +879,18 @@ class GodSerpent:
                     offset_dist = last_seg.radius
                     emit_x = last_seg.x - math.cos(self.angle) * offset_dist;
                     emit_y = last_seg.y - math.sin(self.angle) * offset_dist
-                    thrust_angle_visual = self.angle + math.pi + random.uniform(-0.2, 0.2);
-                    particle_speed = abs(self.speed) * 0.5 + random.uniform(1, 3)
+                    thrust_angle_visual = self.angle + math.pi + self.rng.uniform(-0.2, 0.2);
+                    particle_speed = abs(self.speed) * 0.5 + self.rng.uniform(1, 3)
                     p_system_ref.emit(emit_x, emit_y, 1,
-                                      random.choice([(255, 150, 0), (255, 200, 50)])[:3] + (random.randint(150, 220),),
-                                      random.uniform(3, 6), random.randint(10, 20), shrink_rate=0.25, fade_rate=10,
+                                      self.rng.choice([(255, 150, 0), (255, 200, 50)])[:3] + (
+                                          self.rng.randint(150, 220),),
+                                      self.rng.uniform(3, 6), self.rng.randint(10, 20), shrink_rate=0.25, fade_rate=10,
                                       velocity_x_range=(math.cos(thrust_angle_visual) * particle_speed - 0.5,
                                                         math.cos(thrust_angle_visual) * particle_speed + 0.5),
                                       velocity_y_range=(math.sin(thrust_angle_visual) * particle_speed - 0.5,
                                                         math.sin(thrust_angle_visual) * particle_speed + 0.5))
-        for i in range(1, len(self.segments)):
-            leader = self.segments[i - 1];
-            follower = self.segments[i];
-            target_d = (leader.radius + follower.radius) * self.segment_spacing_factor
-            dx_direct = leader.x - follower.x;
-            dy_direct = leader.y - follower.y;
-            dx_wrap = dx_direct;
-            dy_wrap = dy_direct
-            if abs(dx_direct) > Game.WORLD_WIDTH / 2: dx_wrap = dx_direct - math.copysign(Game.WORLD_WIDTH, dx_direct)
-            if abs(dy_direct) > Game.WORLD_HEIGHT / 2: dy_wrap = dy_direct - math.copysign(Game.WORLD_HEIGHT, dy_direct)
-            current_d = math.sqrt(dx_wrap ** 2 + dy_wrap ** 2)
-            if current_d > target_d and current_d > 0.1:
-                move_f = min(((current_d - target_d) / current_d) * 0.6, 1.0)
-                follower.x += dx_wrap * move_f;
-                follower.y += dy_wrap * move_f
-                follower.x %= Game.WORLD_WIDTH;
-                follower.y %= Game.WORLD_HEIGHT
+        self.segments.follow(self.segment_spacing_factor, Game.WORLD_WIDTH, Game.WORLD_HEIGHT)
+        for seg in self.segments: seg.update_animation()  # Pulses advance per tick rather than per drawn frame
         if self.weapon_cooldown > 0: self.weapon_cooldown -= 1
         if keys[pygame.K_LCTRL] or keys[pygame.K_RCTRL] or keys[pygame.K_SPACE]:
             if self.weapon_module_count > 0 and self.weapon_cooldown <= 0:
@@ -600,12 +899,12 @@ class GodSerpent:
                     shot_angle = self.angle + (i_shot - (num_shots - 1) / 2) * 0.05
                     projectiles_list_ref.append(
                         Projectile(self.head.x, self.head.y, shot_angle, abs(self.speed) + 6, PROJECTILE_COLOR,
-                                   15 + self.weapon_module_count * 2, "player", p_system_ref))
+                                   15 + self.weapon_module_count * 2, "player", p_system_ref, self.rng))
                 self.weapon_cooldown = self.weapon_cooldown_max
         if self.shield_active and self.shield_module_count > 0:
             if self.current_shield_health <= 0: self.shield_active = False
-        for seg in self.segments:
-            if seg.type == "shield": seg.is_shield_active = self.shield_active;seg.shield_health = self.current_shield_health
+        for seg in self.segments.of_type("shield"):
+            seg.is_shield_active = self.shield_active;seg.shield_health = self.current_shield_health
 
     def toggle_shield(self):
         if self.shield_module_count > 0 and not self.shield_active:
@@ -655,10 +954,18 @@ class Game:
     WORLD_WIDTH = SCREEN_WIDTH * 3;
     WORLD_HEIGHT = SCREEN_HEIGHT * 3
 
-    def __init__(self):
-        if not pygame.get_init(): pygame.init();pygame.mixer.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Snake 2: Bio-Mechanical God Serpent")
+    def __init__(self, seed=None, headless=False):
+        self.seed = seed
+        self.headless = headless
+        self.rng = random.Random(seed)
+        if not pygame.get_init():
+            pygame.init()
+            if not headless: pygame.mixer.init()  # No audio device is needed to run headless
+        if headless:  # Offscreen target, no window needed
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Snake 2: Bio-Mechanical God Serpent")
         self.clock = pygame.time.Clock()
         try:
             self.font = pygame.font.SysFont("Consolas", 24);
@@ -668,13 +975,24 @@ class Game:
             self.small_font = pygame.font.Font(None, 24)
         self.camera_x = 0;
         self.camera_y = 0
-        self.stars = [Star(random.randint(0, Game.WORLD_WIDTH), random.randint(0, Game.WORLD_HEIGHT), Game.WORLD_WIDTH,
-                           Game.WORLD_HEIGHT) for _ in range(200)]
-        self.particle_system = ParticleSystem()
+        self.previous_camera = (0, 0)  # Camera and moving objects as of the last tick, for drawing between ticks
+        self.position_history = PositionHistory(Game.WORLD_WIDTH, Game.WORLD_HEIGHT)
+        self.starfield = Starfield((SCREEN_WIDTH, SCREEN_HEIGHT), STAR_BANDS, STAR_COLORS, sizes=(1, 3), rng=self.rng)
+        self.nebula_distortion = RowWave(alpha=20, band_height=20, amplitude=6)  # Ripple while slowed in a nebula
+        self.particle_system = ParticleSystem(max_particles=MAX_PARTICLES,
+                                              overflow_policy=OVERFLOW_DROP_LOWEST_ALPHA, rng=self.rng)
+        self.profiler = NULL_PROFILER
+        # Broad-phase grids, refilled every tick before the collision checks
+        self.body_hash = SpatialHash(Game.WORLD_WIDTH, Game.WORLD_HEIGHT, COLLISION_CELL_SIZE)
+        self.drone_hash = SpatialHash(Game.WORLD_WIDTH, Game.WORLD_HEIGHT, COLLISION_CELL_SIZE)
+        self.segment_hash = SpatialHash(Game.WORLD_WIDTH, Game.WORLD_HEIGHT, COLLISION_CELL_SIZE)
+        self.singularity_hash = SpatialHash(Game.WORLD_WIDTH, Game.WORLD_HEIGHT, COLLISION_CELL_SIZE)
+        self.active_region = ActiveRegion(Game.WORLD_WIDTH, Game.WORLD_HEIGHT, ACTIVE_RADIUS, REDUCED_RADIUS,
+                                          REDUCED_INTERVAL)
         self.reset_game()
 
     def reset_game(self):
-        self.player = GodSerpent(Game.WORLD_WIDTH // 2, Game.WORLD_HEIGHT // 2)
+        self.player = GodSerpent(Game.WORLD_WIDTH // 2, Game.WORLD_HEIGHT // 2, self.rng)
         self.celestial_bodies = [];
         self.nebula_clouds = [];
         self.singularities = [];
@@ -694,45 +1012,58 @@ class Game:
         min_dist = SCREEN_WIDTH / 2.5
         for _ in range(45): self.spawn_celestial_body("asteroid", min_dist_from_player=min_dist)
         for _ in range(7): self.spawn_celestial_body(
-            random.choice(["tech_debris_thruster", "tech_debris_shield", "tech_debris_weapon"]),
+            self.rng.choice(["tech_debris_thruster", "tech_debris_shield", "tech_debris_weapon"]),
             min_dist_from_player=min_dist)
         for _ in range(self.num_const_shards_win): self.spawn_celestial_body("constellation_shard",
                                                                              min_dist_from_player=min_dist)
         for _ in range(4): self.spawn_celestial_body("comet", min_dist_from_player=min_dist)
-        for _ in range(random.randint(3, 4)): self.nebula_clouds.append(
-            NebulaCloud(random.uniform(0, Game.WORLD_WIDTH), random.uniform(0, Game.WORLD_HEIGHT),
-                        random.uniform(200, 350)))
-        for _ in range(random.randint(2, 3)): self.singularities.append(
-            Singularity(random.uniform(0, Game.WORLD_WIDTH), random.uniform(0, Game.WORLD_HEIGHT),
-                        random.randint(10, 15), random.randint(70, 100)))
-        for _ in range(random.randint(3, 5)): self.enemy_drones.append(
-            EnemyDrone(random.uniform(0, Game.WORLD_WIDTH), random.uniform(0, Game.WORLD_HEIGHT)))
+        for _ in range(self.rng.randint(3, 4)): self.nebula_clouds.append(
+            NebulaCloud(self.rng.uniform(0, Game.WORLD_WIDTH), self.rng.uniform(0, Game.WORLD_HEIGHT),
+                        self.rng.uniform(200, 350), rng=self.rng))
+        for _ in range(self.rng.randint(2, 3)): self.singularities.append(
+            Singularity(self.rng.uniform(0, Game.WORLD_WIDTH), self.rng.uniform(0, Game.WORLD_HEIGHT),
+                        self.rng.randint(10, 15), self.rng.randint(70, 100), self.rng))
+        for _ in range(self.rng.randint(3, 5)): self.enemy_drones.append(
+            EnemyDrone(self.rng.uniform(0, Game.WORLD_WIDTH), self.rng.uniform(0, Game.WORLD_HEIGHT), self.rng))
 
     def spawn_celestial_body(self, item_type, position=None, min_dist_from_player=0):
-        r_map = {"asteroid": random.randint(10, 25), "tech_debris_thruster": 10, "tech_debris_shield": 10,
+        r_map = {"asteroid": self.rng.randint(10, 25), "tech_debris_thruster": 10, "tech_debris_shield": 10,
                  "tech_debris_weapon": 10, "constellation_shard": 12, "comet": 8}
-        c_map = {"asteroid": random.choice(ASTEROID_COLORS), "tech_debris_thruster": TECH_DEBRIS_THRUSTER_COLOR,
+        c_map = {"asteroid": self.rng.choice(ASTEROID_COLORS), "tech_debris_thruster": TECH_DEBRIS_THRUSTER_COLOR,
                  "tech_debris_shield": TECH_DEBRIS_SHIELD_COLOR,
                  "tech_debris_weapon": TECH_DEBRIS_WEAPON_COLOR, "constellation_shard": CONSTELLATION_SHARD_COLOR,
                  "comet": COMET_CORE_COLOR}
         v_map = {"asteroid": 1, "tech_debris_thruster": 5, "tech_debris_shield": 5, "tech_debris_weapon": 5,
                  "constellation_shard": 20, "comet": 15}
         custom_vel = None
-        if item_type == "comet": angle = random.uniform(0, 2 * math.pi);speed = random.uniform(4, 8);custom_vel = (
+        if item_type == "comet": angle = self.rng.uniform(0, 2 * math.pi);speed = self.rng.uniform(4, 8);custom_vel = (
             math.cos(angle) * speed, math.sin(angle) * speed)
         if position is None:
             spawn_attempts = 0
             while spawn_attempts < 50:
-                x = random.uniform(0, Game.WORLD_WIDTH);
-                y = random.uniform(0, Game.WORLD_HEIGHT)
-                if distance((x, y), (self.player.head.x, self.player.head.y)) > min_dist_from_player: break
+                x = self.rng.uniform(0, Game.WORLD_WIDTH);
+                y = self.rng.uniform(0, Game.WORLD_HEIGHT)
+                if distance_sq(x, y, self.player.head.x, self.player.head.y, Game.WORLD_WIDTH,
+                               Game.WORLD_HEIGHT) > min_dist_from_player * min_dist_from_player: break
                 spawn_attempts += 1
-            if spawn_attempts == 50: x = random.uniform(0, Game.WORLD_WIDTH);y = random.uniform(0, Game.WORLD_HEIGHT)
+            if spawn_attempts == 50:
+                x = self.rng.uniform(0, Game.WORLD_WIDTH);y = self.rng.uniform(0, Game.WORLD_HEIGHT)
         else:
             x, y = position
-        new_body = CelestialBody(x, y, r_map[item_type], c_map[item_type], item_type, v_map[item_type], custom_vel)
+        new_body = CelestialBody(x, y, r_map[item_type], c_map[item_type], item_type, v_map[item_type], custom_vel,
+                                 self.rng)
         self.celestial_bodies.append(new_body)
 
+    def rebuild_spatial_hashes(self):
+        self.body_hash.clear()
+        for i, body in enumerate(self.celestial_bodies): self.body_hash.insert(i, body.x, body.y, body.radius)
+        self.segment_hash.clear()
+        chain = self.player.segments
+        for i, (x, y, radius) in enumerate(zip(chain.xs, chain.ys, chain.radii)):
+            self.segment_hash.insert(i, x, y, radius)
+        self.drone_hash.rebuild(self.enemy_drones)
+        self.singularity_hash.rebuild(self.singularities, lambda s_obj: s_obj.event_horizon_radius)
+
     def update_camera(self):
         tx = self.player.head.x - SCREEN_WIDTH / 2;
         ty = self.player.head.y - SCREEN_HEIGHT / 2;
@@ -786,167 +1117,197 @@ class Game:
         self.screen.blit(score_t, (SCREEN_WIDTH // 2 - score_t.get_width() // 2, SCREEN_HEIGHT // 3 + 70))
         restart_t = self.font.render("R: Restart | Q: Menu", True, WHITE_COLOR);
         self.screen.blit(restart_t, (SCREEN_WIDTH // 2 - restart_t.get_width() // 2, SCREEN_HEIGHT // 3 + 120))
-        pygame.display.flip();
-        waiting = True
-        while waiting:
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT: pygame.event.post(pygame.event.Event(pygame.QUIT));return
-                if ev.type == pygame.KEYDOWN:
-                    if ev.key == pygame.K_q: self.game_over_flag = True;waiting = False
-                    if ev.key == pygame.K_r: self.reset_game();waiting = False
-            self.clock.tick(FPS)
+
+    def step(self, inputs):
+        # Advances the simulation by one tick. Returns False when the player leaves for the menu.
+        if inputs.quit: return False
+        self.profiler = handle_profiler_keys(self.profiler, inputs.keydowns)
+        if self.game_over_flag or self.win_flag:
+            for key in inputs.keydowns:
+                if key == pygame.K_q: return False
+                if key == pygame.K_r: self.reset_game();break
+            return True
+
+        for key in inputs.keydowns:
+            if key == pygame.K_p: self.paused = not self.paused
+            if self.paused: continue
+            if key == pygame.K_LSHIFT: self.player.toggle_shield()
+            if key == pygame.K_ESCAPE: return False
+
+        if self.paused: return True
+
+        self.profiler.begin()
+        self.previous_camera = (self.camera_x, self.camera_y)
+        self.position_history.record(self.moving_objects())
+        self.player.update(inputs.held, self.projectiles, self.particle_system)
+        self.update_camera();
+        self.profiler.lap("update.player")
+        self.particle_system.update()
+        for nebula in self.nebula_clouds: nebula.update()
+        self.starfield.update()
+        self.profiler.lap("particles.update")
+        self.player.in_nebula_slow = any(
+            n.is_inside(self.player.head.x, self.player.head.y) for n in self.nebula_clouds)
+
+        # Gravity wells and the drones' aggro range are simulated at full rate wherever the camera is
+        self.active_region.begin_tick(self.camera_x + SCREEN_WIDTH / 2, self.camera_y + SCREEN_HEIGHT / 2,
+                                      [(self.player.head.x, self.player.head.y, PLAYER_WELL_RADIUS)] +
+                                      [(s_obj.x, s_obj.y, SINGULARITY_WELL_RADIUS) for s_obj in self.singularities])
+        gravity_sources = [(self.player.head.x, self.player.head.y, self.player.mass, "player")]
+        for s_obj in self.singularities: gravity_sources.append((s_obj.x, s_obj.y, s_obj.gravity_mass, "black_hole"))
+        for s_obj, dt in self.active_region.schedule(self.singularities): s_obj.update(self.particle_system, dt)
+        self.profiler.lap("update.singularities")
+
+        due_bodies = self.active_region.schedule(self.celestial_bodies)
+        update_celestial_bodies([body for body, _ in due_bodies], gravity_sources, self.nebula_clouds,
+                                self.particle_system, [dt for _, dt in due_bodies])
+        self.profiler.lap("update.body_physics")
+
+        drones_to_remove = [];
+        for drone in self.enemy_drones:
+            dt = self.active_region.step_of(drone.x, drone.y, self.active_region.slot_of(drone))
+            alive = drone.update((self.player.head.x, self.player.head.y), self.projectiles, self.particle_system,
+                                 dt) if dt else drone.health > 0
+            if not alive:
+                self.particle_system.emit(drone.x, drone.y, 30, (200, 100, 220, 200), 5, 30,
+                                          velocity_x_range=(-2, 2), velocity_y_range=(-2, 2), shrink_rate=0.15)
+                self.particle_system.emit(drone.x, drone.y, 20, (100, 100, 100, 150), 7, 40,
+                                          velocity_x_range=(-1, 1), velocity_y_range=(-1, 1), shrink_rate=0.05)
+                self.spawn_celestial_body(
+                    self.rng.choice(
+                        ["asteroid", "tech_debris_thruster", "tech_debris_shield", "tech_debris_weapon"]),
+                    (drone.x, drone.y))
+                drones_to_remove.append(drone)
+        for d in drones_to_remove: self.enemy_drones.remove(d)
+        self.profiler.lap("update.drones")
+
+        self.rebuild_spatial_hashes()
+        self.profiler.lap("collision.hash")
+
+        active_projectiles = []
+        for p in self.projectiles:
+            if p.update():
+                collided = False
+                # Projectiles fly off the world edge rather than wrapping, so their hits use the unwrapped within()
+                if p.owner_type == "player":
+                    for drone in self.drone_hash.query(p.x, p.y, p.radius):
+                        if within(p.x, p.y, drone.x, drone.y, p.radius + drone.radius): drone.take_damage(
+                            p.damage, self.particle_system);collided = True;break
+                elif p.owner_type == "enemy":
+                    for seg_idx in self.segment_hash.query(p.x, p.y, p.radius):
+                        if seg_idx >= len(self.player.segments): continue  # Lost to an earlier hit this tick
+                        segment = self.player.segments[seg_idx]
+                        if within(p.x, p.y, segment.x, segment.y, p.radius + segment.radius):
+                            if self.player.take_damage(p.damage,
+                                                       self.particle_system): self.game_over_flag = True;self.game_over_reason = "Killed by enemy drone!"
+                            collided = True;
+                            break
+                if not collided: active_projectiles.append(p)
+        self.projectiles = active_projectiles
+        self.profiler.lap("collision.projectiles")
+
+        if self.game_over_flag: return True  # Skip the rest of the tick if game over by projectile
+
+        bodies_to_remove_indices = []
+        for i in self.body_hash.query(self.player.head.x, self.player.head.y, self.player.head.radius):
+            body = self.celestial_bodies[i]
+            if in_reach(self.player.head.x, self.player.head.y, body.x, body.y, self.player.head.radius + body.radius):
+                ate_comet = False  # Initialize for each collision check
+                if body.type == "asteroid":
+                    self.player.grow("generic")
+                elif body.type == "tech_debris_thruster":
+                    self.player.grow("thruster")
+                elif body.type == "tech_debris_shield":
+                    self.player.grow("shield")
+                elif body.type == "tech_debris_weapon":
+                    self.player.grow("weapon")
+                elif body.type == "comet":
+                    self.player.comet_speed_boost_timer = 5 * FPS;
+                    self.score += body.value;  # Comets also give score
+                    ate_comet = True;  # Mark as comet so it's not added to removal list below
+                    self.particle_system.emit(
+                        body.x, body.y, 30, COMET_CORE_COLOR[:3] + (200,), 5, 25, velocity_x_range=(-2, 2),
+                        velocity_y_range=(-2, 2))
+                elif body.type == "constellation_shard":
+                    self.const_shards_collected += 1;
+                    # Score for shard is added below if not ate_comet
+                    if self.const_shards_collected >= self.num_const_shards_win: self.win_flag = True
+
+                if not ate_comet:  # All non-comet consumables
+                    self.score += body.value;
+                    bodies_to_remove_indices.append(i)
+                    self.particle_system.emit(body.x, body.y, 10, body.color[:3] + (180,), body.radius * 0.3, 15,
+                                              velocity_x_range=(-1, 1), velocity_y_range=(-1, 1))
+                    if self.rng.random() < 0.65 and not self.win_flag:
+                        nt_ch = ["asteroid"] * 6 + ["tech_debris_thruster", "tech_debris_shield",
+                                                    "tech_debris_weapon"]
+                        nt = "asteroid" if self.rng.random() > 0.25 else self.rng.choice(nt_ch)
+                        if self.rng.random() < 0.08: nt = "comet"
+                        self.spawn_celestial_body(nt, min_dist_from_player=SCREEN_WIDTH / 4)
+
+        for i in sorted(bodies_to_remove_indices, reverse=True):
+            if i < len(self.celestial_bodies):
+                del self.celestial_bodies[i]
+        self.profiler.lap("collision.pickups")
+
+        for s_obj in self.singularity_hash.query(self.player.head.x, self.player.head.y, self.player.head.radius):
+            if in_reach(self.player.head.x, self.player.head.y, s_obj.x, s_obj.y,
+                        s_obj.event_horizon_radius + self.player.head.radius):
+                self.game_over_flag = True
+                self.game_over_reason = "Consumed by a singularity!"
+                break  # Exit this loop, game_over_flag is set
+        self.profiler.lap("collision.singularities")
+        return True
+
+    def moving_objects(self):
+        return itertools.chain(self.player.segments, self.celestial_bodies, self.enemy_drones, self.projectiles)
+
+    def render(self, alpha=1.0):
+        # alpha: how far the clock is into the next tick; the camera and moving objects are drawn that far
+        # from their previous-tick positions
+        if self.game_over_flag or self.win_flag:
+            self.game_over_or_win_screen()
+            return
+        if self.paused:
+            pause_text = self.font.render("PAUSED", True, WHITE_COLOR);
+            self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
+                                          SCREEN_HEIGHT // 2 - pause_text.get_height() // 2))
+            return
+
+        self.profiler.begin()
+        cam_x, cam_y = self.camera_x, self.camera_y
+        if alpha < 1.0:
+            cam_x = lerp(self.previous_camera[0], cam_x, alpha);
+            cam_y = lerp(self.previous_camera[1], cam_y, alpha)
+        with self.position_history.interpolated(alpha, self.moving_objects()):
+            self.screen.fill(DEEP_SPACE_BLUE)
+            self.starfield.draw(self.screen, cam_x, cam_y)
+            for nebula in self.nebula_clouds: nebula.draw(self.screen, cam_x, cam_y)
+            self.profiler.lap("draw.background")
+            draw_celestial_bodies(self.screen, self.celestial_bodies, cam_x, cam_y)
+            for s_obj_draw in self.singularities: s_obj_draw.draw(self.screen, cam_x, cam_y)
+            self.profiler.lap("draw.bodies")
+
+            self.particle_system.draw(self.screen, cam_x, cam_y)
+            self.profiler.lap("draw.particles")
+
+            for drone in self.enemy_drones: drone.draw(self.screen, cam_x, cam_y)
+            for p in self.projectiles: p.draw(self.screen, cam_x, cam_y)
+            self.player.draw(self.screen, cam_x, cam_y)
+            self.profiler.lap("draw.actors")
+
+            if self.player.in_nebula_slow:  # Visual distortion in nebula
+                self.nebula_distortion.apply(self.screen, pygame.time.get_ticks())
+                self.profiler.lap("draw.nebula_distortion")
+
+        self.display_ui()
+        self.profiler.lap("draw.ui")
+
+    def debug_counts(self):
+        return {"particles": len(self.particle_system), "segments": len(self.player.segments),
+                "bodies": len(self.celestial_bodies), "drones": len(self.enemy_drones),
+                "projectiles": len(self.projectiles), "nebulas": len(self.nebula_clouds),
+                "frozen": self.active_region.counts["frozen"]}
 
     def run(self):
-        running = True
-        while running:
-            if self.game_over_flag or self.win_flag:
-                self.game_over_or_win_screen()
-                if self.game_over_flag or self.win_flag:  # Re-check because R might have been pressed
-                    return  # Exit run() method, back to main menu
-
-            keys = pygame.key.get_pressed()
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT: running = False
-                if ev.type == pygame.KEYDOWN:
-                    if ev.key == pygame.K_p: self.paused = not self.paused
-                    if self.paused: continue
-                    if ev.key == pygame.K_LSHIFT: self.player.toggle_shield()
-                    if ev.key == pygame.K_ESCAPE: running = False
-
-            if not running: break
-
-            if self.paused:
-                pause_text = self.font.render("PAUSED", True, WHITE_COLOR);
-                self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
-                                              SCREEN_HEIGHT // 2 - pause_text.get_height() // 2))
-                pygame.display.flip();
-                self.clock.tick(FPS);
-                continue
-
-            self.player.update(keys, self.projectiles, self.particle_system)
-            self.update_camera();
-            self.particle_system.update()
-            self.player.in_nebula_slow = any(
-                n.is_inside(self.player.head.x, self.player.head.y) for n in self.nebula_clouds)
-            visual_distortion_in_nebula = self.player.in_nebula_slow  # Define it here
-
-            gravity_sources = [(self.player.head.x, self.player.head.y, self.player.mass, "player")]
-            for s_obj in self.singularities: gravity_sources.append(
-                (s_obj.x, s_obj.y, s_obj.gravity_mass, "black_hole"));s_obj.update(self.particle_system)
-
-            for body in self.celestial_bodies:
-                body.update(gravity_sources, self.particle_system);
-                body.affected_by_nebula = any(n.is_inside(body.x, body.y) for n in self.nebula_clouds)
-                if body.affected_by_nebula: body.velocity = [v * 0.96 for v in body.velocity]
-
-            drones_to_remove = [];
-            for drone in self.enemy_drones:
-                if not drone.update((self.player.head.x, self.player.head.y), self.projectiles, self.particle_system):
-                    self.particle_system.emit(drone.x, drone.y, 30, (200, 100, 220, 200), 5, 30,
-                                              velocity_x_range=(-2, 2), velocity_y_range=(-2, 2), shrink_rate=0.15)
-                    self.particle_system.emit(drone.x, drone.y, 20, (100, 100, 100, 150), 7, 40,
-                                              velocity_x_range=(-1, 1), velocity_y_range=(-1, 1), shrink_rate=0.05)
-                    self.spawn_celestial_body(
-                        random.choice(["asteroid", "tech_debris_thruster", "tech_debris_shield", "tech_debris_weapon"]),
-                        (drone.x, drone.y))
-                    drones_to_remove.append(drone)
-            for d in drones_to_remove: self.enemy_drones.remove(d)
-
-            active_projectiles = []
-            for p in self.projectiles:
-                if p.update():
-                    collided = False
-                    if p.owner_type == "player":
-                        for drone_idx, drone in enumerate(self.enemy_drones):
-                            if distance((p.x, p.y), (drone.x, drone.y)) < p.radius + drone.radius: drone.take_damage(
-                                p.damage, self.particle_system);collided = True;break
-                    elif p.owner_type == "enemy":
-                        for seg_idx, segment in enumerate(self.player.segments):
-                            if distance((p.x, p.y), (segment.x, segment.y)) < p.radius + segment.radius:
-                                if self.player.take_damage(p.damage,
-                                                           self.particle_system): self.game_over_flag = True;self.game_over_reason = "Killed by enemy drone!"
-                                collided = True;
-                                break
-                    if not collided: active_projectiles.append(p)
-            self.projectiles = active_projectiles
-
-            if self.game_over_flag: continue  # Skip to top of loop if game over by projectile
-
-            bodies_to_remove_indices = []
-            for i, body in enumerate(self.celestial_bodies):
-                if distance((self.player.head.x, self.player.head.y),
-                            (body.x, body.y)) < self.player.head.radius + body.radius:
-                    ate_comet = False  # Initialize for each collision check
-                    if body.type == "asteroid":
-                        self.player.grow("generic")
-                    elif body.type == "tech_debris_thruster":
-                        self.player.grow("thruster")
-                    elif body.type == "tech_debris_shield":
-                        self.player.grow("shield")
-                    elif body.type == "tech_debris_weapon":
-                        self.player.grow("weapon")
-                    elif body.type == "comet":
-                        self.player.comet_speed_boost_timer = 5 * FPS;
-                        self.score += body.value;  # Comets also give score
-                        ate_comet = True;  # Mark as comet so it's not added to removal list below
-                        self.particle_system.emit(
-                            body.x, body.y, 30, COMET_CORE_COLOR[:3] + (200,), 5, 25, velocity_x_range=(-2, 2),
-                            velocity_y_range=(-2, 2))
-                    elif body.type == "constellation_shard":
-                        self.const_shards_collected += 1;
-                        # Score for shard is added below if not ate_comet
-                        if self.const_shards_collected >= self.num_const_shards_win: self.win_flag = True
-
-                    if not ate_comet:  # All non-comet consumables
-                        self.score += body.value;
-                        bodies_to_remove_indices.append(i)
-                        self.particle_system.emit(body.x, body.y, 10, body.color[:3] + (180,), body.radius * 0.3, 15,
-                                                  velocity_x_range=(-1, 1), velocity_y_range=(-1, 1))
-                        if random.random() < 0.65 and not self.win_flag:
-                            nt_ch = ["asteroid"] * 6 + ["tech_debris_thruster", "tech_debris_shield",
-                                                        "tech_debris_weapon"]
-                            nt = "asteroid" if random.random() > 0.25 else random.choice(nt_ch)
-                            if random.random() < 0.08: nt = "comet"
-                            self.spawn_celestial_body(nt, min_dist_from_player=SCREEN_WIDTH / 4)
-
-            for i in sorted(bodies_to_remove_indices, reverse=True):
-                if i < len(self.celestial_bodies):
-                    del self.celestial_bodies[i]
-
-            for s_obj in self.singularities:
-                if distance((self.player.head.x, self.player.head.y),
-                            (s_obj.x, s_obj.y)) < s_obj.event_horizon_radius + self.player.head.radius:
-                    self.game_over_flag = True
-                    self.game_over_reason = "Consumed by a singularity!"
-                    break  # Exit this loop, game_over_flag is set
-
-            # ---- Conditional Drawing and End-of-Loop Operations ----
-            if not self.game_over_flag and not self.win_flag:
-                self.screen.fill(DEEP_SPACE_BLUE)
-                for star in self.stars: star.draw(self.screen, self.camera_x, self.camera_y)
-                for nebula in self.nebula_clouds: nebula.update(); nebula.draw(self.screen, self.camera_x,
-                                                                               self.camera_y)
-                for body in self.celestial_bodies: body.draw(self.screen, self.camera_x, self.camera_y)
-                for s_obj_draw in self.singularities: s_obj_draw.draw(self.screen, self.camera_x, self.camera_y)
-
-                self.particle_system.draw(self.screen, self.camera_x, self.camera_y)
-
-                for drone in self.enemy_drones: drone.draw(self.screen, self.camera_x, self.camera_y)
-                for p in self.projectiles: p.draw(self.screen, self.camera_x, self.camera_y)
-                self.player.draw(self.screen, self.camera_x, self.camera_y)
-
-                if visual_distortion_in_nebula:
-                    distort_surface = self.screen.copy();
-                    distort_surface.set_alpha(20)
-                    for i_distort in range(0, SCREEN_HEIGHT, 20):
-                        offset_distort = int(math.sin(pygame.time.get_ticks() * 0.0025 + i_distort * 0.07) * 6)
-                        try:
-                            self.screen.blit(distort_surface, (offset_distort, i_distort),
-                                             (0, i_distort, SCREEN_WIDTH, 20))
-                        except pygame.error:
-                            pass
-
-                self.display_ui()
-                pygame.display.flip()
-
-            self.clock.tick(FPS)
\ No newline at end of file
+        run_fixed_timestep(self, FPS)
@@ -0,0 +1,93 @@
+import math
+
+
+def wrap_delta(delta, size):
+    # Shortest signed offset along an axis that wraps every `size` units
+    if delta > size / 2: return delta - size
+    if delta < -size / 2: return delta + size
+    return delta
+
+
+def distance_sq(x1, y1, x2, y2, world_width=None, world_height=None):
+    dx = x2 - x1;
+    dy = y2 - y1
+    if world_width: dx = wrap_delta(dx, world_width)
+    if world_height: dy = wrap_delta(dy, world_height)
+    return dx * dx + dy * dy
+
+
+def within(x1, y1, x2, y2, reach, world_width=None, world_height=None):
+    """True if the two points are closer than reach (strictly), without a sqrt.
+
+    Each axis is checked against reach first (an AABB test) so far-apart pairs are rejected after
+    one subtraction. Passing the world size makes the offsets wrap like the world does.
+    """
+    dx = x2 - x1
+    if dx < 0: dx = -dx
+    if world_width and dx > world_width / 2: dx = world_width - dx  # Inlined wrap_delta, on |dx|
+    if dx >= reach: return False
+    dy = y2 - y1
+    if dy < 0: dy = -dy
+    if world_height and dy > world_height / 2: dy = world_height - dy
+    if dy >= reach: return False
+    return dx * dx + dy * dy < reach * reach
+
+
+class SpatialHash:
+    """Uniform grid over a wrapping (toroidal) world for broad-phase collision queries.
+
+    Items are inserted once per tick at their centre; query(x, y, radius) returns every item whose
+    cell lies within radius + the largest radius inserted so far, so callers still do the exact
+    distance test. Cells wrap at the world edges, and results come back in insertion order so
+    "first hit wins" loops behave like the linear scans they replace.
+    """
+
+    def __init__(self, world_width, world_height, cell_size=128):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.cols = max(1, int(world_width // cell_size))
+        self.rows = max(1, int(world_height // cell_size))
+        self.cell_width = world_width / self.cols
+        self.cell_height = world_height / self.rows
+        self.cells = {}
+        self.max_radius = 0.0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self.cells.clear()
+        self.max_radius = 0.0
+        self._count = 0
+
+    def cell_of(self, x, y):
+        return int(x // self.cell_width) % self.cols, int(y // self.cell_height) % self.rows
+
+    def insert(self, item, x, y, radius=0.0):
+        key = self.cell_of(x, y)
+        bucket = self.cells.get(key)
+        if bucket is None: self.cells[key] = bucket = []
+        bucket.append((self._count, item))
+        self._count += 1
+        if radius > self.max_radius: self.max_radius = radius
+
+    def rebuild(self, items, radius_of=lambda item: item.radius):
+        self.clear()
+        for item in items: self.insert(item, item.x, item.y, radius_of(item))
+
+    def _cell_span(self, low, high, size, count):
+        first = math.floor(low / size)
+        last = math.floor(high / size)
+        if last - first + 1 >= count: return range(count)
+        return [c % count for c in range(first, last + 1)]
+
+    def query(self, x, y, radius=0.0):
+        reach = radius + self.max_radius
+        found = []
+        for cy in self._cell_span(y - reach, y + reach, self.cell_height, self.rows):
+            for cx in self._cell_span(x - reach, x + reach, self.cell_width, self.cols):
+                bucket = self.cells.get((cx, cy))
+                if bucket: found.extend(bucket)
+        found.sort(key=lambda entry: entry[0])
+        return [item for _, item in found]
@@ -0,0 +1,76 @@
+import pygame
+
+DIRTY_TILE = 40  # Changed areas are tracked in 40x40 px tiles (2x2 cells in the grid modes)
+FULL_FLIP_FRACTION = 0.6  # Past this share of dirty tiles one flip beats many small updates
+MAX_TRACKED_RECTS = 256  # Beyond this many rects in one call only their bounding box is marked
+
+
+class DirtyRects:
+    """Tracks which parts of the display changed this frame so only those are pushed to the window.
+
+    The frame is still drawn in full; a mode then marks every area it drew something into that can
+    differ from the previous frame (moving snakes, pulsing food, particles, the HUD). present()
+    updates the tiles marked this frame or the last one, which is where anything was erased. After
+    invalidate() (first frame, full-screen effects, menus) or when most tiles are dirty it falls back
+    to pygame.display.flip().
+    """
+
+    def __init__(self, size, tile=DIRTY_TILE, full_flip_fraction=FULL_FLIP_FRACTION):
+        self.bounds = pygame.Rect((0, 0), size)
+        self.tile = tile
+        self.cols = -(-size[0] // tile)
+        self.rows = -(-size[1] // tile)
+        self.full_flip_tiles = int(self.cols * self.rows * full_flip_fraction)
+        self.current = set()
+        self.previous = set()
+        self.full = True
+        self.previous_full = False
+
+    def invalidate(self):
+        self.full = True
+
+    def mark(self, rect):
+        rect = self.bounds.clip(rect)
+        if not rect.width or not rect.height: return
+        tile = self.tile
+        for ty in range(rect.top // tile, (rect.bottom - 1) // tile + 1):
+            for tx in range(rect.left // tile, (rect.right - 1) // tile + 1):
+                self.current.add((tx, ty))
+
+    def mark_rects(self, rects):
+        if len(rects) > MAX_TRACKED_RECTS:
+            self.mark(rects[0].unionall(rects[1:]))
+            return
+        for rect in rects: self.mark(rect)
+
+    def mark_cells(self, cells, cell_size, margin=0):
+        # Grid cells (x, y) in cell units; margin grows each cell's rect for effects that spill over it
+        if not margin and self.tile % cell_size == 0:  # Each cell lies in exactly one tile
+            per_tile = self.tile // cell_size
+            self.current.update((x // per_tile, y // per_tile) for x, y in cells)
+            return
+        for x, y in cells:
+            self.mark((x * cell_size - margin, y * cell_size - margin, cell_size + margin * 2, cell_size + margin * 2))
+
+    def rects(self, tiles):
+        # One Rect per horizontal run of dirty tiles
+        merged = []
+        tile = self.tile
+        for ty, tx in sorted((ty, tx) for tx, ty in tiles):
+            last = merged[-1] if merged else None
+            if last is not None and last.top == ty * tile and last.right == tx * tile:
+                last.width += tile
+            else:
+                merged.append(pygame.Rect(tx * tile, ty * tile, tile, tile))
+        return [rect.clip(self.bounds) for rect in merged]
+
+    def present(self):
+        tiles = self.current | self.previous
+        if self.full or self.previous_full or len(tiles) > self.full_flip_tiles:
+            pygame.display.flip()  # A full-screen frame also has to be fully erased on the next one
+        elif tiles:
+            pygame.display.update(self.rects(tiles))
+        self.previous = self.current
+        self.current = set()
+        self.previous_full = self.full
+        self.full = False
@@ -0,0 +1,172 @@
+from collections import deque
+from itertools import islice
+
+
+class FreeCellIndex:
+    """The cells of a grid nobody occupies, for O(1) uniform sampling of an empty cell.
+
+    Cells are flat indices (y * width + x). The free ones are kept packed in a list, with each
+    cell's slot in it (-1 once taken), so take() swaps the last free cell into the vacated slot and
+    release() appends: both O(1), and sample() is a single random pick however full the board is.
+    """
+
+    def __init__(self, size):
+        self.cells = list(range(size))
+        self.slots = list(range(size))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def take(self, index):
+        slot = self.slots[index]
+        if slot < 0: return
+        last = self.cells.pop()
+        if last != index:
+            self.cells[slot] = last
+            self.slots[last] = slot
+        self.slots[index] = -1
+
+    def release(self, index):
+        if self.slots[index] >= 0: return
+        self.slots[index] = len(self.cells)
+        self.cells.append(index)
+
+    def sample(self, rng):
+        # A uniformly chosen free index, or None when there are none
+        if not self.cells: return None
+        return self.cells[rng.randrange(len(self.cells))]
+
+    def copy(self):
+        other = FreeCellIndex(0)
+        other.cells = list(self.cells)
+        other.slots = list(self.slots)
+        return other
+
+
+class OccupancyGrid:
+    """Per-cell occupant counts for a wrapping grid of width x height cells, in a flat bytearray.
+
+    Owners keep it in step with their bodies as they change (add the new head, remove the vacated
+    tail) so "is this cell taken" and "does anything else share the head's cell" are O(1) lookups
+    however long the body is. Counts rather than flags, because segments can stack on one cell
+    (a freshly grown tail, a snake folding through itself while phasing); being bytes, they top out at
+    255 per cell, and add() past that raises ValueError. Cells are (x, y) tuples
+    already wrapped into the grid. A FreeCellIndex of the empty cells is kept alongside, updated as
+    cells go from and back to a count of 0, for random_free_cell().
+    """
+
+    def __init__(self, width, height, cells=()):
+        self.width = width
+        self.height = height
+        self.counts = bytearray(width * height)
+        self.free = FreeCellIndex(width * height)
+        self.add_all(cells)
+
+    def add(self, cell):
+        index = cell[1] * self.width + cell[0]
+        if not self.counts[index]: self.free.take(index)
+        self.counts[index] += 1
+
+    def remove(self, cell):
+        index = cell[1] * self.width + cell[0]
+        self.counts[index] -= 1
+        if not self.counts[index]: self.free.release(index)
+
+    def add_all(self, cells):
+        for cell in cells: self.add(cell)
+
+    def remove_all(self, cells):
+        for cell in cells: self.remove(cell)
+
+    def count(self, cell):
+        return self.counts[cell[1] * self.width + cell[0]]
+
+    def __contains__(self, cell):
+        return self.counts[cell[1] * self.width + cell[0]] > 0
+
+    def random_free_cell(self, rng):
+        # A uniformly chosen empty cell, or None when the grid is full
+        index = self.free.sample(rng)
+        if index is None: return None
+        return index % self.width, index // self.width
+
+    def clear(self):
+        self.counts = bytearray(self.width * self.height)
+        self.free = FreeCellIndex(self.width * self.height)
+
+    def copy(self):
+        other = OccupancyGrid(self.width, self.height)
+        other.counts = bytearray(self.counts)
+        other.free = self.free.copy()
+        return other
+
+
+class SnakeBody:
+    """A grid snake's cells, head first, in a deque with an OccupancyGrid kept in step.
+
+    advance() pushes the new head and, unless the snake is growing, drops the tail, both O(1), so a
+    long snake costs no more per tick than a short one. The body as it was before the last advance
+    (for drawing between ticks) is not copied every tick; previous() rebuilds it on demand from the
+    current cells and the vacated tail. Indexing, iteration and len() work as on the list it replaces;
+    `in`, count() and random_free_cell() go through the occupancy grid.
+    """
+
+    def __init__(self, width, height, cells=()):
+        self.cells = deque(cells)
+        self.occupancy = OccupancyGrid(width, height, self.cells)
+        self._advanced = False  # previous() is the current body until the first advance
+        self._vacated = None  # Tail dropped by the last advance, None if the snake grew
+        self._previous = None  # previous(), materialised when a segment is removed mid-body
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __contains__(self, cell):
+        return cell in self.occupancy
+
+    def count(self, cell):
+        return self.occupancy.count(cell)
+
+    def random_free_cell(self, rng):
+        return self.occupancy.random_free_cell(rng)
+
+    def advance(self, head, grow=False):
+        # Returns the vacated tail cell, or None when growing
+        self.cells.appendleft(head)
+        self.occupancy.add(head)
+        self._vacated = None
+        if not grow:
+            self._vacated = self.cells.pop()
+            self.occupancy.remove(self._vacated)
+        self._advanced = True
+        self._previous = None
+        return self._vacated
+
+    def previous(self):
+        # Segment i's cell before the last advance; segments grown since have no entry
+        if self._previous is not None: return self._previous
+        if not self._advanced: return list(self.cells)
+        previous = list(islice(self.cells, 1, None))
+        if self._vacated is not None: previous.append(self._vacated)
+        return previous
+
+    def remove_at(self, index):
+        # Drops one segment from anywhere in the body (O(n), for rare events like detaching)
+        previous = self.previous()
+        if index < len(previous): del previous[index]
+        cell = self.cells[index]
+        del self.cells[index]
+        self.occupancy.remove(cell)
+        self._previous = previous
+        return cell
+
+    def truncate(self, length):
+        while len(self.cells) > length: self.occupancy.remove(self.cells.pop())
+        self._advanced = False
+        self._previous = None
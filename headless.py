@@ -0,0 +1,112 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+import pygame
+
+from profiling import Profiler
+
+GAME_MODULES = {
+    "no_clip": "no_clip_snake",
+    "symbiotic": "symbiotic_anarchy_snake",
+    "ouroboros": "ouroboros_paradox_snake",
+    "bio": "bio_mechanical_snake",
+}
+
+
+class HeldKeys:
+    """Stand-in for pygame.key.get_pressed(): indexing with a key code says whether it is held."""
+
+    def __init__(self, keys=()):
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class InputFrame:
+    """Everything a Game.step() reads for one tick.
+
+    keydowns are the key codes pressed this tick (in event order), held is anything indexable by key
+    code (pygame.key.get_pressed() or HeldKeys), and quit is set when the window was closed.
+    """
+
+    def __init__(self, keydowns=(), held=None, quit=False):
+        self.keydowns = tuple(keydowns)
+        self.held = held if held is not None else HeldKeys()
+        self.quit = quit
+
+
+IDLE = InputFrame()
+
+
+def poll_input():
+    keydowns = []
+    quit_requested = False
+    held = pygame.key.get_pressed()
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            quit_requested = True
+        elif event.type == pygame.KEYDOWN:
+            keydowns.append(event.key)
+    return InputFrame(keydowns, held, quit_requested)
+
+
+def is_finished(game):
+    return bool(getattr(game, "game_over_flag", False) or getattr(game, "win_flag", False) or
+                getattr(game, "level_cleared", False))
+
+
+def restart_when_finished(game, tick):
+    return InputFrame((pygame.K_r,)) if is_finished(game) else IDLE
+
+
+def run_headless(game, ticks, inputs=None, render=False):
+    """Step game up to `ticks` times as fast as possible and return how many ticks actually ran.
+
+    inputs may be None (no keys), a sequence of InputFrames indexed by tick (idle once exhausted) or a
+    callable(game, tick) -> InputFrame. Stops early if step() asks to leave the game.
+    """
+    for tick in range(ticks):
+        if inputs is None:
+            frame = IDLE
+        elif callable(inputs):
+            frame = inputs(game, tick)
+        else:
+            frame = inputs[tick] if tick < len(inputs) else IDLE
+        if not game.step(frame):
+            return tick
+        if render:
+            game.render()
+        game.profiler.end_frame()
+    return ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Snake 2 mode without a window, as fast as possible.")
+    parser.add_argument("mode", choices=sorted(GAME_MODULES))
+    parser.add_argument("--ticks", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--render", action="store_true", help="also draw every tick to an offscreen surface")
+    parser.add_argument("--restart", action="store_true", help="press R whenever the run ends")
+    parser.add_argument("--profile-csv", metavar="PATH", help="time named sections and write them to a CSV")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    game_module = importlib.import_module(GAME_MODULES[args.mode])
+    game = game_module.Game(seed=args.seed, headless=True)
+    if args.profile_csv: game.profiler = Profiler()
+
+    start = time.perf_counter()
+    ran = run_headless(game, args.ticks, restart_when_finished if args.restart else None, args.render)
+    elapsed = time.perf_counter() - start
+    print(f"{args.mode}: {ran} ticks in {elapsed:.3f}s ({ran / max(elapsed, 1e-9):.0f} ticks/s)")
+    if args.profile_csv: game.profiler.write_csv(args.profile_csv)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
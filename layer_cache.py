@@ -0,0 +1,48 @@
+import pygame
+
+from sprite_cache import SpriteCache
+
+LAYER_CACHE_CAPACITY = 16  # Screen-sized layers are megabytes each, and a mode only uses a handful
+
+LAYERS = SpriteCache(LAYER_CACHE_CAPACITY)  # Shared by every mode and Game instance
+
+
+def _opaque(surface):
+    # Match the window's pixel format so the per-frame blit is a straight copy; headless runs have no window
+    return surface.convert() if pygame.display.get_surface() else surface
+
+
+def grid_background(size, fill, spacing, line_color):
+    """Opaque size background: fill, with line_color (alpha allowed) lines every spacing px from 0.
+
+    Built once per (size, fill, spacing, line_color) and reused, so a static backdrop costs one blit
+    a frame instead of a screen-sized allocation plus a line per row and column.
+    """
+
+    def render():
+        width, height = size
+        lines = pygame.Surface(size, pygame.SRCALPHA)
+        for x in range(0, width, spacing): pygame.draw.line(lines, line_color, (x, 0), (x, height))
+        for y in range(0, height, spacing): pygame.draw.line(lines, line_color, (0, y), (width, y))
+        background = pygame.Surface(size)
+        background.fill(fill)
+        background.blit(lines, (0, 0))
+        return _opaque(background)
+
+    return LAYERS.get(("grid_background", tuple(size), fill, spacing, line_color), render)
+
+
+def tint(size, color, alpha):
+    """Solid size layer of color at surface alpha `alpha`, for full-screen washes that fade in and out.
+
+    One opaque layer per (size, color) is kept; its alpha is set on every call, so blit it right away.
+    """
+    layer = LAYERS.get(("tint", tuple(size), color), lambda: _opaque(_solid(size, color)))
+    layer.set_alpha(alpha)
+    return layer
+
+
+def _solid(size, color):
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    return surface
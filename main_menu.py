@@ -1,7 +1,8 @@
 import pygame
 import sys
 import math  # For math functions like sin, pi, sqrt
-import random  # For random choices and numbers
+
+from starfield import Starfield
 
 # Import the game modes (ensure these files exist and are correct)
 try:
@@ -18,6 +19,8 @@ except ImportError as e:
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+MENU_STAR_BANDS = ((0.15, 34), (0.3, 33), (0.45, 33))  # (fall speed in px/frame, stars)
+MENU_STAR_COLORS = [(100, 100, 120), (150, 150, 180), (200, 200, 220)]
 
 # Colors - Theme: Dark Space with Neon/Cyber Accents
 COLOR_BACKGROUND = (10, 10, 30)
@@ -217,13 +220,10 @@ class MainMenu:
         self.current_tutorial_key = None
         self.current_tutorial_page = 0
 
-        self.stars = []
-        for _ in range(100):
-            self.stars.append({
-                'x': random.randint(0, SCREEN_WIDTH), 'y': random.randint(0, SCREEN_HEIGHT),
-                'size': random.randint(1, 2), 'speed': random.uniform(0.1, 0.5),
-                'color': random.choice([(100, 100, 120), (150, 150, 180), (200, 200, 220)])
-            })
+        # Stars drift down at 0.1-0.5 px/frame: three bands scrolled by a camera moving up one px per frame
+        self.starfield = Starfield((SCREEN_WIDTH, SCREEN_HEIGHT), MENU_STAR_BANDS, MENU_STAR_COLORS, sizes=(1, 2),
+                                   twinkle=False)
+        self.starfield_scroll = 0
         self.setup_main_menu()
 
     def _create_menu(self, items_data, start_y, item_spacing, font, item_width=400, item_height=55):
@@ -377,12 +377,8 @@ class MainMenu:
         for item in self.menu_items: item.draw(self.screen)
 
     def draw_starfield(self):
-        for star in self.stars:
-            star['y'] += star['speed']
-            if star['y'] > SCREEN_HEIGHT:
-                star['y'] = 0;
-                star['x'] = random.randint(0, SCREEN_WIDTH)
-            pygame.draw.circle(self.screen, star['color'], (int(star['x']), int(star['y'])), star['size'])
+        self.starfield_scroll -= 1
+        self.starfield.draw(self.screen, 0, self.starfield_scroll)
 
     def run(self):
         menu_running = True
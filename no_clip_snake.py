@@ -3,6 +3,12 @@ import pygame
 import random
 import sys
 
+from dirty_rects import DirtyRects
+from grid import OccupancyGrid, SnakeBody
+from layer_cache import tint
+from profiling import NULL_PROFILER, handle_profiler_keys
+from timestep import interpolate_cells, run_fixed_timestep
+
 # Attempt to import ParticleSystem, if not found, define it (for standalone running)
 try:
     from particles import Particle, ParticleSystem
@@ -22,15 +28,17 @@ except ImportError:
 
 
     class ParticleSystem:  # Placeholder
-        def __init__(self): self.particles = []
+        def __init__(self, *args, **kwargs): self.particles = []
 
         def emit(self, *args, **kwargs): pass
 
         def update(self): pass
 
-        def draw(self, *args, **kwargs): pass
+        def draw(self, *args, return_rects=False, **kwargs): return [] if return_rects else None
 
         def clear(self): pass
+
+        def __len__(self): return len(self.particles)
     # --- End of pasted Particle classes ---
 
 # --- Constants ---
@@ -40,6 +48,8 @@ GRID_SIZE = 20
 GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
 FPS = 12  # Slightly increased FPS for smoother particles
+HUD_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, 100)  # Everything display_ui draws lies in this band
+FOOD_GLOW_MARGIN = 4  # Ghost food glow reaches this far past its cell
 
 # Colors
 BLACK = (0, 0, 0)
@@ -60,9 +70,10 @@ RIGHT = (1, 0)
 
 
 class Snake:
-    def __init__(self):
-        self.body = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-        self.direction = random.choice([UP, DOWN, LEFT, RIGHT])
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.body = SnakeBody(GRID_WIDTH, GRID_HEIGHT, [(GRID_WIDTH // 2, GRID_HEIGHT // 2)])
+        self.direction = self.rng.choice([UP, DOWN, LEFT, RIGHT])
         self.grow_pending = 0
         self.is_phasing = False
         self.phase_energy_max = 100
@@ -78,21 +89,27 @@ class Snake:
         head_x, head_y = self.body[0]
         dir_x, dir_y = self.direction
         new_head = ((head_x + dir_x) % GRID_WIDTH, (head_y + dir_y) % GRID_HEIGHT)
-        self.body.insert(0, new_head)
-
-        if self.grow_pending > 0:
-            self.grow_pending -= 1
-        else:
-            self.body.pop()
+        self.body.advance(new_head, grow=self.grow_pending > 0)
+        if self.grow_pending > 0: self.grow_pending -= 1
         return True
 
+    @property
+    def previous_body(self):  # Body before the last move, for drawing between ticks
+        return self.body.previous()
+
+    def set_body(self, body):
+        self.body = SnakeBody(GRID_WIDTH, GRID_HEIGHT, body)
+
+    def truncate(self, length):
+        self.body.truncate(length)
+
     def grow(self, amount=1):
         self.grow_pending += amount
 
     def check_collision_self(self):
         if self.is_phasing:
             return False
-        return self.body[0] in self.body[1:]
+        return self.body.count(self.body[0]) > 1  # Another segment shares the head's cell
 
     def toggle_phase(self):
         if self.phase_energy > self.phasing_cost_per_tick or self.is_phasing:
@@ -120,12 +137,12 @@ class Snake:
             return True  # Reality Fracture
         return False
 
-    def draw(self, surface):
+    def draw(self, surface, alpha=1.0):
         color = LIGHT_BLUE_PHASE if self.is_phasing else GREEN
         dark_color = BLUE if self.is_phasing else DARK_GREEN
 
-        for i, segment in enumerate(self.body):
-            rect = pygame.Rect(segment[0] * GRID_SIZE, segment[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+        for i, segment in enumerate(interpolate_cells(self.previous_body, self.body, alpha, GRID_WIDTH, GRID_HEIGHT)):
+            rect = pygame.Rect(round(segment[0] * GRID_SIZE), round(segment[1] * GRID_SIZE), GRID_SIZE, GRID_SIZE)
             current_color = color if i % 2 == 0 else dark_color
             if i == 0:
                 pygame.draw.rect(surface, RED, rect)
@@ -138,24 +155,25 @@ class Snake:
 
 
 class Food:
-    def __init__(self):  # Removed food_type argument, will be set in spawn
+    def __init__(self, rng=random):  # Removed food_type argument, will be set in spawn
+        self.rng = rng
         self.position = (0, 0)
         self.type = "normal"
         self.color = YELLOW_FOOD
         self.radius_anim = 0  # For pulsing effect
         self.pulse_speed = 0.2
         self.max_pulse_offset = 2
-        self.spawn_randomly([])
+        self.spawn_randomly(OccupancyGrid(GRID_WIDTH, GRID_HEIGHT))
 
     def spawn_randomly(self, snake_body):
-        while True:
-            self.position = (random.randint(0, GRID_WIDTH - 1),
-                             random.randint(0, GRID_HEIGHT - 1))
-            if self.position not in snake_body:
-                break
-        self.type = "ghost" if random.random() < 0.35 else "normal"  # Slightly more ghost food
+        # snake_body: OccupancyGrid or SnakeBody. Returns False, leaving the food in place, if no cell is free
+        position = snake_body.random_free_cell(self.rng)
+        if position is None: return False
+        self.position = position
+        self.type = "ghost" if self.rng.random() < 0.35 else "normal"  # Slightly more ghost food
         self.color = PURPLE_GHOST_FOOD if self.type == "ghost" else YELLOW_FOOD
         self.radius_anim = 0
+        return True
 
     def update(self):
         self.radius_anim += self.pulse_speed
@@ -163,8 +181,6 @@ class Food:
             self.radius_anim -= math.pi * 2
 
     def draw(self, surface):
-        self.update()  # Update animation state
-
         center_x = self.position[0] * GRID_SIZE + GRID_SIZE // 2
         center_y = self.position[1] * GRID_SIZE + GRID_SIZE // 2
         base_radius = GRID_SIZE // 2 - 2
@@ -184,15 +200,22 @@ class Food:
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, headless=False):
+        self.seed = seed
+        self.headless = headless
+        self.rng = random.Random(seed)
         if not pygame.get_init():
             pygame.init()
-            if not pygame.mixer.get_init():  # Only init mixer if not already
+            if not pygame.mixer.get_init() and not headless:  # Only init mixer if not already
                 pygame.mixer.init()
 
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Snake 2: No-Clip Nightmare")
+        if headless:  # Offscreen target, no window needed
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Snake 2: No-Clip Nightmare")
         self.clock = pygame.time.Clock()
+        self.dirty = DirtyRects((SCREEN_WIDTH, SCREEN_HEIGHT))
 
         try:
             self.font = pygame.font.SysFont("Consolas", 24)
@@ -201,18 +224,20 @@ class Game:
             self.font = pygame.font.Font(None, 30)
             self.small_font = pygame.font.Font(None, 24)
 
-        self.particle_system = ParticleSystem()
+        self.particle_system = ParticleSystem(rng=self.rng)
+        self.profiler = NULL_PROFILER
         self.reset_game()
 
     def reset_game(self):
-        self.snake = Snake()
-        self.food = Food()
+        self.snake = Snake(self.rng)
+        self.food = Food(self.rng)
         # self.food.spawn_randomly(self.snake.body) # Already called in Food.__init__
         self.score = 0
         self.game_over_flag = False
         self.paused = False
         self.game_over_reason = ""
         self.particle_system.clear()
+        self.sickness_glitches = []  # Rolled by roll_sickness_glitches() each tick, drawn by apply_sickness_effects()
 
     def display_ui(self):
         # ... (UI drawing code remains largely the same)
@@ -242,39 +267,42 @@ class Game:
     def apply_sickness_effects(self):
         if self.snake.phasing_sickness > self.snake.phasing_sickness_max * 0.2:
             sickness_alpha_tint = int((self.snake.phasing_sickness / self.snake.phasing_sickness_max) * 70)
-            sickness_overlay_tint = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            sickness_overlay_tint.fill((200, 0, 50, sickness_alpha_tint))  # More purplish red
-            self.screen.blit(sickness_overlay_tint, (0, 0))
-
-            if self.snake.phasing_sickness > self.snake.phasing_sickness_max * 0.55 and random.random() < 0.25:
-                num_glitches = int((self.snake.phasing_sickness / self.snake.phasing_sickness_max) * 8) + 1
-                for _ in range(num_glitches):
-                    gx = random.randint(0, SCREEN_WIDTH - 30)
-                    gy = random.randint(0, SCREEN_HEIGHT - 10)
-                    gw = random.randint(10, 30)
-                    gh = random.randint(3, 10)
-
-                    if random.random() < 0.6:  # Shift block
-                        shift_x = random.randint(-8, 8)
-                        shift_y = random.randint(-5, 5)
-                        try:
-                            glitch_area_rect = pygame.Rect(gx, gy, gw, gh)
-                            glitch_area_rect.clamp_ip(self.screen.get_rect())  # Ensure it's within screen bounds
-                            if glitch_area_rect.width > 0 and glitch_area_rect.height > 0:
-                                glitch_area = self.screen.subsurface(glitch_area_rect).copy()
-                                self.screen.blit(glitch_area,
-                                                 (glitch_area_rect.x + shift_x, glitch_area_rect.y + shift_y))
-                        except ValueError:
-                            pass
-                    else:  # Color glitch block
-                        g_color = (random.randint(50, 200), random.randint(0, 50), random.randint(50, 200),
-                                   100)  # Glitchy purple/reds with alpha
-                        temp_surface = pygame.Surface((gw, gh), pygame.SRCALPHA)
-                        temp_surface.fill(g_color)
-                        self.screen.blit(temp_surface, (gx, gy))
+            self.dirty.invalidate()  # The tint and glitches cover the whole screen
+            self.screen.blit(tint(self.screen.get_size(), (200, 0, 50), sickness_alpha_tint), (0, 0))  # Purplish red
+
+            for glitch_area_rect, shift, g_color in self.sickness_glitches:
+                if shift is not None:  # Shift block
+                    try:
+                        glitch_area_rect = glitch_area_rect.clamp(self.screen.get_rect())  # Keep within the screen
+                        if glitch_area_rect.width > 0 and glitch_area_rect.height > 0:
+                            glitch_area = self.screen.subsurface(glitch_area_rect).copy()
+                            self.screen.blit(glitch_area, glitch_area_rect.move(shift))
+                    except ValueError:
+                        pass
+                else:  # Color glitch block
+                    temp_surface = pygame.Surface(glitch_area_rect.size, pygame.SRCALPHA)
+                    temp_surface.fill(g_color)
+                    self.screen.blit(temp_surface, glitch_area_rect.topleft)
+
+    def roll_sickness_glitches(self):
+        # Chosen once per tick with the seeded rng; every frame drawn until the next tick shows the same glitches
+        self.sickness_glitches = []
+        if self.snake.phasing_sickness > self.snake.phasing_sickness_max * 0.55 and self.rng.random() < 0.25:
+            num_glitches = int((self.snake.phasing_sickness / self.snake.phasing_sickness_max) * 8) + 1
+            for _ in range(num_glitches):
+                gx = self.rng.randint(0, SCREEN_WIDTH - 30)
+                gy = self.rng.randint(0, SCREEN_HEIGHT - 10)
+                gw = self.rng.randint(10, 30)
+                gh = self.rng.randint(3, 10)
+                if self.rng.random() < 0.6:  # Shift block
+                    shift = (self.rng.randint(-8, 8), self.rng.randint(-5, 5))
+                    self.sickness_glitches.append((pygame.Rect(gx, gy, gw, gh), shift, None))
+                else:  # Color glitch block
+                    g_color = (self.rng.randint(50, 200), self.rng.randint(0, 50), self.rng.randint(50, 200),
+                               100)  # Glitchy purple/reds with alpha
+                    self.sickness_glitches.append((pygame.Rect(gx, gy, gw, gh), None, g_color))
 
     def game_over_screen(self):  # Same as before, just ensure it doesn't quit pygame
-        # ... (game over screen logic) ...
         self.screen.fill(BLACK)
         title_text = self.font.render("GAME OVER", True, RED)
         reason_text = self.small_font.render(self.game_over_reason, True, YELLOW_FOOD)
@@ -285,139 +313,136 @@ class Game:
         self.screen.blit(reason_text, (SCREEN_WIDTH // 2 - reason_text.get_width() // 2, SCREEN_HEIGHT // 3 + 50))
         self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 3 + 80))
         self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 3 + 120))
-        pygame.display.flip()
-
-        waiting_for_input = True
-        while waiting_for_input:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    # Instead of pygame.quit(), signal main menu to handle full exit
-                    self.game_over_flag = True  # Keep it set
-                    pygame.event.post(pygame.event.Event(pygame.QUIT))  # Re-post QUIT for main_menu
-                    return  # Exit this screen, main game loop will see game_over_flag and QUIT
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
-                        self.game_over_flag = True  # Ensure it stays game over for main loop to exit
-                        waiting_for_input = False  # This will cause game_over_screen to return
-                    if event.key == pygame.K_r:
-                        self.reset_game()  # This sets self.game_over_flag to False
-                        waiting_for_input = False
-            self.clock.tick(FPS)
-        # If 'R' was pressed, self.game_over_flag is now False.
-        # If 'Q' was pressed, self.game_over_flag is True.
-
-    def run(self):
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                if event.type == pygame.KEYDOWN:
-                    if self.game_over_flag:
-                        if event.key == pygame.K_r:
-                            self.reset_game()
-                        elif event.key == pygame.K_q:
-                            running = False
-                        continue
-
-                    if event.key == pygame.K_p: self.paused = not self.paused
-                    if self.paused: continue
-
-                    if event.key == pygame.K_UP and self.snake.direction != DOWN:
-                        self.snake.direction = UP
-                    elif event.key == pygame.K_DOWN and self.snake.direction != UP:
-                        self.snake.direction = DOWN
-                    elif event.key == pygame.K_LEFT and self.snake.direction != RIGHT:
-                        self.snake.direction = LEFT
-                    elif event.key == pygame.K_RIGHT and self.snake.direction != LEFT:
-                        self.snake.direction = RIGHT
-                    elif event.key == pygame.K_SPACE:
-                        self.snake.toggle_phase()
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False
-
-            if not running: break
 
+    def step(self, inputs):
+        # Advances the simulation by one tick. Returns False when the player leaves for the menu.
+        if inputs.quit: return False
+        self.profiler = handle_profiler_keys(self.profiler, inputs.keydowns)
+        for key in inputs.keydowns:
             if self.game_over_flag:
-                self.game_over_screen()
-                # After game_over_screen, if self.game_over_flag is still true, it means Q was pressed
-                # or the screen was exited without pressing R.
-                if self.game_over_flag:
-                    running = False  # Exit to menu
-                # If R was pressed, game_over_flag is false, and loop continues
-                continue
-
-            if self.paused:
-                pause_text = self.font.render("PAUSED", True, YELLOW_FOOD)
-                self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
-                                              SCREEN_HEIGHT // 2 - pause_text.get_height() // 2))
-                pygame.display.flip();
-                self.clock.tick(FPS);
+                if key == pygame.K_r:
+                    self.reset_game()
+                elif key == pygame.K_q:
+                    return False
                 continue
 
-            # --- Game Logic Update ---
-            self.snake.move()
-
-            if self.snake.update_phase_mechanics():
-                self.game_over_flag = True
-                self.game_over_reason = "Reality Fracture: Sickness Overload!"
-
-            # Phasing particles
-            if self.snake.is_phasing and random.random() < 0.6:
-                for seg_idx, seg_pos in enumerate(self.snake.body):
-                    if random.random() < (0.05 + seg_idx * 0.005):  # More particles towards tail
-                        self.particle_system.emit(
-                            seg_pos[0] * GRID_SIZE + GRID_SIZE // 2 + random.uniform(-3, 3),
-                            seg_pos[1] * GRID_SIZE + GRID_SIZE // 2 + random.uniform(-3, 3),
-                            count=1, color=LIGHT_BLUE_PHASE[:3] + (random.randint(100, 180),),
-                            base_size=random.uniform(1.5, 3.5), base_lifespan=8,
-                            velocity_x_range=(-0.3, 0.3), velocity_y_range=(-0.3, 0.3),
-                            shrink_rate=0.25, fade_rate=20
-                        )
-
-            # Food collision
-            if self.snake.body[0] == self.food.position:
-                can_eat_food = (self.food.type == "normal") or \
-                               (self.food.type == "ghost" and self.snake.is_phasing)
-                if can_eat_food:
-                    self.snake.grow()
-                    self.score += 10 if self.food.type == "normal" else 25
-
-                    # Food eat particles
-                    food_center_x = self.food.position[0] * GRID_SIZE + GRID_SIZE // 2
-                    food_center_y = self.food.position[1] * GRID_SIZE + GRID_SIZE // 2
-                    particle_color = list(self.food.color)
-                    if len(particle_color) == 3:
-                        particle_color.append(220)
-                    else:
-                        particle_color[3] = 220
-
+            if key == pygame.K_p: self.paused = not self.paused
+            if self.paused: continue
+
+            if key == pygame.K_UP and self.snake.direction != DOWN:
+                self.snake.direction = UP
+            elif key == pygame.K_DOWN and self.snake.direction != UP:
+                self.snake.direction = DOWN
+            elif key == pygame.K_LEFT and self.snake.direction != RIGHT:
+                self.snake.direction = LEFT
+            elif key == pygame.K_RIGHT and self.snake.direction != LEFT:
+                self.snake.direction = RIGHT
+            elif key == pygame.K_SPACE:
+                self.snake.toggle_phase()
+            elif key == pygame.K_ESCAPE:
+                return False
+
+        if self.game_over_flag or self.paused: return True
+
+        self.profiler.begin()
+        self.snake.move()
+
+        if self.snake.update_phase_mechanics():
+            self.game_over_flag = True
+            self.game_over_reason = "Reality Fracture: Sickness Overload!"
+        self.profiler.lap("update.snake")
+
+        # Phasing particles
+        if self.snake.is_phasing and self.rng.random() < 0.6:
+            for seg_idx, seg_pos in enumerate(self.snake.body):
+                if self.rng.random() < (0.05 + seg_idx * 0.005):  # More particles towards tail
                     self.particle_system.emit(
-                        food_center_x, food_center_y, count=20, color=particle_color,
-                        base_size=5, base_lifespan=20, velocity_x_range=(-2.5, 2.5),
-                        velocity_y_range=(-2.5, 2.5), gravity=0.08, shrink_rate=0.15, fade_rate=12
+                        seg_pos[0] * GRID_SIZE + GRID_SIZE // 2 + self.rng.uniform(-3, 3),
+                        seg_pos[1] * GRID_SIZE + GRID_SIZE // 2 + self.rng.uniform(-3, 3),
+                        count=1, color=LIGHT_BLUE_PHASE[:3] + (self.rng.randint(100, 180),),
+                        base_size=self.rng.uniform(1.5, 3.5), base_lifespan=8,
+                        velocity_x_range=(-0.3, 0.3), velocity_y_range=(-0.3, 0.3),
+                        shrink_rate=0.25, fade_rate=20
                     )
-                    self.food.spawn_randomly(self.snake.body)
-
-            if self.snake.check_collision_self():
-                self.game_over_flag = True;
-                self.game_over_reason = "Crashed into yourself!"
-
-            self.particle_system.update()
-
-            # --- Drawing ---
-            self.screen.fill(BLACK)
-            # Draw grid (optional, can be distracting with particles)
-            # for x_g in range(0, SCREEN_WIDTH, GRID_SIZE): pygame.draw.line(self.screen, (30,30,30), (x_g,0), (x_g, SCREEN_HEIGHT))
-            # for y_g in range(0, SCREEN_HEIGHT, GRID_SIZE): pygame.draw.line(self.screen, (30,30,30), (0,y_g), (SCREEN_WIDTH,y_g))
+        self.profiler.lap("update.phase_particles")
+
+        # Food collision
+        if self.snake.body[0] == self.food.position:
+            can_eat_food = (self.food.type == "normal") or \
+                           (self.food.type == "ghost" and self.snake.is_phasing)
+            if can_eat_food:
+                self.snake.grow()
+                self.score += 10 if self.food.type == "normal" else 25
+
+                # Food eat particles
+                food_center_x = self.food.position[0] * GRID_SIZE + GRID_SIZE // 2
+                food_center_y = self.food.position[1] * GRID_SIZE + GRID_SIZE // 2
+                particle_color = list(self.food.color)
+                if len(particle_color) == 3:
+                    particle_color.append(220)
+                else:
+                    particle_color[3] = 220
+
+                self.particle_system.emit(
+                    food_center_x, food_center_y, count=20, color=particle_color,
+                    base_size=5, base_lifespan=20, velocity_x_range=(-2.5, 2.5),
+                    velocity_y_range=(-2.5, 2.5), gravity=0.08, shrink_rate=0.15, fade_rate=12
+                )
+                if not self.food.spawn_randomly(self.snake.body):
+                    self.game_over_flag = True;
+                    self.game_over_reason = "The board is full!"
+        self.profiler.lap("collision.food")
+
+        if self.snake.check_collision_self():
+            self.game_over_flag = True;
+            self.game_over_reason = "Crashed into yourself!"
+        self.profiler.lap("collision.self")
+
+        self.particle_system.update()
+        self.food.update()  # Pulse animation, advanced per tick rather than per drawn frame
+        self.roll_sickness_glitches()
+        self.profiler.lap("particles.update")
+        return True
 
-            self.particle_system.draw(self.screen)  # Draw particles BEHIND food/snake
-            self.food.draw(self.screen)
-            self.snake.draw(self.screen)
-            self.apply_sickness_effects()  # Apply OVER everything else
-            self.display_ui()  # UI on top of everything
+    def render(self, alpha=1.0):
+        # alpha: how far the clock is between the last tick and the next, for sliding the snake between cells
+        if self.game_over_flag:
+            self.game_over_screen()
+            self.dirty.invalidate()
+            return
+        if self.paused:
+            pause_text = self.font.render("PAUSED", True, YELLOW_FOOD)
+            self.dirty.mark(self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
+                                                          SCREEN_HEIGHT // 2 - pause_text.get_height() // 2)))
+            return
+
+        self.profiler.begin()
+        self.screen.fill(BLACK)
+        # Draw grid (optional, can be distracting with particles)
+        # for x_g in range(0, SCREEN_WIDTH, GRID_SIZE): pygame.draw.line(self.screen, (30,30,30), (x_g,0), (x_g, SCREEN_HEIGHT))
+        # for y_g in range(0, SCREEN_HEIGHT, GRID_SIZE): pygame.draw.line(self.screen, (30,30,30), (0,y_g), (SCREEN_WIDTH,y_g))
+
+        self.profiler.lap("draw.background")
+        self.dirty.mark_rects(self.particle_system.draw(self.screen, return_rects=True))  # BEHIND food/snake
+        self.profiler.lap("draw.particles")
+        self.food.draw(self.screen)
+        self.snake.draw(self.screen, alpha)
+        # Everything else is static. The whole body is marked, not just the new head and vacated tail: between
+        # ticks every segment slides, and on a tick the alternating colours shift one segment along the body
+        self.dirty.mark_cells([self.food.position], GRID_SIZE, FOOD_GLOW_MARGIN)
+        self.dirty.mark_cells(self.snake.body, GRID_SIZE)
+        self.dirty.mark_cells(self.snake.previous_body, GRID_SIZE)
+        self.profiler.lap("draw.entities")
+        self.apply_sickness_effects()  # Apply OVER everything else
+        self.profiler.lap("draw.sickness_fx")
+        self.display_ui()  # UI on top of everything
+        self.dirty.mark(HUD_RECT)
+        self.profiler.lap("draw.ui")
+
+    def debug_counts(self):
+        return {"particles": len(self.particle_system), "segments": len(self.snake.body)}
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
+    def run(self):
+        run_fixed_timestep(self, FPS)
 
-        # print(f"No Clip Snake run loop ended. Game over: {self.game_over_flag}")
\ No newline at end of file
+        # print(f"No Clip Snake run loop ended. Game over: {self.game_over_flag}")
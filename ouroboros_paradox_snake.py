@@ -3,7 +3,12 @@ import math
 import pygame
 import random
 import sys
-import copy
+
+from dirty_rects import DirtyRects
+from grid import OccupancyGrid, SnakeBody
+from layer_cache import grid_background, tint
+from profiling import NULL_PROFILER, handle_profiler_keys
+from timestep import interpolate_cells, run_fixed_timestep
 
 # Attempt to import ParticleSystem, if not found, define it (for standalone running)
 try:
@@ -21,16 +26,18 @@ except ImportError:
 
 
     class ParticleSystem:  # Placeholder
-        def __init__(self): self.particles = []
+        def __init__(self, *args, **kwargs): self.particles = []
 
         def emit(self, *args, **kwargs): pass
 
         def update(self): pass
 
-        def draw(self, *args, **kwargs): pass
+        def draw(self, *args, return_rects=False, **kwargs): return [] if return_rects else None
 
         def clear(self): pass
 
+        def __len__(self): return len(self.particles)
+
 # --- Constants ---
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -38,6 +45,8 @@ GRID_SIZE = 20
 GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
 FPS = 10  # Keep original FPS, loop timing is tied to it
+HUD_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, 100)  # Everything display_ui draws lies in this band
+FOOD_GLOW_MARGIN = 5  # Chrono pellet glow reaches this far past its cell
 
 # Colors
 BLACK = (0, 0, 0)
@@ -67,12 +76,14 @@ RIGHT = (1, 0)
 # Time Loop
 LOOP_DURATION_SECONDS = 15
 LOOP_DURATION_TICKS = LOOP_DURATION_SECONDS * FPS
+LOOP_FLASH_FRAMES = 2  # Ticks the loop reset flash fades over (~0.2s at 10 FPS)
 
 
 class Snake:
-    def __init__(self, start_pos):
-        self.body = [start_pos]
-        self.direction = random.choice([UP, DOWN, LEFT, RIGHT])
+    def __init__(self, start_pos, rng=random):
+        self.rng = rng
+        self.body = SnakeBody(GRID_WIDTH, GRID_HEIGHT, [start_pos])
+        self.direction = self.rng.choice([UP, DOWN, LEFT, RIGHT])
         self.grow_pending = 0
         # current_path_this_loop removed, Game class will get path from snake.body at loop end
 
@@ -80,22 +91,39 @@ class Snake:
         head_x, head_y = self.body[0]
         dir_x, dir_y = self.direction
         new_head = ((head_x + dir_x) % GRID_WIDTH, (head_y + dir_y) % GRID_HEIGHT)
-        self.body.insert(0, new_head)
-        if self.grow_pending > 0:
-            self.grow_pending -= 1
-        else:
-            if len(self.body) > 1: self.body.pop()
+        self.body.advance(new_head, grow=self.grow_pending > 0)
+        if self.grow_pending > 0: self.grow_pending -= 1
         return True
 
+    @property
+    def previous_body(self):  # Body before the last move, for drawing between ticks
+        return self.body.previous()
+
+    def set_body(self, body):
+        self.body = SnakeBody(GRID_WIDTH, GRID_HEIGHT, body)
+
+    def truncate(self, length):
+        self.body.truncate(length)
+
     def grow(self, amount=1):
         self.grow_pending += amount
 
     def check_collision_self(self):
-        return self.body[0] in self.body[1:]
+        return self.body.count(self.body[0]) > 1  # Another segment shares the head's cell
 
-    def draw(self, surface, particle_system_ref=None):  # Added particle_system_ref for potential effects
+    def emit_particles(self, particle_system_ref):  # Subtle movement particles (optional)
         for i, segment in enumerate(self.body):
-            rect = pygame.Rect(segment[0] * GRID_SIZE, segment[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+            if i > 0 and self.rng.random() < 0.02:  # Not for head, low chance
+                color = GREEN_SNAKE if i % 2 == 0 else DARK_GREEN_SNAKE
+                particle_system_ref.emit(
+                    segment[0] * GRID_SIZE + GRID_SIZE // 2, segment[1] * GRID_SIZE + GRID_SIZE // 2, 1,
+                    color[:3] + (80,), 2, 5,
+                    velocity_x_range=(-0.2, 0.2), velocity_y_range=(-0.2, 0.2), shrink_rate=0.1
+                )
+
+    def draw(self, surface, alpha=1.0):
+        for i, segment in enumerate(interpolate_cells(self.previous_body, self.body, alpha, GRID_WIDTH, GRID_HEIGHT)):
+            rect = pygame.Rect(round(segment[0] * GRID_SIZE), round(segment[1] * GRID_SIZE), GRID_SIZE, GRID_SIZE)
             color = GREEN_SNAKE if i % 2 == 0 else DARK_GREEN_SNAKE
             if i == 0:  # Head
                 head_rect_inner = rect.inflate(-GRID_SIZE * 0.4, -GRID_SIZE * 0.4)
@@ -105,17 +133,12 @@ class Snake:
                 pygame.draw.rect(surface, color, rect)
             pygame.draw.rect(surface, WHITE, rect, 1)
 
-            # Subtle movement particles (optional)
-            if particle_system_ref and i > 0 and random.random() < 0.02:  # Not for head, low chance
-                particle_system_ref.emit(
-                    rect.centerx, rect.centery, 1, color[:3] + (80,), 2, 5,
-                    velocity_x_range=(-0.2, 0.2), velocity_y_range=(-0.2, 0.2), shrink_rate=0.1
-                )
-
 
 class EchoSnake:
-    def __init__(self, body_snapshot, echo_type="obstacle", loop_created=0):
+    def __init__(self, body_snapshot, echo_type="obstacle", loop_created=0, rng=random):
+        self.rng = rng
         self.body = body_snapshot  # List of (x,y) segment positions
+        self.occupancy = OccupancyGrid(GRID_WIDTH, GRID_HEIGHT, self.body)  # Echoes never move
         self.type = echo_type
         self.loop_created = loop_created  # For potential aging effects
         self.base_color_map = {
@@ -124,15 +147,25 @@ class EchoSnake:
             "phased": CYAN_ECHO_PHASED_OUTLINE
         }
         self.base_color = self.base_color_map.get(self.type, BLUE_ECHO_OBSTACLE)
-        self.pulse_anim = random.uniform(0, math.pi * 2)  # For subtle pulsing
+        self.pulse_anim = self.rng.uniform(0, math.pi * 2)  # For subtle pulsing
         self.pulse_speed = 0.05
 
     def update_animation(self):
         self.pulse_anim += self.pulse_speed
         if self.pulse_anim > math.pi * 2: self.pulse_anim -= math.pi * 2
 
-    def draw(self, surface, particle_system_ref=None):
-        self.update_animation()
+    def emit_particles(self, particle_system_ref):  # Echo instability particles
+        if self.type == "phased": return
+        for segment_pos in self.body:
+            if self.rng.random() < 0.005 * len(self.body):  # More chances for longer echoes
+                particle_system_ref.emit(
+                    segment_pos[0] * GRID_SIZE + GRID_SIZE // 2, segment_pos[1] * GRID_SIZE + GRID_SIZE // 2, 1,
+                    self.base_color[:3] + (self.rng.randint(50, 100),),
+                    self.rng.uniform(1, 3), 10, shrink_rate=0.1, fade_rate=10,
+                    velocity_x_range=(-0.3, 0.3), velocity_y_range=(-0.3, 0.3)
+                )
+
+    def draw(self, surface):
         base_alpha = 100 + int(math.sin(self.pulse_anim) * 20)  # Pulsing alpha
 
         # Older echoes could be fainter (optional)
@@ -159,18 +192,10 @@ class EchoSnake:
             pygame.draw.rect(surface, (self.base_color[0] // 2, self.base_color[1] // 2, self.base_color[2] // 2), rect,
                              1)  # Darker outline
 
-            # Echo instability particles
-            if particle_system_ref and self.type != "phased" and random.random() < 0.005 * len(
-                    self.body):  # More chances for longer echoes
-                particle_system_ref.emit(
-                    rect.centerx, rect.centery, 1, self.base_color[:3] + (random.randint(50, 100),),
-                    random.uniform(1, 3), 10, shrink_rate=0.1, fade_rate=10,
-                    velocity_x_range=(-0.3, 0.3), velocity_y_range=(-0.3, 0.3)
-                )
-
 
 class Food:
-    def __init__(self, food_type="normal", position=None):
+    def __init__(self, food_type="normal", position=None, rng=random):
+        self.rng = rng
         self.type = food_type
         self.color_map = {
             "normal": YELLOW_FOOD_NORMAL, "chrono_solidify": PURPLE_CHRONO_SOLIDIFY,
@@ -180,18 +205,18 @@ class Food:
         if position:
             self.position = position
         else:
-            self.position = (0, 0); self.spawn_randomly([], [])
-        self.pulse_anim = random.uniform(0, math.pi * 2)
+            self.position = (0, 0); self.spawn_randomly(OccupancyGrid(GRID_WIDTH, GRID_HEIGHT))
+        self.pulse_anim = self.rng.uniform(0, math.pi * 2)
         self.pulse_speed = 0.1 if self.type == "normal" else 0.15  # Chrono items pulse faster
         self.base_radius = GRID_SIZE // 2 - 3
 
-    def spawn_randomly(self, snake_body, existing_food_positions_and_exit):
-        all_occupied = snake_body + existing_food_positions_and_exit
-        while True:
-            self.position = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            if self.position not in all_occupied: break
+    def spawn_randomly(self, occupied):
+        # occupied: OccupancyGrid. Returns False, leaving the food in place, if no cell is free
+        position = occupied.random_free_cell(self.rng)
+        if position is None: return False
+        self.position = position
 
-        rand_val = random.random()
+        rand_val = self.rng.random()
         if rand_val < 0.55:
             self.type = "normal"  # More normal food
         elif rand_val < 0.75:
@@ -201,14 +226,14 @@ class Food:
         else:
             self.type = "chrono_erase"
         self.color = self.color_map[self.type]
-        self.pulse_anim = random.uniform(0, math.pi * 2)
+        self.pulse_anim = self.rng.uniform(0, math.pi * 2)
+        return True
 
     def update_animation(self):
         self.pulse_anim += self.pulse_speed
         if self.pulse_anim > math.pi * 2: self.pulse_anim -= math.pi * 2
 
     def draw(self, surface):
-        self.update_animation()
         center_x = self.position[0] * GRID_SIZE + GRID_SIZE // 2
         center_y = self.position[1] * GRID_SIZE + GRID_SIZE // 2
 
@@ -239,7 +264,6 @@ class ExitPoint:
             self.anim_timer -= math.pi * 2
 
     def draw(self, surface):
-        self.update()
         rect = pygame.Rect(self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
         pygame.draw.rect(surface, self.color, rect)
 
@@ -252,11 +276,20 @@ class ExitPoint:
 
 
 class Game:
-    def __init__(self):
-        if not pygame.get_init(): pygame.init(); pygame.mixer.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Snake 2: Ouroboros Paradox")
+    def __init__(self, seed=None, headless=False):
+        self.seed = seed
+        self.headless = headless
+        self.rng = random.Random(seed)
+        if not pygame.get_init():
+            pygame.init()
+            if not headless: pygame.mixer.init()  # No audio device is needed to run headless
+        if headless:  # Offscreen target, no window needed
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Snake 2: Ouroboros Paradox")
         self.clock = pygame.time.Clock()
+        self.dirty = DirtyRects((SCREEN_WIDTH, SCREEN_HEIGHT))
         try:
             self.font = pygame.font.SysFont("Consolas", 24)
             self.small_font = pygame.font.SysFont("Consolas", 18)
@@ -264,13 +297,14 @@ class Game:
             self.font = pygame.font.Font(None, 30);
             self.small_font = pygame.font.Font(None, 24)
 
-        self.particle_system = ParticleSystem()
+        self.particle_system = ParticleSystem(rng=self.rng)
+        self.profiler = NULL_PROFILER
         self.player_start_pos = (GRID_WIDTH // 4, GRID_HEIGHT // 2)
         self.exit_point_pos = (GRID_WIDTH * 3 // 4, GRID_HEIGHT // 2)
         self.reset_level()
 
     def reset_level(self):
-        self.snake = Snake(self.player_start_pos)
+        self.snake = Snake(self.player_start_pos, self.rng)
         self.echoes = []
         self.foods = []
         self.exit_point = ExitPoint(self.exit_point_pos)
@@ -283,12 +317,14 @@ class Game:
         self.level_cleared = False
         self.game_over_reason = "";
         self.next_echo_type = "obstacle"
+        self.loop_flash_frames = 0
         self.particle_system.clear()
 
     def spawn_initial_food(self):
         self.foods = []
-        occupied_for_food = [seg for seg in self.snake.body] + [self.exit_point.position]
-        for echo in self.echoes: occupied_for_food.extend(echo.body)  # Include echoes too
+        occupied_for_food = self.snake.body.occupancy.copy()
+        occupied_for_food.add(self.exit_point.position)
+        for echo in self.echoes: occupied_for_food.add_all(echo.body)  # Include echoes too
 
         # Ensure at least one of each Chrono pellet type if few echoes exist, else more random
         chrono_types_to_spawn = ["chrono_solidify", "chrono_phase", "chrono_erase"]
@@ -301,46 +337,41 @@ class Game:
             if i < len(chrono_types_to_spawn) and len(self.echoes) < 2:  # Ensure core chrono types early
                 food_type = chrono_types_to_spawn[i]
 
-            food_item = Food(food_type=food_type)  # Food will randomize if type is normal
+            food_item = Food(food_type=food_type, rng=self.rng)  # Food will randomize if type is normal
             if food_type != "normal": food_item.type = food_type  # Force type if specified
 
-            food_item.spawn_randomly(self.snake.body, occupied_for_food + [f.position for f in self.foods])
+            if not food_item.spawn_randomly(occupied_for_food): break  # Snake, echoes and food fill the board
+            occupied_for_food.add(food_item.position)
             self.foods.append(food_item)
 
     def handle_loop_reset(self):
-        # Screen Flash and Particles for Loop Reset
-        flash_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        flash_surface.fill(TIME_RIPPLE_COLOR)  # Use a thematic color
-        for i in range(5):  # Multiple flashes for intensity
-            flash_surface.set_alpha(150 - i * 20)
-            self.screen.blit(flash_surface, (0, 0))
-            pygame.display.flip()
-            pygame.time.wait(20)
+        # Screen Flash (drawn by render) and Particles for Loop Reset
+        self.loop_flash_frames = LOOP_FLASH_FRAMES
 
         # Emit Particles from screen edges inwards or from center outwards
         for _ in range(60):
-            edge = random.choice(["top", "bottom", "left", "right"])
+            edge = self.rng.choice(["top", "bottom", "left", "right"])
             start_x, start_y = 0, 0
             vel_x_range, vel_y_range = (-1, 1), (-1, 1)  # Default for center emit
 
             if edge == "top":
-                start_x, start_y = random.randint(0, SCREEN_WIDTH), -10; vel_y_range = (1, 3)
+                start_x, start_y = self.rng.randint(0, SCREEN_WIDTH), -10; vel_y_range = (1, 3)
             elif edge == "bottom":
-                start_x, start_y = random.randint(0, SCREEN_WIDTH), SCREEN_HEIGHT + 10; vel_y_range = (-3, -1)
+                start_x, start_y = self.rng.randint(0, SCREEN_WIDTH), SCREEN_HEIGHT + 10; vel_y_range = (-3, -1)
             elif edge == "left":
-                start_x, start_y = -10, random.randint(0, SCREEN_HEIGHT); vel_x_range = (1, 3)
+                start_x, start_y = -10, self.rng.randint(0, SCREEN_HEIGHT); vel_x_range = (1, 3)
             elif edge == "right":
-                start_x, start_y = SCREEN_WIDTH + 10, random.randint(0, SCREEN_HEIGHT); vel_x_range = (-3, -1)
+                start_x, start_y = SCREEN_WIDTH + 10, self.rng.randint(0, SCREEN_HEIGHT); vel_x_range = (-3, -1)
 
             self.particle_system.emit(start_x, start_y, 1, TIME_RIPPLE_COLOR[:3] + (180,),
-                                      random.uniform(2, 5), 30, shrink_rate=0.1, fade_rate=5,
+                                      self.rng.uniform(2, 5), 30, shrink_rate=0.1, fade_rate=5,
                                       velocity_x_range=vel_x_range, velocity_y_range=vel_y_range)
 
         if self.next_echo_type != "erased" and self.snake.body:
-            echo_body_snapshot = copy.deepcopy(self.snake.body)
-            self.echoes.append(EchoSnake(echo_body_snapshot, self.next_echo_type, self.loop_count))
+            echo_body_snapshot = list(self.snake.body)
+            self.echoes.append(EchoSnake(echo_body_snapshot, self.next_echo_type, self.loop_count, self.rng))
 
-        self.snake = Snake(self.player_start_pos)
+        self.snake = Snake(self.player_start_pos, self.rng)
         self.current_loop_ticks = 0;
         self.loop_count += 1
         self.next_echo_type = "obstacle"
@@ -368,7 +399,6 @@ class Game:
         self.screen.blit(next_echo_text, (SCREEN_WIDTH - next_echo_text.get_width() - 10, 10))
 
     def game_over_or_level_clear_screen(self):  # Same, ensure no pygame.quit()
-        # ... (game over screen logic) ...
         self.screen.fill(BLACK)
         title_msg = "LEVEL CLEARED!" if self.level_cleared else "PARADOX COLLAPSE!"
         title_color = GREEN_SNAKE if self.level_cleared else RED_EXIT
@@ -383,137 +413,160 @@ class Game:
         self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 3 + 70))
         self.screen.blit(loops_text, (SCREEN_WIDTH // 2 - loops_text.get_width() // 2, SCREEN_HEIGHT // 3 + 100))
         self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 3 + 150))
-        pygame.display.flip()
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.event.post(pygame.event.Event(pygame.QUIT))  # Repost for main_menu
-                    return
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q: self.game_over_flag = True; waiting = False  # Signal main loop to exit
-                    if event.key == pygame.K_r: self.reset_level(); waiting = False  # Resets game_over_flag
-            self.clock.tick(FPS)
+
+    def step(self, inputs):
+        # Advances the simulation by one tick. Returns False when the player leaves for the menu.
+        if inputs.quit: return False
+        self.profiler = handle_profiler_keys(self.profiler, inputs.keydowns)
+        if self.game_over_flag or self.level_cleared:
+            for key in inputs.keydowns:
+                if key == pygame.K_q: return False
+                if key == pygame.K_r: self.reset_level(); break  # Resets game_over_flag
+            return True
+
+        for key in inputs.keydowns:
+            if key == pygame.K_p: self.paused = not self.paused
+            if self.paused: continue
+            if key == pygame.K_UP and self.snake.direction != DOWN:
+                self.snake.direction = UP
+            elif key == pygame.K_DOWN and self.snake.direction != UP:
+                self.snake.direction = DOWN
+            elif key == pygame.K_LEFT and self.snake.direction != RIGHT:
+                self.snake.direction = LEFT
+            elif key == pygame.K_RIGHT and self.snake.direction != LEFT:
+                self.snake.direction = RIGHT
+            elif key == pygame.K_ESCAPE:
+                return False
+
+        if self.paused: return True
+
+        self.profiler.begin()
+        if self.loop_flash_frames > 0: self.loop_flash_frames -= 1
+        self.current_loop_ticks += 1
+        if self.current_loop_ticks >= LOOP_DURATION_TICKS: self.handle_loop_reset()
+
+        self.snake.move()
+        self.profiler.lap("update.snake")
+        if self.snake.check_collision_self(): self.game_over_flag = True; self.game_over_reason = "Self-collision paradox!"
+
+        for i, echo in reversed(list(enumerate(self.echoes))):
+            if echo.type == "phased": continue
+            if self.snake.body[0] in echo.occupancy:
+                if echo.type == "solid_edible":
+                    self.snake.grow(len(echo.body));
+                    self.score += 50 * len(echo.body)
+                    # Echo eaten particles
+                    for seg_pos in echo.body:  # Particles for each segment of eaten echo
+                        self.particle_system.emit(
+                            seg_pos[0] * GRID_SIZE + GRID_SIZE // 2, seg_pos[1] * GRID_SIZE + GRID_SIZE // 2,
+                            2, echo.base_color[:3] + (180,), 4, 15,
+                            velocity_x_range=(-1, 1), velocity_y_range=(-1, 1), shrink_rate=0.2)
+                    self.echoes.pop(i)
+                else:
+                    self.game_over_flag = True; self.game_over_reason = "Collided with temporal echo!"
+                break
+            if self.game_over_flag: break
+        self.profiler.lap("collision.echoes")
+
+        food_to_remove_idx = -1
+        for idx, food_item in enumerate(self.foods):
+            if self.snake.body[0] == food_item.position:
+                food_center_x = food_item.position[0] * GRID_SIZE + GRID_SIZE // 2
+                food_center_y = food_item.position[1] * GRID_SIZE + GRID_SIZE // 2
+
+                if food_item.type == "normal":
+                    self.snake.grow();
+                    self.score += 10
+                    self.particle_system.emit(food_center_x, food_center_y, 15, food_item.color[:3] + (200,), 4, 15,
+                                              velocity_x_range=(-1.5, 1.5), velocity_y_range=(-1.5, 1.5),
+                                              gravity=0.05)
+                else:  # Chrono pellet
+                    self.score += 5
+                    if food_item.type == "chrono_solidify":
+                        self.next_echo_type = "solid_edible"
+                    elif food_item.type == "chrono_phase":
+                        self.next_echo_type = "phased"
+                    elif food_item.type == "chrono_erase":
+                        self.next_echo_type = "erased"
+                    self.particle_system.emit(food_center_x, food_center_y, 25, food_item.color[:3] + (220,), 5, 25,
+                                              velocity_x_range=(-2.5, 2.5), velocity_y_range=(-2.5, 2.5),
+                                              shrink_rate=0.15)
+                food_to_remove_idx = idx;
+                break
+
+        if food_to_remove_idx != -1:
+            self.foods.pop(food_to_remove_idx)
+            if len(self.foods) < (3 + len(self.echoes) // 2) and len(self.foods) < 6:  # Try to maintain food count
+                self.spawn_initial_food()  # This will try to add more food smartly
+
+        if self.snake.body[0] == self.exit_point.position:
+            self.level_cleared = True;
+            self.score += 100
+            # Level clear particles
+            self.particle_system.emit(self.exit_point.position[0] * GRID_SIZE + GRID_SIZE // 2,
+                                      self.exit_point.position[1] * GRID_SIZE + GRID_SIZE // 2,
+                                      50, (255, 255, 100, 200), 6, 40, velocity_x_range=(-3, 3),
+                                      velocity_y_range=(-3, 3),
+                                      shrink_rate=0.1, fade_rate=5)
+        self.profiler.lap("collision.food_exit")
+
+        self.particle_system.update()  # Update all particles
+        self.profiler.lap("particles.update")
+        for echo in self.echoes: echo.emit_particles(self.particle_system)
+        self.snake.emit_particles(self.particle_system)
+        self.profiler.lap("particles.emit")
+        # Pulse animations advance per tick rather than per drawn frame
+        for echo in self.echoes: echo.update_animation()
+        for food_item in self.foods: food_item.update_animation()
+        self.exit_point.update()
+        return True
+
+    def render(self, alpha=1.0):
+        if self.game_over_flag or self.level_cleared:
+            self.game_over_or_level_clear_screen()
+            self.dirty.invalidate()
+            return
+        if self.paused:
+            pause_text = self.font.render("PAUSED", True, YELLOW_FOOD_NORMAL)
+            self.dirty.mark(self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
+                                                          SCREEN_HEIGHT // 2 - pause_text.get_height() // 2)))
+            return
+
+        self.profiler.begin()
+        # Grid with low alpha for subtlety, built once
+        self.screen.blit(grid_background(self.screen.get_size(), BLACK, GRID_SIZE, (50, 50, 80, 50)), (0, 0))
+        self.profiler.lap("draw.background")
+
+        self.dirty.mark_rects(self.particle_system.draw(self.screen, return_rects=True))  # Underneath the rest
+        self.profiler.lap("draw.particles")
+
+        for echo in self.echoes:
+            echo.draw(self.screen)
+            self.dirty.mark_cells(echo.body, GRID_SIZE)  # Echoes pulse
+        self.profiler.lap("draw.echoes")
+        for food_item in self.foods: food_item.draw(self.screen)
+        self.exit_point.draw(self.screen);
+        self.snake.draw(self.screen, alpha)
+        # The grid is static. Every body cell is marked, not only head and tail: segments slide between ticks
+        # and the alternating segment colours move one cell along with each step
+        self.dirty.mark_cells([food_item.position for food_item in self.foods], GRID_SIZE, FOOD_GLOW_MARGIN)
+        self.dirty.mark_cells([self.exit_point.position], GRID_SIZE)
+        self.dirty.mark_cells(self.snake.body, GRID_SIZE)
+        self.dirty.mark_cells(self.snake.previous_body, GRID_SIZE)
+        self.profiler.lap("draw.entities")
+        self.display_ui()
+        self.dirty.mark(HUD_RECT)
+
+        if self.loop_flash_frames > 0:  # Loop reset flash, fading out over a few frames
+            self.dirty.invalidate()
+            flash_alpha = 150 - (LOOP_FLASH_FRAMES - self.loop_flash_frames) * 40
+            self.screen.blit(tint(self.screen.get_size(), TIME_RIPPLE_COLOR, flash_alpha), (0, 0))  # Thematic color
+        self.profiler.lap("draw.ui")
+
+    def debug_counts(self):
+        return {"particles": len(self.particle_system), "segments": len(self.snake.body),
+                "echoes": len(self.echoes), "echo segments": sum(len(echo.body) for echo in self.echoes),
+                "foods": len(self.foods)}
 
     def run(self):
-        running = True
-        while running:
-            if self.game_over_flag or self.level_cleared:
-                self.game_over_or_level_clear_screen()
-                if self.game_over_flag:  # If Q was pressed or game over is still set
-                    running = False  # Exit game loop to return to menu
-                # If R was pressed, flags are reset, loop continues
-                continue
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: running = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_p: self.paused = not self.paused
-                    if self.paused: continue
-                    if event.key == pygame.K_UP and self.snake.direction != DOWN:
-                        self.snake.direction = UP
-                    elif event.key == pygame.K_DOWN and self.snake.direction != UP:
-                        self.snake.direction = DOWN
-                    elif event.key == pygame.K_LEFT and self.snake.direction != RIGHT:
-                        self.snake.direction = LEFT
-                    elif event.key == pygame.K_RIGHT and self.snake.direction != LEFT:
-                        self.snake.direction = RIGHT
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False
-
-            if not running: break
-            if self.paused:
-                pause_text = self.font.render("PAUSED", True, YELLOW_FOOD_NORMAL)
-                self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
-                                              SCREEN_HEIGHT // 2 - pause_text.get_height() // 2))
-                pygame.display.flip();
-                self.clock.tick(FPS);
-                continue
-
-            self.current_loop_ticks += 1
-            if self.current_loop_ticks >= LOOP_DURATION_TICKS: self.handle_loop_reset()
-
-            self.snake.move()
-            if self.snake.check_collision_self(): self.game_over_flag = True; self.game_over_reason = "Self-collision paradox!"
-
-            for i, echo in reversed(list(enumerate(self.echoes))):
-                if echo.type == "phased": continue
-                if self.snake.body[0] in echo.body:
-                    if echo.type == "solid_edible":
-                        self.snake.grow(len(echo.body));
-                        self.score += 50 * len(echo.body)
-                        # Echo eaten particles
-                        for seg_pos in echo.body:  # Particles for each segment of eaten echo
-                            self.particle_system.emit(
-                                seg_pos[0] * GRID_SIZE + GRID_SIZE // 2, seg_pos[1] * GRID_SIZE + GRID_SIZE // 2,
-                                2, echo.base_color[:3] + (180,), 4, 15,
-                                velocity_x_range=(-1, 1), velocity_y_range=(-1, 1), shrink_rate=0.2)
-                        self.echoes.pop(i)
-                    else:
-                        self.game_over_flag = True; self.game_over_reason = "Collided with temporal echo!"
-                    break
-                if self.game_over_flag: break
-
-            food_to_remove_idx = -1
-            for idx, food_item in enumerate(self.foods):
-                if self.snake.body[0] == food_item.position:
-                    food_center_x = food_item.position[0] * GRID_SIZE + GRID_SIZE // 2
-                    food_center_y = food_item.position[1] * GRID_SIZE + GRID_SIZE // 2
-
-                    if food_item.type == "normal":
-                        self.snake.grow();
-                        self.score += 10
-                        self.particle_system.emit(food_center_x, food_center_y, 15, food_item.color[:3] + (200,), 4, 15,
-                                                  velocity_x_range=(-1.5, 1.5), velocity_y_range=(-1.5, 1.5),
-                                                  gravity=0.05)
-                    else:  # Chrono pellet
-                        self.score += 5
-                        if food_item.type == "chrono_solidify":
-                            self.next_echo_type = "solid_edible"
-                        elif food_item.type == "chrono_phase":
-                            self.next_echo_type = "phased"
-                        elif food_item.type == "chrono_erase":
-                            self.next_echo_type = "erased"
-                        self.particle_system.emit(food_center_x, food_center_y, 25, food_item.color[:3] + (220,), 5, 25,
-                                                  velocity_x_range=(-2.5, 2.5), velocity_y_range=(-2.5, 2.5),
-                                                  shrink_rate=0.15)
-                    food_to_remove_idx = idx;
-                    break
-
-            if food_to_remove_idx != -1:
-                self.foods.pop(food_to_remove_idx)
-                if len(self.foods) < (3 + len(self.echoes) // 2) and len(self.foods) < 6:  # Try to maintain food count
-                    self.spawn_initial_food()  # This will try to add more food smartly
-
-            if self.snake.body[0] == self.exit_point.position:
-                self.level_cleared = True;
-                self.score += 100
-                # Level clear particles
-                self.particle_system.emit(self.exit_point.position[0] * GRID_SIZE + GRID_SIZE // 2,
-                                          self.exit_point.position[1] * GRID_SIZE + GRID_SIZE // 2,
-                                          50, (255, 255, 100, 200), 6, 40, velocity_x_range=(-3, 3),
-                                          velocity_y_range=(-3, 3),
-                                          shrink_rate=0.1, fade_rate=5)
-
-            self.particle_system.update()  # Update all particles
-
-            self.screen.fill(BLACK)
-            # Draw grid with low alpha for subtlety
-            grid_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            for x_g in range(0, SCREEN_WIDTH, GRID_SIZE): pygame.draw.line(grid_surface, (50, 50, 80, 50), (x_g, 0),
-                                                                           (x_g, SCREEN_HEIGHT))
-            for y_g in range(0, SCREEN_HEIGHT, GRID_SIZE): pygame.draw.line(grid_surface, (50, 50, 80, 50), (0, y_g),
-                                                                            (SCREEN_WIDTH, y_g))
-            self.screen.blit(grid_surface, (0, 0))
-
-            self.particle_system.draw(self.screen)  # Draw particles underneath everything else
-
-            for echo in self.echoes: echo.draw(self.screen,
-                                               self.particle_system)  # Pass particle system for echo effects
-            for food_item in self.foods: food_item.draw(self.screen)
-            self.exit_point.draw(self.screen);
-            self.snake.draw(self.screen, self.particle_system)
-            self.display_ui()
-
-            pygame.display.flip();
-            self.clock.tick(FPS)
\ No newline at end of file
+        run_fixed_timestep(self, FPS)
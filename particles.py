@@ -1,19 +1,54 @@
 # particles.py
 import pygame
+import heapq
 import random
 import math
 
+from sprite_cache import SpriteCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Overflow policies for a ParticleSystem created with max_particles:
+#   OVERFLOW_DROP_OLDEST      - evict the longest-lived particles to make room for new ones
+#   OVERFLOW_DROP_NEWEST      - refuse the particles that would not fit
+#   OVERFLOW_DROP_LOWEST_ALPHA - evict the most faded (least visible) particles first
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_DROP_LOWEST_ALPHA = "drop_lowest_alpha"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_LOWEST_ALPHA)
+# Default evict_fraction: OVERFLOW_DROP_LOWEST_ALPHA evicts at least this fraction of max_particles at once, so a
+# pool held at the cap selects and compacts once per chunk instead of on every emit()
+OVERFLOW_EVICT_FRACTION = 0.1
+
+# Side length in world pixels of the coarse grid cells particles are bucketed into for viewport culling.
+# Buckets outside the camera view are skipped wholesale in draw().
+BUCKET_SIZE = 256
+
 
 class Particle:
     def __init__(self, x, y, color, size, lifespan, velocity_x_range=(-1, 1), velocity_y_range=(-1, 1), gravity=0,
-                 shrink_rate=0.05, fade_rate=5):
+                 shrink_rate=0.05, fade_rate=5, rng=None):
+        self.color = []
+        self.reset(x, y, color, size, lifespan, velocity_x_range, velocity_y_range, gravity, shrink_rate, fade_rate,
+                   rng)
+
+    def reset(self, x, y, color, size, lifespan, velocity_x_range=(-1, 1), velocity_y_range=(-1, 1), gravity=0,
+              shrink_rate=0.05, fade_rate=5, rng=None):
+        # Re-initialises in place (reusing the color list) so pooled particles can be recycled.
+        # rng is any random.Random-like source; the global random module is used when omitted.
+        if rng is None:
+            rng = random
         self.x = x
         self.y = y
-        self.size = random.uniform(size * 0.7, size * 1.3)
+        self.size = rng.uniform(size * 0.7, size * 1.3)
         self.initial_size = self.size
 
         # Ensure color is a list and has an alpha component
-        self.color = list(color)
+        self.color[:] = color
         if len(self.color) == 3:
             self.color.append(255)  # Default to full alpha if not provided
         elif len(self.color) == 4:
@@ -21,11 +56,11 @@ class Particle:
 
         self.initial_alpha = self.color[3]
 
-        self.lifespan = random.uniform(lifespan * 0.8, lifespan * 1.2)
+        self.lifespan = rng.uniform(lifespan * 0.8, lifespan * 1.2)
         self.initial_lifespan = self.lifespan
 
-        self.vx = random.uniform(velocity_x_range[0], velocity_x_range[1])
-        self.vy = random.uniform(velocity_y_range[0], velocity_y_range[1])
+        self.vx = rng.uniform(velocity_x_range[0], velocity_x_range[1])
+        self.vy = rng.uniform(velocity_y_range[0], velocity_y_range[1])
         self.gravity = gravity
         self.shrink_rate = shrink_rate
         self.fade_rate = fade_rate
@@ -69,30 +104,480 @@ class Particle:
             pass  # Catch potential errors with color format or negative size
 
 
-class ParticleSystem:
-    def __init__(self):
+class ParticleRenderer:
+    """Draws particles as cached, pre-rasterised circle sprites with a single Surface.blits call.
+
+    Sprites are keyed by (radius, quantized RGBA) so a busy scene only ever rasterises a small
+    set of circles; every frame after that is one C-level blits() call instead of one
+    pygame.draw.circle per particle.
+    """
+
+    def __init__(self, color_step=8, alpha_step=16, max_sprites=2048):
+        self.color_step = color_step
+        self.alpha_step = alpha_step
+        self.max_sprites = max_sprites
+        self._sprites = SpriteCache(max_sprites)  # LRU, so hitting the cap drops stale sprites, not the hot set
+
+    def sprite(self, radius, r, g, b, a):
+        return self._sprites.get((radius, r, g, b, a), lambda: _circle_sprite(radius, (r, g, b, a)))
+
+    def quantize_color(self, c):
+        return c // self.color_step * self.color_step
+
+    def quantize_alpha(self, a):
+        # Round up so faint particles never quantize to fully transparent
+        return min(255, -(-a // self.alpha_step) * self.alpha_step)
+
+    def draw(self, surface, xs, ys, radii, colors, return_rects=False):
+        """Blits one sprite per particle. xs/ys are screen-space centers, radii ints >= 1 and
+        colors already-quantized (r, g, b, a) tuples. With return_rects the blitted Rects are
+        returned (for dirty-rect presenting)."""
+        used = {}  # Sprites already looked up this frame, so the LRU is touched once per distinct sprite
+        blits = []
+        for x, y, radius, color in zip(xs, ys, radii, colors):
+            key = (radius, color)
+            sprite = used.get(key)
+            if sprite is None: sprite = used[key] = self.sprite(radius, *color)
+            blits.append((sprite, (x - radius, y - radius)))
+        return surface.blits(blits, doreturn=return_rects)
+
+
+def _circle_sprite(radius, color):
+    sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, color, (radius, radius), radius)
+    return sprite
+
+
+default_renderer = ParticleRenderer()
+
+
+class StaticParticleLayer:
+    """Pre-rendered layer for long-lived particles that barely move, such as nebula dust.
+
+    The particles are composited once into an SRCALPHA surface, or into a few surfaces sampled
+    along their linear drift, and drawing is a single blit. Drift frames are played back and
+    forth every frame_ticks updates, so the layer shimmers slowly instead of drifting away.
+    Frames are stored premultiplied so overlapping translucent particles blend correctly.
+    """
+
+    def __init__(self, particles, drift_frames=1, frame_ticks=30, renderer=None):
+        particles = [p for p in particles if int(p.size) >= 1 and p.color[3] > 0]
+        self.renderer = renderer if renderer is not None else default_renderer
+        self.frame_ticks = frame_ticks
+        self.tick = 0
+        self.frames = []
+        if not particles:
+            self.rect = pygame.Rect(0, 0, 0, 0)
+            return
+
+        max_drift_ticks = (drift_frames - 1) * frame_ticks
+        pad = max(p.size for p in particles) + max(abs(p.vx) + abs(p.vy) for p in particles) * max_drift_ticks + 1
+        left = int(min(p.x for p in particles) - pad)
+        top = int(min(p.y for p in particles) - pad)
+        right = int(max(p.x for p in particles) + pad)
+        bottom = int(max(p.y for p in particles) + pad)
+        self.rect = pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+
+        quantize_color = self.renderer.quantize_color
+        quantize_alpha = self.renderer.quantize_alpha
+        premultiplied = {}
+        for k in range(drift_frames):
+            t = k * frame_ticks
+            frame = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            blits = []
+            for p in particles:
+                radius = int(p.size)
+                key = (radius, quantize_color(p.color[0]), quantize_color(p.color[1]), quantize_color(p.color[2]),
+                       quantize_alpha(p.color[3]))
+                sprite = premultiplied.get(key)
+                if sprite is None:
+                    sprite = premultiplied[key] = self.renderer.sprite(*key).premul_alpha()
+                x = int(p.x + p.vx * t) - left - radius
+                y = int(p.y + p.vy * t) - top - radius
+                blits.append((sprite, (x, y), None, pygame.BLEND_PREMULTIPLIED))
+            frame.blits(blits, doreturn=False)
+            self.frames.append(frame)
+
+    def current_frame(self):
+        # Ping-pong through the drift frames: 0, 1, ..., n-1, n-2, ..., 1, 0, ...
+        n = len(self.frames)
+        if n <= 1:
+            return self.frames[0] if self.frames else None
+        period = 2 * (n - 1)
+        phase = (self.tick // self.frame_ticks) % period
+        return self.frames[phase if phase < n else period - phase]
+
+    def update(self):
+        self.tick += 1
+
+    def draw(self, surface, camera_offset_x=0, camera_offset_y=0):
+        frame = self.current_frame()
+        if frame is None:
+            return
+        dest = self.rect.move(-int(camera_offset_x), -int(camera_offset_y))
+        if dest.colliderect(surface.get_rect()):
+            surface.blit(frame, dest.topleft, special_flags=pygame.BLEND_PREMULTIPLIED)
+
+
+def _viewport(surface, camera_offset_x, camera_offset_y, pad):
+    # World-space (left, top, right, bottom) that can show on `surface`, grown by `pad` for particle radii
+    width, height = surface.get_size()
+    return (camera_offset_x - pad, camera_offset_y - pad,
+            camera_offset_x + width + pad, camera_offset_y + height + pad)
+
+
+def _check_overflow_policy(max_particles, overflow_policy):
+    if max_particles is not None and max_particles <= 0:
+        raise ValueError(f"max_particles must be positive, got {max_particles}")
+    if overflow_policy not in OVERFLOW_POLICIES:
+        raise ValueError(f"Unknown overflow policy {overflow_policy!r}, expected one of {OVERFLOW_POLICIES}")
+
+
+class ListParticleSystem:
+    def __init__(self, max_particles=None, overflow_policy=OVERFLOW_DROP_OLDEST, renderer=None, rng=None,
+                 evict_fraction=OVERFLOW_EVICT_FRACTION):
+        # With max_particles set the system becomes a pool: never more than max_particles live
+        # Particle objects, and dead ones go on a free list to be reset() by the next emit().
+        # Passing a seeded random.Random as rng makes every emit() reproducible.
+        _check_overflow_policy(max_particles, overflow_policy)
         self.particles = []
+        self.rng = rng if rng is not None else random
+        self.renderer = renderer if renderer is not None else default_renderer
+        self.max_particles = max_particles
+        self.overflow_policy = overflow_policy
+        self.evict_fraction = evict_fraction
+        self._free = []
+        # Bucket grid built by update(); particles emitted since then sit past _bucketed_count.
+        # None means the grid is stale and draw() falls back to scanning every particle.
+        self._buckets = None
+        self._bucketed_count = 0
+        self._max_size = 0
+
+    def __len__(self):
+        return len(self.particles)
+
+    def _make_room(self, count):
+        # Returns how many of `count` new particles may be added, evicting live ones if the policy allows
+        if self.max_particles is None:
+            return count
+        count = min(count, self.max_particles)
+        excess = len(self.particles) + count - self.max_particles
+        if excess <= 0:
+            return count
+        if self.overflow_policy == OVERFLOW_DROP_NEWEST:
+            return count - excess
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            evicted = self.particles[:excess]
+            del self.particles[:excess]
+        else:
+            particles = self.particles
+            chunk = min(len(particles), max(excess, int(self.max_particles * self.evict_fraction)))
+            evict = set(heapq.nsmallest(chunk, range(len(particles)), key=lambda i: particles[i].color[3]))
+            evicted = [p for i, p in enumerate(self.particles) if i in evict]
+            self.particles = [p for i, p in enumerate(self.particles) if i not in evict]
+        self._free.extend(evicted)
+        self._buckets = None
+        return count
 
     def add_particle(self, particle_instance):
-        self.particles.append(particle_instance)
+        if self._make_room(1):
+            self.particles.append(particle_instance)
+            self._max_size = max(self._max_size, particle_instance.size)
 
     def emit(self, x, y, count, color, base_size, base_lifespan, **kwargs):
-        for _ in range(count):
-            self.particles.append(Particle(x, y, color, base_size, base_lifespan, **kwargs))
+        self._max_size = max(self._max_size, base_size * 1.3)
+        for _ in range(self._make_room(count)):
+            if self._free:
+                p = self._free.pop()
+                p.reset(x, y, color, base_size, base_lifespan, rng=self.rng, **kwargs)
+            else:
+                p = Particle(x, y, color, base_size, base_lifespan, rng=self.rng, **kwargs)
+            self.particles.append(p)
 
     def update(self):
-        # Iterate backwards for safe removal
-        for i in range(len(self.particles) - 1, -1, -1):
-            if not self.particles[i].update():
-                self.particles.pop(i)
-        # self.particles = [p for p in self.particles if p.update()] # Alternative list comprehension
-
-    def draw(self, surface, camera_offset_x=0, camera_offset_y=0):
-        # For better alpha blending performance, especially with many particles,
-        # one could draw all particles of similar type onto a temporary transparent surface,
-        # then blit that surface once. But for now, individual draws are fine.
+        pooled = self.max_particles is not None
+        alive = []
+        buckets = {}
+        max_size = 0
         for p in self.particles:
-            p.draw(surface, camera_offset_x, camera_offset_y)
+            if p.update():
+                alive.append(p)
+                key = (int(p.x // BUCKET_SIZE), int(p.y // BUCKET_SIZE))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = [p]
+                else:
+                    bucket.append(p)
+                if p.size > max_size:
+                    max_size = p.size
+            elif pooled:
+                self._free.append(p)
+        self.particles = alive
+        self._buckets = buckets
+        self._bucketed_count = len(alive)
+        self._max_size = max_size
+
+    def _candidates(self, left, top, right, bottom):
+        # Particles in buckets overlapping the viewport, plus any emitted since the last update()
+        if self._buckets is None:
+            return self.particles
+        candidates = []
+        for bx in range(int(left // BUCKET_SIZE), int(right // BUCKET_SIZE) + 1):
+            for by in range(int(top // BUCKET_SIZE), int(bottom // BUCKET_SIZE) + 1):
+                bucket = self._buckets.get((bx, by))
+                if bucket:
+                    candidates.extend(bucket)
+        candidates.extend(self.particles[self._bucketed_count:])
+        return candidates
+
+    def draw(self, surface, camera_offset_x=0, camera_offset_y=0, return_rects=False):
+        # All particles go through the shared sprite cache and are blitted in one batch
+        quantize_color = self.renderer.quantize_color
+        quantize_alpha = self.renderer.quantize_alpha
+        left, top, right, bottom = _viewport(surface, camera_offset_x, camera_offset_y, self._max_size + 1)
+        xs, ys, radii, colors = [], [], [], []
+        for p in self._candidates(left, top, right, bottom):
+            radius = int(p.size)
+            if radius < 1 or p.color[3] <= 0 or not (left <= p.x <= right and top <= p.y <= bottom):
+                continue
+            xs.append(int(p.x - camera_offset_x))
+            ys.append(int(p.y - camera_offset_y))
+            radii.append(radius)
+            colors.append((quantize_color(p.color[0]), quantize_color(p.color[1]), quantize_color(p.color[2]),
+                           quantize_alpha(p.color[3])))
+        return self.renderer.draw(surface, xs, ys, radii, colors, return_rects)
 
     def clear(self):
-        self.particles.clear()
\ No newline at end of file
+        if self.max_particles is not None:
+            self._free.extend(self.particles)
+        self.particles.clear()
+        self._buckets = None
+
+
+# Row indices into ArrayParticleSystem._data
+_X, _Y, _VX, _VY, _SIZE, _ALPHA, _LIFESPAN, _GRAVITY, _SHRINK, _FADE = range(10)
+_NUM_FIELDS = 10
+
+# Bucket coordinates are offset so they stay non-negative and pack into one sortable int64 key
+_BUCKET_OFFSET = 1 << 20
+_BUCKET_ROW = 1 << 21
+# Below this many particles a plain vectorized bounds test is cheaper than maintaining the bucket index
+_BUCKET_MIN_PARTICLES = 256
+
+
+def _numpy_generator(rng):
+    # Accepts a NumPy Generator, a seeded random.Random (one draw from it seeds a child stream), or None
+    if isinstance(rng, np.random.Generator):
+        return rng
+    if rng is not None:
+        return np.random.default_rng(rng.getrandbits(64))
+    return np.random.default_rng()
+
+
+def _bucket_keys(xs, ys):
+    bx = np.floor_divide(xs, BUCKET_SIZE).astype(np.int64) + _BUCKET_OFFSET
+    by = np.floor_divide(ys, BUCKET_SIZE).astype(np.int64) + _BUCKET_OFFSET
+    return by * _BUCKET_ROW + bx
+
+
+class ArrayParticleSystem:
+    """Structure-of-arrays particle store with the same API as ListParticleSystem.
+
+    Every particle attribute lives in a preallocated NumPy row, so update() integrates and
+    culls the whole system in a handful of vectorized operations instead of calling
+    Particle.update() and list.pop() per particle.
+
+    Live particles are kept packed at the front of the arrays, so slots [count:capacity] act
+    as the free list and are reused by the next emit(). Passing max_particles turns the store
+    into a fixed-size pool: the arrays are allocated once at that size and never grow, and
+    overflow_policy decides what gets dropped when an emit() would exceed the cap, and evict_fraction how much
+    of the pool drop_lowest_alpha clears at a time.
+
+    rng may be a NumPy Generator or a seeded random.Random, so emit() replays identically.
+
+    update() also sorts particle indices by coarse grid bucket, so draw() can pull out just the
+    buckets under the camera with a few binary searches and never looks at off-screen particles.
+    """
+
+    def __init__(self, capacity=1024, max_particles=None, overflow_policy=OVERFLOW_DROP_OLDEST, renderer=None,
+                 rng=None, evict_fraction=OVERFLOW_EVICT_FRACTION):
+        _check_overflow_policy(max_particles, overflow_policy)
+        self.max_particles = max_particles
+        self.overflow_policy = overflow_policy
+        self.evict_fraction = evict_fraction
+        self.renderer = renderer if renderer is not None else default_renderer
+        if max_particles is not None:
+            capacity = max_particles
+        self.count = 0
+        self.capacity = 0
+        self._data = np.zeros((_NUM_FIELDS, 0))
+        self._rgb = np.zeros((0, 3), dtype=np.uint8)
+        self.rng = _numpy_generator(rng)
+        # Bucket index from the last update(): particle indices sorted by bucket key. Particles
+        # emitted afterwards live past _indexed_count; None means the index is stale.
+        self._order = None
+        self._sorted_keys = None
+        self._indexed_count = 0
+        self._max_size = 0
+        self._grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, capacity):
+        data = np.zeros((_NUM_FIELDS, capacity))
+        rgb = np.zeros((capacity, 3), dtype=np.uint8)
+        data[:, :self.count] = self._data[:, :self.count]
+        rgb[:self.count] = self._rgb[:self.count]
+        self._data = data
+        self._rgb = rgb
+        self.capacity = capacity
+
+    def _make_room(self, count):
+        # Returns how many of `count` new particles may be added, evicting live ones if the policy allows
+        if self.max_particles is None:
+            return count
+        count = min(count, self.max_particles)
+        excess = self.count + count - self.max_particles
+        if excess <= 0:
+            return count
+        if self.overflow_policy == OVERFLOW_DROP_NEWEST:
+            return count - excess
+        n = self.count
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            # Survivors are stored oldest-first, so the oldest are simply the leading slots
+            self._data[:, :n - excess] = self._data[:, excess:n]
+            self._rgb[:n - excess] = self._rgb[excess:n]
+            self.count = n - excess
+        else:
+            chunk = min(n, max(excess, int(self.max_particles * self.evict_fraction)))
+            keep = np.ones(n, dtype=bool)
+            keep[np.argpartition(self._data[_ALPHA, :n], chunk - 1)[:chunk]] = False
+            self._compact(keep)
+        self._order = None
+        return count
+
+    def _compact(self, keep):
+        n = self.count
+        kept = int(np.count_nonzero(keep))
+        self._data[:, :kept] = self._data[:, :n][:, keep]
+        self._rgb[:kept] = self._rgb[:n][keep]
+        self.count = kept
+
+    def _reserve(self, count):
+        # Returns the slice the next `count` particles will occupy, growing the arrays if needed
+        needed = self.count + count
+        if needed > self.capacity:
+            self._grow(max(needed, self.capacity * 2))
+        start = self.count
+        self.count = needed
+        return slice(start, needed)
+
+    def add_particle(self, particle_instance):
+        p = particle_instance
+        if not self._make_room(1):
+            return
+        i = self._reserve(1).start
+        self._data[:, i] = (p.x, p.y, p.vx, p.vy, p.size, p.color[3], p.lifespan, p.gravity, p.shrink_rate,
+                            p.fade_rate)
+        self._rgb[i] = p.color[:3]
+        self._max_size = max(self._max_size, p.size)
+
+    def emit(self, x, y, count, color, base_size, base_lifespan, velocity_x_range=(-1, 1), velocity_y_range=(-1, 1),
+             gravity=0, shrink_rate=0.05, fade_rate=5):
+        if count <= 0:
+            return
+        count = self._make_room(count)
+        if count <= 0:
+            return
+        alpha = min(255, max(0, int(color[3]))) if len(color) == 4 else 255
+        s = self._reserve(count)
+        d = self._data
+        d[_X, s] = x
+        d[_Y, s] = y
+        d[_VX, s] = self.rng.uniform(velocity_x_range[0], velocity_x_range[1], count)
+        d[_VY, s] = self.rng.uniform(velocity_y_range[0], velocity_y_range[1], count)
+        d[_SIZE, s] = self.rng.uniform(base_size * 0.7, base_size * 1.3, count)
+        d[_ALPHA, s] = alpha
+        if math.isinf(base_lifespan):
+            d[_LIFESPAN, s] = base_lifespan
+        else:
+            d[_LIFESPAN, s] = self.rng.uniform(base_lifespan * 0.8, base_lifespan * 1.2, count)
+        d[_GRAVITY, s] = gravity
+        d[_SHRINK, s] = shrink_rate
+        d[_FADE, s] = fade_rate
+        self._rgb[s] = color[:3]
+        self._max_size = max(self._max_size, base_size * 1.3)
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        d = self._data[:, :n]
+        d[_LIFESPAN] -= 1
+        alive = ~(d[_LIFESPAN] <= 0)  # Same test as Particle.update, so NaN lifespans (from inf * uniform) live on
+
+        d[_VY] += d[_GRAVITY]
+        d[_X] += d[_VX]
+        d[_Y] += d[_VY]
+        np.maximum(d[_SIZE] - d[_SHRINK], 0, out=d[_SIZE])
+        np.maximum(np.floor(d[_ALPHA] - d[_FADE]), 0, out=d[_ALPHA])
+
+        # Compact survivors to the front; order is preserved so older particles stay first
+        if not alive.all():
+            self._compact(alive)
+        self._index()
+
+    def _index(self):
+        n = self.count
+        self._max_size = float(self._data[_SIZE, :n].max()) if n else 0
+        if n < _BUCKET_MIN_PARTICLES:
+            self._order = None
+            return
+        keys = _bucket_keys(self._data[_X, :n], self._data[_Y, :n])
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+        self._indexed_count = n
+
+    def _candidates(self, left, top, right, bottom):
+        # Indices of particles in buckets overlapping the viewport, plus any emitted since the last update()
+        n = self.count
+        if self._order is None:
+            return np.arange(n)
+        bx0, bx1 = (int(v // BUCKET_SIZE) + _BUCKET_OFFSET for v in (left, right))
+        rows = np.arange(int(top // BUCKET_SIZE), int(bottom // BUCKET_SIZE) + 1) + _BUCKET_OFFSET
+        starts = np.searchsorted(self._sorted_keys, rows * _BUCKET_ROW + bx0, side="left")
+        ends = np.searchsorted(self._sorted_keys, rows * _BUCKET_ROW + bx1, side="right")
+        ranges = [self._order[a:b] for a, b in zip(starts.tolist(), ends.tolist()) if b > a]
+        ranges.append(np.arange(self._indexed_count, n))
+        return np.concatenate(ranges)
+
+    def draw(self, surface, camera_offset_x=0, camera_offset_y=0, return_rects=False):
+        n = self.count
+        if n == 0:
+            return [] if return_rects else None
+        left, top, right, bottom = _viewport(surface, camera_offset_x, camera_offset_y, self._max_size + 1)
+        idx = self._candidates(left, top, right, bottom)
+        px, py, size, alpha = self._data[_X, idx], self._data[_Y, idx], self._data[_SIZE, idx], self._data[_ALPHA, idx]
+        # int(size) must be at least 1 for pygame to draw anything
+        visible = (size >= 1) & (alpha > 0) & (px >= left) & (px <= right) & (py >= top) & (py <= bottom)
+        idx = idx[visible]
+        xs = (px[visible] - camera_offset_x).astype(np.int64).tolist()
+        ys = (py[visible] - camera_offset_y).astype(np.int64).tolist()
+        radii = size[visible].astype(np.int64).tolist()
+        # Quantize in bulk so the renderer's sprite keys can be built straight from the arrays
+        step = self.renderer.color_step
+        rgb = self._rgb[idx] // step * step
+        alpha_step = self.renderer.alpha_step
+        alphas = np.minimum(np.ceil(alpha[visible] / alpha_step) * alpha_step, 255).astype(np.uint8)
+        colors = map(tuple, np.column_stack((rgb, alphas)).tolist())
+        return self.renderer.draw(surface, xs, ys, radii, colors, return_rects)
+
+    def clear(self):
+        self.count = 0
+        self._order = None
+
+
+# The game modes only rely on emit/update/draw/clear, so they transparently get the
+# array-backed store whenever NumPy is installed.
+ParticleSystem = ArrayParticleSystem if np is not None else ListParticleSystem
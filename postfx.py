@@ -0,0 +1,60 @@
+import math
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class RowWave:
+    """Post-process stage that ghosts a sideways-rippled copy of the frame over itself.
+
+    The frame is cut into horizontal bands, band y shifted by sin(t * speed + y * frequency) * amplitude,
+    and the shifted bands are blended back at `alpha`. The shifted pixels go into a scratch surface that
+    is allocated once and reused: with numpy they are copied row-offset through pixels2d views of both
+    surfaces, otherwise with one opaque blit per band. Bands whose offset rounds to 0 would blend a pixel
+    with itself and are skipped, as are the columns a band was shifted away from.
+    """
+
+    def __init__(self, alpha=20, band_height=20, amplitude=6, speed=0.0025, frequency=0.07):
+        self.alpha = alpha
+        self.band_height = band_height
+        self.amplitude = amplitude
+        self.speed = speed
+        self.frequency = frequency
+        self.scratch = None
+
+    def _scratch_for(self, surface):
+        if self.scratch is None or self.scratch.get_size() != surface.get_size() \
+                or self.scratch.get_bitsize() != surface.get_bitsize():
+            self.scratch = pygame.Surface(surface.get_size(), 0, surface)
+        self.scratch.set_alpha(self.alpha)
+        return self.scratch
+
+    def offsets(self, height, t):
+        # (y, band height, x offset) for every band that moves
+        bands = []
+        for y in range(0, height, self.band_height):
+            offset = int(math.sin(t * self.speed + y * self.frequency) * self.amplitude)
+            if offset: bands.append((y, min(self.band_height, height - y), offset))
+        return bands
+
+    def apply(self, surface, t):
+        width, height = surface.get_size()
+        bands = [band for band in self.offsets(height, t) if abs(band[2]) < width]
+        if not bands: return
+        scratch = self._scratch_for(surface)
+        if np is not None and surface.get_bitsize() == 32:
+            src = pygame.surfarray.pixels2d(surface);
+            dst = pygame.surfarray.pixels2d(scratch)
+            for y, h, offset in bands:
+                if offset > 0: dst[offset:, y:y + h] = src[:-offset, y:y + h]
+                else: dst[:offset, y:y + h] = src[-offset:, y:y + h]
+            del src, dst  # Release the surface locks before blitting
+        else:
+            for y, h, offset in bands: scratch.blit(surface, (offset, y), (0, y, width, h))
+        for y, h, offset in bands:
+            area = pygame.Rect(max(offset, 0), y, width - abs(offset), h)
+            surface.blit(scratch, area, area)
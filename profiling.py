@@ -0,0 +1,178 @@
+import csv
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pygame
+
+PHASES = ("update", "collision", "particles", "draw", "flip")
+OVERLAY_HISTORY = 60  # Frames averaged by the on-screen overlay
+TOGGLE_KEY = pygame.K_F3
+DUMP_KEY = pygame.K_F4
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")  # Where F4 writes its CSVs
+
+OVERLAY_BG = (0, 0, 0, 170)
+OVERLAY_TEXT = (200, 255, 200)
+OVERLAY_PHASE_TEXT = (255, 230, 120)
+
+
+class NullProfiler:
+    """Profiler stand-in the games use by default; every hook is a no-op so disabled costs ~nothing."""
+    enabled = False
+
+    def begin(self):
+        pass
+
+    def lap(self, section):
+        pass
+
+    def end_frame(self):
+        pass
+
+    @contextmanager
+    def section(self, section):
+        yield
+
+    def draw_overlay(self, surface, counts=None):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """Collects per-frame wall time (ms) for named sections.
+
+    Code under test calls begin() where a timed stretch starts and lap(section) at the end of each
+    section; laps with the same name in one frame add up. Section names are "phase.detail"
+    (e.g. "update.player", "draw.ui") and roll up into their phase. end_frame() closes the frame so
+    every section gets one sample per frame (0.0 if it did not run). With a history length only the
+    most recent frames are kept.
+    """
+    enabled = True
+
+    def __init__(self, history=None):
+        self.history = history
+        self.sections = []
+        self.samples = {}
+        self.frame_totals = deque(maxlen=history)
+        self._current = {}
+        self._last = time.perf_counter()
+        self._font = None
+        self.last_dump = None  # Path of the latest F4 CSV, shown in the overlay
+
+    def begin(self):
+        self._last = time.perf_counter()
+
+    def lap(self, section):
+        now = time.perf_counter()
+        self._current[section] = self._current.get(section, 0.0) + (now - self._last) * 1000.0
+        self._last = now
+
+    @contextmanager
+    def section(self, section):
+        self.begin()
+        try:
+            yield
+        finally:
+            self.lap(section)
+
+    def end_frame(self):
+        for section in self._current:
+            if section not in self.samples:
+                self.sections.append(section)
+                self.samples[section] = deque([0.0] * len(self.frame_totals), maxlen=self.history)
+        for section in self.sections:
+            self.samples[section].append(self._current.get(section, 0.0))
+        self.frame_totals.append(sum(self._current.values()))
+        self._current = {}
+
+    def reset(self):
+        self.sections = []
+        self.samples = {}
+        self.frame_totals.clear()
+        self._current = {}
+
+    def phase_samples(self):
+        # Per-frame totals for each phase (the part of a section name before the first dot)
+        totals = {}
+        for section in self.sections:
+            phase = section.split(".", 1)[0]
+            values = self.samples[section]
+            if phase not in totals:
+                totals[phase] = list(values)
+            else:
+                totals[phase] = [a + b for a, b in zip(totals[phase], values)]
+        return totals
+
+    def summary(self, percentiles=(50, 90, 99)):
+        return {"phases": {phase: summarize(values, percentiles) for phase, values in self.phase_samples().items()},
+                "sections": {section: summarize(self.samples[section], percentiles) for section in self.sections},
+                "frame": summarize(self.frame_totals, percentiles)}
+
+    def rolling_ms(self):
+        # Mean ms per section over the kept history, in first-seen order
+        return [(section, sum(self.samples[section]) / max(1, len(self.samples[section])))
+                for section in self.sections]
+
+    def write_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + self.sections + ["total"])
+            columns = [self.samples[section] for section in self.sections] + [self.frame_totals]
+            for index, row in enumerate(zip(*columns)):
+                writer.writerow([index] + [f"{value:.4f}" for value in row])
+
+    def draw_overlay(self, surface, counts=None):
+        # counts is a callable returning {label: number}, only evaluated while the overlay is on
+        if self._font is None: self._font = pygame.font.Font(None, 18)
+        lines = [("frame", f"{sum(self.frame_totals) / max(1, len(self.frame_totals)):6.2f} ms", OVERLAY_PHASE_TEXT)]
+        for section, ms in self.rolling_ms():
+            lines.append((section, f"{ms:6.2f} ms", OVERLAY_TEXT))
+        if counts is not None:
+            for label, value in counts().items():
+                lines.append((label, str(value), OVERLAY_PHASE_TEXT))
+        if self.last_dump is not None: lines.append(("csv", self.last_dump, OVERLAY_PHASE_TEXT))
+        rendered = [(self._font.render(label, True, color), self._font.render(value, True, color))
+                    for label, value, color in lines]
+        label_w = max(label.get_width() for label, _ in rendered)
+        value_w = max(value.get_width() for _, value in rendered)
+        line_h = self._font.get_linesize()
+        panel = pygame.Surface((label_w + value_w + 18, line_h * len(rendered) + 8), pygame.SRCALPHA)
+        panel.fill(OVERLAY_BG)
+        for i, (label, value) in enumerate(rendered):
+            panel.blit(label, (4, 4 + i * line_h))
+            panel.blit(value, (panel.get_width() - 4 - value.get_width(), 4 + i * line_h))
+        surface.blit(panel, (surface.get_width() - panel.get_width() - 4, 4))
+
+
+def handle_profiler_keys(profiler, keydowns, out_dir=PROFILE_DIR):
+    # F3 switches between NULL_PROFILER and a rolling Profiler; F4 dumps the rolling window to a CSV in out_dir,
+    # whose path the overlay then shows
+    for key in keydowns:
+        if key == TOGGLE_KEY:
+            profiler = NULL_PROFILER if profiler.enabled else Profiler(history=OVERLAY_HISTORY)
+        elif key == DUMP_KEY and profiler.enabled:
+            os.makedirs(out_dir, exist_ok=True)
+            path = os.path.join(out_dir, time.strftime("profile_%Y%m%d_%H%M%S.csv"))
+            profiler.write_csv(path)
+            profiler.last_dump = path
+    return profiler
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values: return 0.0
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(values, percentiles=(50, 90, 99)):
+    ordered = sorted(values)
+    stats = {"count": len(ordered),
+             "mean": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+             "max": round(ordered[-1], 4) if ordered else 0.0}
+    for pct in percentiles:
+        stats[f"p{pct}"] = round(percentile(ordered, pct), 4)
+    return stats
@@ -0,0 +1,79 @@
+import math
+from collections import OrderedDict
+
+import pygame
+
+SPRITE_CACHE_CAPACITY = 1024  # Sprites kept before the least recently used ones are dropped
+ANGLE_BUCKETS = 64  # Rotated variants per full turn (~5.6 degrees apart)
+PHASE_BUCKETS = 8  # Steps for animations driven by a 0..1 pulse
+COLORKEY = (255, 0, 255)  # Transparent fill for sprites; never used as a drawing colour
+
+
+class SpriteCache:
+    """LRU cache of pre-rendered sprites.
+
+    get(key, render) returns the Surface stored under key, calling render() to rasterize it on a
+    miss. Keys are plain tuples (entity type, size, colour, angle/phase bucket, ...), so everything a
+    sprite depends on has to be in its key. Once capacity is reached the least recently used sprite
+    is evicted.
+    """
+
+    def __init__(self, capacity=SPRITE_CACHE_CAPACITY):
+        self.capacity = capacity
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, key, render):
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = render()
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.capacity: self.sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def blank_sprite(half_size):
+    # Square canvas whose centre pixel is (half_size, half_size). Sprites are drawn with opaque colours,
+    # so a colorkey with RLE acceleration blits faster than per-pixel alpha.
+    sprite = pygame.Surface((half_size * 2 + 1, half_size * 2 + 1))
+    sprite.fill(COLORKEY)
+    sprite.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return sprite
+
+
+def blit_centered(surface, sprite, x, y):
+    half_w = sprite.get_width() // 2;
+    half_h = sprite.get_height() // 2
+    if x + half_w < 0 or y + half_h < 0 or x - half_w > surface.get_width() or y - half_h > surface.get_height():
+        return  # Entirely off-screen
+    surface.blit(sprite, (x - half_w, y - half_h))
+
+
+def angle_bucket(angle, buckets=ANGLE_BUCKETS):
+    return int(round(angle / (math.pi * 2) * buckets)) % buckets
+
+
+def bucket_angle(bucket, buckets=ANGLE_BUCKETS):
+    return bucket * math.pi * 2 / buckets
+
+
+def phase_bucket(value, buckets=PHASE_BUCKETS):
+    # value in [0, 1]
+    return min(buckets - 1, int(value * buckets))
+
+
+def bucket_phase(bucket, buckets=PHASE_BUCKETS):
+    return (bucket + 0.5) / buckets
@@ -0,0 +1,90 @@
+import math
+import random
+
+import pygame
+
+TWINKLE_PHASES = 8  # Twinkle groups per star colour; each group is one palette entry
+TWINKLE_FRAMES = 8  # Pre-rendered steps of one twinkle cycle
+TWINKLE_FRAME_TICKS = 6  # Ticks per step, so a full twinkle takes ~1.6s at 30 FPS
+TWINKLE_DEPTH = 0.35  # Brightness swing: 1.0 - TWINKLE_DEPTH .. 1.0
+
+
+def _display_format_reference():
+    # Frames are converted to the screen's pixel format; headless runs have no display, so use plain 32-bit
+    return pygame.display.get_surface() or pygame.Surface((1, 1), 0, 32)
+
+
+class StarBand:
+    """One parallax layer of stars, pre-rendered into tileable surfaces.
+
+    The stars are drawn once into an 8-bit tile whose pixel values are palette indices (0 is
+    transparent, colour i in twinkle group g is 1 + i * TWINKLE_PHASES + g). Each twinkle frame is
+    that tile with a different palette, converted to the display format with an RLE colorkey: the
+    RLE data only covers the few star pixels, so a full-screen band costs a handful of cheap blits.
+    """
+
+    def __init__(self, tile_size, parallax, count, colors, sizes, frames, rng=random):
+        self.parallax = parallax
+        self.tile_size = tile_size
+        width, height = tile_size
+        tile = pygame.Surface(tile_size, 0, 8)
+        tile.set_palette([(0, 0, 0)] * 256)
+        tile.fill(0)
+        for _ in range(count):
+            x = rng.randint(0, width - 1);
+            y = rng.randint(0, height - 1)
+            index = 1 + rng.randrange(len(colors)) * TWINKLE_PHASES + rng.randrange(TWINKLE_PHASES)
+            size = rng.randint(sizes[0], sizes[1])
+            for ox in (-width, 0, width):  # Copies across the edges keep the tile seamless
+                for oy in (-height, 0, height):
+                    pygame.draw.circle(tile, index, (x + ox, y + oy), size)
+        reference = _display_format_reference()
+        primer = pygame.Surface((1, 1), 0, reference)
+        self.frames = []
+        for frame in range(frames):
+            tile.set_palette(twinkle_palette(colors, frame, frames))
+            converted = tile.convert(reference)
+            converted.set_colorkey(converted.map_rgb((0, 0, 0)), pygame.RLEACCEL)
+            primer.blit(converted, (0, 0))  # Encode the RLE now so the full-size pixel buffer is released
+            self.frames.append(converted)
+
+    def draw(self, surface, cam_x, cam_y, frame=0):
+        tile = self.frames[frame % len(self.frames)]
+        tile_w, tile_h = self.tile_size
+        start_x = -int(cam_x * self.parallax) % tile_w - tile_w
+        start_y = -int(cam_y * self.parallax) % tile_h - tile_h
+        width, height = surface.get_size()
+        for y in range(start_y, height, tile_h):
+            for x in range(start_x, width, tile_w):
+                surface.blit(tile, (x, y))
+
+
+def twinkle_palette(colors, frame, frames):
+    # Palette for one twinkle frame; group g is g / TWINKLE_PHASES of a cycle ahead of group 0
+    palette = [(0, 0, 0)]
+    for color in colors:
+        for group in range(TWINKLE_PHASES):
+            phase = math.pi * 2 * (frame / frames + group / TWINKLE_PHASES)
+            level = 1.0 - TWINKLE_DEPTH * (0.5 + 0.5 * math.sin(phase)) if frames > 1 else 1.0
+            palette.append((int(color[0] * level), int(color[1] * level), int(color[2] * level)))
+    return palette + [(0, 0, 0)] * (256 - len(palette))
+
+
+class Starfield:
+    """Parallax starfield drawn as a few scrolling tile blits per band instead of per-star circles.
+
+    bands is a sequence of (parallax factor, star count), far to near. update() advances the
+    twinkle animation; draw() scrolls each band by the camera offset times its parallax factor.
+    """
+
+    def __init__(self, tile_size, bands, colors, sizes=(1, 2), twinkle=True, rng=random):
+        frames = TWINKLE_FRAMES if twinkle else 1
+        self.bands = [StarBand(tile_size, parallax, count, colors, sizes, frames, rng) for parallax, count in bands]
+        self.ticks = 0
+
+    def update(self):
+        self.ticks += 1
+
+    def draw(self, surface, cam_x=0, cam_y=0):
+        frame = self.ticks // TWINKLE_FRAME_TICKS
+        for band in self.bands: band.draw(surface, cam_x, cam_y, frame)
@@ -4,6 +4,16 @@ import pygame
 import random
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from dirty_rects import DirtyRects
+from grid import OccupancyGrid, SnakeBody
+from layer_cache import grid_background
+from profiling import NULL_PROFILER, handle_profiler_keys
+from timestep import interpolate_cells, run_fixed_timestep
+
 # Attempt to import ParticleSystem
 try:
     from particles import Particle, ParticleSystem
@@ -20,16 +30,18 @@ except ImportError:
 
 
     class ParticleSystem:  # Placeholder
-        def __init__(self): self.particles = []
+        def __init__(self, *args, **kwargs): self.particles = []
 
         def emit(self, *args, **kwargs): pass
 
         def update(self): pass
 
-        def draw(self, *args, **kwargs): pass
+        def draw(self, *args, return_rects=False, **kwargs): return [] if return_rects else None
 
         def clear(self): pass
 
+        def __len__(self): return len(self.particles)
+
 # --- Constants ---
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -37,6 +49,8 @@ GRID_SIZE = 20
 GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
 FPS = 8  # Original FPS
+HUD_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, 130)  # Everything display_ui draws lies in this band
+FOOD_GLOW_MARGIN = 5  # Food glow reaches this far past its cell
 
 # Colors
 BLACK = (0, 0, 0)
@@ -61,91 +75,183 @@ LEFT = (-1, 0);
 RIGHT = (1, 0)
 SEGMENT_TYPES = ["RED", "BLUE", "GREEN"]
 FOOD_TYPES = ["RED_FOOD", "BLUE_FOOD", "GREEN_FOOD", "UNIVERSAL_FOOD"]
-
-
-class Segment:
-    def __init__(self, position, seg_type, is_head=False):
-        self.position = position
-        self.type = seg_type
-        self.is_head = is_head
-        self.happiness_max = 100
-        self.happiness = self.happiness_max * 0.75  # Start a bit happier
-        self.preferred_food_map = {"RED": "RED_FOOD", "BLUE": "BLUE_FOOD", "GREEN": "GREEN_FOOD"}
-        self.pulse_anim = random.uniform(0, math.pi * 2)  # For subtle pulsing based on happiness
-        self.pulse_speed = 0.1
-
-    def update_happiness(self, food_eaten=None, food_type_eaten=None):
-        decay_rate = 0.4  # Slightly less decay
-        if self.type == "GREEN" and self.happiness > self.happiness_max * 0.6: decay_rate = 0.2
-        self.happiness -= decay_rate
-        bonus_score_signal = False
-
-        if food_eaten and food_type_eaten:
-            gain = 0
+PREFERRED_FOOD = ["RED_FOOD", "BLUE_FOOD", "GREEN_FOOD"]  # Indexed like SEGMENT_TYPES
+SEGMENT_BASE_COLORS = [COLOR_RED_SEG_BASE, COLOR_BLUE_SEG_BASE, COLOR_GREEN_SEG_BASE]  # Indexed like SEGMENT_TYPES
+RED, BLUE, GREEN = range(3)
+HAPPINESS_MAX = 100
+SEGMENT_PULSE_SPEED = 0.1
+MOOD_BATCH_MIN = 32  # Below this many segments the per-segment loop beats gathering numpy arrays
+
+
+class HappinessModel:
+    """Mood of every segment of a Symbiotic snake, head first, in parallel lists.
+
+    kinds[i] indexes SEGMENT_TYPES, happiness[i] runs 0..HAPPINESS_MAX and pulses[i] is the phase of
+    the segment's glow. tick() applies one tick of decay, food boosts and pulse animation to every
+    segment at once (with numpy from MOOD_BATCH_MIN segments) and reports which segments fell apart.
+    It also recounts happy RED segments, unhappy segments and total happiness, which append() and
+    remove_at() keep current, so the speed modifier and HUD average are O(1). colors() computes
+    every segment's fill and outline once per change instead of on every draw.
+    """
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.kinds = []
+        self.happiness = []
+        self.pulses = []
+        self.happy_red = 0  # RED segments, head included, above 75% happiness
+        self.unhappy = 0  # Segments other than the head below 25% happiness
+        self.total = 0.0
+        self._colors = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def append(self, seg_type):
+        self.kinds.append(SEGMENT_TYPES.index(seg_type))
+        self.happiness.append(HAPPINESS_MAX * 0.75)  # Start a bit happier
+        self.pulses.append(self.rng.uniform(0, math.pi * 2))
+        self._tally(len(self.kinds) - 1, 1)
+        self._colors = None
+
+    def remove_at(self, index):
+        self._tally(index, -1)
+        del self.kinds[index], self.happiness[index], self.pulses[index]
+        self._colors = None
+
+    def truncate(self, length):
+        for index in range(len(self.kinds) - 1, length - 1, -1): self.remove_at(index)
+
+    def _tally(self, index, sign):
+        happiness = self.happiness[index]
+        if self.kinds[index] == RED and happiness > HAPPINESS_MAX * 0.75: self.happy_red += sign
+        if index and happiness < HAPPINESS_MAX * 0.25: self.unhappy += sign
+        self.total += happiness * sign
+
+    def refresh(self):
+        # Recount after editing the lists directly
+        self.happy_red = self.unhappy = 0
+        self.total = 0.0
+        for index in range(len(self.kinds)): self._tally(index, 1)
+        self._colors = None
+
+    def average(self):
+        return self.total / len(self.kinds) if self.kinds else 0.0
+
+    def tick(self, food_type_eaten=None):
+        """Decay every segment, boost them all if food was eaten and advance their pulses.
+
+        Returns (bonus, detached): bonus is True when a BLUE segment over half happy got its
+        preferred food; detached lists, in ascending order, the non-head segments now at 0.
+        """
+        if np is not None and len(self.kinds) >= MOOD_BATCH_MIN: return self._tick_batch(food_type_eaten)
+        bonus = False
+        preferred_kind = PREFERRED_FOOD.index(food_type_eaten) if food_type_eaten in PREFERRED_FOOD else None
+        happy_red = unhappy = 0
+        total = 0.0
+        detached = []
+        for i, kind in enumerate(self.kinds):
+            happiness = self.happiness[i]
+            happiness -= 0.2 if kind == GREEN and happiness > HAPPINESS_MAX * 0.6 else 0.4  # Content GREENs last
             if food_type_eaten == "UNIVERSAL_FOOD":
-                gain = 20  # Universal is good but not best
-            elif food_type_eaten == self.preferred_food_map.get(self.type):
-                gain = 45
-                if self.type == "BLUE" and self.happiness > self.happiness_max * 0.5:
-                    bonus_score_signal = True
-            else:
-                gain = 3  # Small gain even for non-preferred
-            self.happiness += gain
-        self.happiness = max(0, min(self.happiness, self.happiness_max))
-        return bonus_score_signal
-
-    def update_animation(self):
-        self.pulse_anim += self.pulse_speed * (self.happiness / self.happiness_max + 0.5)  # Pulse faster when happier
-        if self.pulse_anim > math.pi * 2: self.pulse_anim -= math.pi * 2
-
-    def get_color(self):
-        if self.is_head: return COLOR_HEAD
-
-        base_color_map = {
-            "RED": COLOR_RED_SEG_BASE, "BLUE": COLOR_BLUE_SEG_BASE, "GREEN": COLOR_GREEN_SEG_BASE
-        }
-        base_color = list(base_color_map.get(self.type, (100, 100, 100)))
-
-        # Intensity based on happiness
-        intensity_factor = 0.4 + 0.6 * (self.happiness / self.happiness_max)
-        # Pulsing brightness based on animation
-        pulse_factor = 0.9 + abs(math.sin(self.pulse_anim)) * 0.1  # Subtle pulse
-
-        final_intensity = intensity_factor * pulse_factor
-        return tuple(int(c * final_intensity) for c in base_color)
+                happiness += 20  # Universal is good but not best
+            elif kind == preferred_kind:
+                if kind == BLUE and happiness > HAPPINESS_MAX * 0.5: bonus = True
+                happiness += 45
+            elif food_type_eaten:
+                happiness += 3  # Small gain even for non-preferred
+            happiness = max(0, min(happiness, HAPPINESS_MAX))
+            self.happiness[i] = happiness
+            pulse = self.pulses[i] + SEGMENT_PULSE_SPEED * (happiness / HAPPINESS_MAX + 0.5)  # Faster when happier
+            if pulse > math.pi * 2: pulse -= math.pi * 2
+            self.pulses[i] = pulse
+            if kind == RED and happiness > HAPPINESS_MAX * 0.75: happy_red += 1
+            if i and happiness < HAPPINESS_MAX * 0.25:
+                unhappy += 1
+                if happiness <= 0: detached.append(i)
+            total += happiness
+        self.happy_red, self.unhappy, self.total = happy_red, unhappy, total
+        self._colors = None
+        return bonus, detached
+
+    def _tick_batch(self, food_type_eaten):
+        kinds = np.array(self.kinds)
+        happiness = np.array(self.happiness, float)
+        happiness -= np.where((kinds == GREEN) & (happiness > HAPPINESS_MAX * 0.6), 0.2, 0.4)
+        bonus = False
+        if food_type_eaten == "UNIVERSAL_FOOD":
+            happiness += 20
+        elif food_type_eaten:
+            preferred = kinds == PREFERRED_FOOD.index(food_type_eaten)
+            bonus = food_type_eaten == "BLUE_FOOD" and bool((happiness[preferred] > HAPPINESS_MAX * 0.5).any())
+            happiness += np.where(preferred, 45, 3)
+        np.clip(happiness, 0, HAPPINESS_MAX, out=happiness)
+        pulses = np.array(self.pulses) + SEGMENT_PULSE_SPEED * (happiness / HAPPINESS_MAX + 0.5)
+        pulses[pulses > math.pi * 2] -= math.pi * 2
+        self.happiness = happiness.tolist()
+        self.pulses = pulses.tolist()
+        self.happy_red = int(np.count_nonzero((kinds == RED) & (happiness > HAPPINESS_MAX * 0.75)))
+        self.unhappy = int(np.count_nonzero(happiness[1:] < HAPPINESS_MAX * 0.25))
+        self.total = float(happiness.sum())
+        self._colors = None
+        return bonus, (np.flatnonzero(happiness[1:] <= 0) + 1).tolist()
+
+    def restless(self):
+        # Indices, ascending, of non-head segments over 85% or under 15% happy: the ones that give off particles
+        if np is not None and len(self.kinds) >= MOOD_BATCH_MIN:
+            happiness = np.array(self.happiness)
+            extreme = (happiness > HAPPINESS_MAX * 0.85) | (happiness < HAPPINESS_MAX * 0.15)
+            return (np.flatnonzero(extreme[1:]) + 1).tolist()
+        return [i for i in range(1, len(self.kinds))
+                if not HAPPINESS_MAX * 0.15 <= self.happiness[i] <= HAPPINESS_MAX * 0.85]
+
+    def colors(self):
+        # (fill, outline) per segment: the base colour dimmed by unhappiness and the pulse, outline at half
+        if self._colors is not None: return self._colors
+        if np is not None and len(self.kinds) >= MOOD_BATCH_MIN:
+            intensity = (0.4 + 0.6 * (np.array(self.happiness) / HAPPINESS_MAX)) * \
+                        (0.9 + np.abs(np.sin(np.array(self.pulses))) * 0.1)
+            fills = (np.array(SEGMENT_BASE_COLORS)[self.kinds] * intensity[:, None]).astype(int)
+            fills[0] = COLOR_HEAD
+            self._colors = list(zip(map(tuple, fills.tolist()), map(tuple, (fills // 2).tolist())))
+            return self._colors
+        fills = []
+        for kind, happiness, pulse in zip(self.kinds, self.happiness, self.pulses):
+            intensity = (0.4 + 0.6 * (happiness / HAPPINESS_MAX)) * (0.9 + abs(math.sin(pulse)) * 0.1)
+            fills.append(tuple(int(c * intensity) for c in SEGMENT_BASE_COLORS[kind]))
+        if fills: fills[0] = COLOR_HEAD
+        self._colors = [(fill, (fill[0] // 2, fill[1] // 2, fill[2] // 2)) for fill in fills]
+        return self._colors
 
 
 class Snake:
-    def __init__(self):
+    def __init__(self, rng=random):
+        self.rng = rng
         self.initial_pos = (GRID_WIDTH // 2, GRID_HEIGHT // 2)
-        first_seg_type = random.choice(SEGMENT_TYPES)
-        self.body = [Segment(self.initial_pos, first_seg_type, is_head=True)]
+        self.body = HappinessModel(self.rng)  # Segment moods, head first; segment i sits at positions[i]
+        self.body.append(self.rng.choice(SEGMENT_TYPES))
         # Add a couple more starting segments for immediate visual
         for i in range(1, 3):
-            self.body.append(Segment(self.initial_pos, random.choice(SEGMENT_TYPES)))
+            self.body.append(self.rng.choice(SEGMENT_TYPES))
+        self.positions = SnakeBody(GRID_WIDTH, GRID_HEIGHT, [self.initial_pos] * len(self.body))  # Cells, head first
 
-        self.direction = random.choice([UP, DOWN, LEFT, RIGHT])
+        self.direction = self.rng.choice([UP, DOWN, LEFT, RIGHT])
         self.grow_food_type_buffer = None
 
+    @property
+    def previous_positions(self):  # Before the last move, for drawing between ticks
+        return self.positions.previous()
+
     def move_and_update(self, food_eaten_this_tick=None, food_type_eaten=None):
         events = []  # For particle effects like detachment
-        old_positions = [seg.position for seg in self.body]
 
-        head = self.body[0]
-        head_x, head_y = head.position
+        head_x, head_y = self.positions[0]
         dir_x, dir_y = self.direction
         new_head_pos = ((head_x + dir_x) % GRID_WIDTH, (head_y + dir_y) % GRID_HEIGHT)
-        head.position = new_head_pos
+        # Every segment takes its leader's cell; a grown segment keeps the old tail cell
+        self.positions.advance(new_head_pos, grow=bool(self.grow_food_type_buffer))
 
-        total_bonus_score_signal = head.update_happiness(food_eaten_this_tick, food_type_eaten)
-        head.update_animation()
-
-        for i in range(1, len(self.body)):
-            segment = self.body[i]
-            segment.position = old_positions[i - 1]
-            if segment.update_happiness(food_eaten_this_tick, food_type_eaten):
-                total_bonus_score_signal = True
-            segment.update_animation()
+        total_bonus_score_signal, detached = self.body.tick(food_type_eaten if food_eaten_this_tick else None)
 
         if self.grow_food_type_buffer:
             new_seg_type = "RED"
@@ -156,76 +262,79 @@ class Snake:
             elif self.grow_food_type_buffer == "GREEN_FOOD":
                 new_seg_type = "GREEN"
             elif self.grow_food_type_buffer == "UNIVERSAL_FOOD":
-                new_seg_type = random.choice(SEGMENT_TYPES)
+                new_seg_type = self.rng.choice(SEGMENT_TYPES)
 
-            pos_for_new_segment = old_positions[
-                -1] if old_positions else self.initial_pos  # old_positions might be empty if snake is just head
-            self.body.append(Segment(pos_for_new_segment, new_seg_type))
+            self.body.append(new_seg_type)
             self.grow_food_type_buffer = None
 
-        detached_count = 0
-        for i in range(len(self.body) - 1, 0, -1):  # Iterate backwards, exclude head
-            if self.body[i].happiness <= 0:
-                seg_pos_pixels = (self.body[i].position[0] * GRID_SIZE + GRID_SIZE // 2,
-                                  self.body[i].position[1] * GRID_SIZE + GRID_SIZE // 2)
-                events.append({"type": "detach_poof", "pos": seg_pos_pixels, "color": self.body[i].get_color()})
-                self.body.pop(i)
-                detached_count += 1
+        colors = self.body.colors() if detached else None
+        for i in reversed(detached):  # Backwards so the remaining indices stay valid
+            seg_x, seg_y = self.positions.remove_at(i)
+            seg_pos_pixels = (seg_x * GRID_SIZE + GRID_SIZE // 2, seg_y * GRID_SIZE + GRID_SIZE // 2)
+            events.append({"type": "detach_poof", "pos": seg_pos_pixels, "color": colors[i][0]})
+            self.body.remove_at(i)
 
-        if head.happiness <= 0: return False, total_bonus_score_signal, detached_count, events
-        return True, total_bonus_score_signal, detached_count, events
+        if self.body.happiness[0] <= 0: return False, total_bonus_score_signal, len(detached), events
+        return True, total_bonus_score_signal, len(detached), events
 
     def set_grow_flag(self, food_type):
         self.grow_food_type_buffer = food_type
 
+    def set_body(self, seg_types, positions):
+        self.body = HappinessModel(self.rng)
+        for seg_type in seg_types: self.body.append(seg_type)
+        self.positions = SnakeBody(GRID_WIDTH, GRID_HEIGHT, positions)
+
+    def truncate(self, length):
+        self.body.truncate(length)
+        self.positions.truncate(length)
+
     def check_collision_self(self):
-        return self.body[0].position in [s.position for s in self.body[1:]]
+        return self.positions.count(self.positions[0]) > 1  # Another segment shares the head's cell
 
     def get_passive_speed_modifier(self):  # Speed modifier based on happy RED segments
         modifier = 1.0
-        happy_red_count = sum(1 for seg in self.body if seg.type == "RED" and seg.happiness > seg.happiness_max * 0.75)
-        if happy_red_count > 0: modifier += happy_red_count * 0.06  # Slightly more boost
-        # Unhappy segments could also slow down the snake
-        unhappy_any_count = sum(
-            1 for seg in self.body[1:] if seg.happiness < seg.happiness_max * 0.25)  # Exclude head for this
-        modifier -= unhappy_any_count * 0.03
+        if self.body.happy_red > 0: modifier += self.body.happy_red * 0.06  # Slightly more boost
+        # Unhappy segments (not counting the head) could also slow down the snake
+        modifier -= self.body.unhappy * 0.03
         return max(0.5, modifier)  # Ensure snake doesn't stop or reverse speed
 
-    def draw(self, surface):
-        for segment_obj in self.body:
-            rect = pygame.Rect(segment_obj.position[0] * GRID_SIZE, segment_obj.position[1] * GRID_SIZE, GRID_SIZE,
-                               GRID_SIZE)
-            pygame.draw.rect(surface, segment_obj.get_color(), rect, border_radius=3)  # Rounded rects
-            pygame.draw.rect(surface, tuple(c // 2 for c in segment_obj.get_color()[:3]), rect, 1,
-                             border_radius=3)  # Darker outline
+    def draw(self, surface, alpha=1.0):
+        positions = interpolate_cells(self.previous_positions, self.positions, alpha, GRID_WIDTH, GRID_HEIGHT)
+        for (color, outline_color), (x, y) in zip(self.body.colors(), positions):
+            rect = pygame.Rect(round(x * GRID_SIZE), round(y * GRID_SIZE), GRID_SIZE, GRID_SIZE)
+            pygame.draw.rect(surface, color, rect, border_radius=3)  # Rounded rects
+            pygame.draw.rect(surface, outline_color, rect, 1, border_radius=3)  # Darker outline
 
 
 class Food:
-    def __init__(self):
+    def __init__(self, rng=random):
+        self.rng = rng
         self.position = (0, 0)
-        self.type = random.choice(FOOD_TYPES)
+        self.type = self.rng.choice(FOOD_TYPES)
         self.color_map = {"RED_FOOD": COLOR_RED_FOOD, "BLUE_FOOD": COLOR_BLUE_FOOD,
                           "GREEN_FOOD": COLOR_GREEN_FOOD, "UNIVERSAL_FOOD": COLOR_UNIVERSAL_FOOD}
         self.color = self.color_map[self.type]
-        self.pulse_anim = random.uniform(0, math.pi * 2)
+        self.pulse_anim = self.rng.uniform(0, math.pi * 2)
         self.pulse_speed = 0.12
         self.base_radius = GRID_SIZE // 2 - 2
-        self.spawn_randomly([])
+        self.spawn_randomly(OccupancyGrid(GRID_WIDTH, GRID_HEIGHT))
 
     def spawn_randomly(self, snake_body_positions):
-        while True:
-            self.position = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            if self.position not in snake_body_positions: break
-        self.type = random.choice(FOOD_TYPES)
+        # snake_body_positions: OccupancyGrid or SnakeBody. Returns False, leaving the food in place, if no cell is free
+        position = snake_body_positions.random_free_cell(self.rng)
+        if position is None: return False
+        self.position = position
+        self.type = self.rng.choice(FOOD_TYPES)
         self.color = self.color_map[self.type]
-        self.pulse_anim = random.uniform(0, math.pi * 2)
+        self.pulse_anim = self.rng.uniform(0, math.pi * 2)
+        return True
 
     def update_animation(self):
         self.pulse_anim += self.pulse_speed
         if self.pulse_anim > math.pi * 2: self.pulse_anim -= math.pi * 2
 
     def draw(self, surface):
-        self.update_animation()
         center_x = self.position[0] * GRID_SIZE + GRID_SIZE // 2
         center_y = self.position[1] * GRID_SIZE + GRID_SIZE // 2
         current_radius_offset = math.sin(self.pulse_anim) * 2.5
@@ -242,11 +351,20 @@ class Food:
 
 
 class Game:
-    def __init__(self):
-        if not pygame.get_init(): pygame.init(); pygame.mixer.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Snake 2: Symbiotic Anarchy")
+    def __init__(self, seed=None, headless=False):
+        self.seed = seed
+        self.headless = headless
+        self.rng = random.Random(seed)
+        if not pygame.get_init():
+            pygame.init()
+            if not headless: pygame.mixer.init()  # No audio device is needed to run headless
+        if headless:  # Offscreen target, no window needed
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Snake 2: Symbiotic Anarchy")
         self.clock = pygame.time.Clock()
+        self.dirty = DirtyRects((SCREEN_WIDTH, SCREEN_HEIGHT))
         try:
             self.font = pygame.font.SysFont("Consolas", 24)
             self.small_font = pygame.font.SysFont("Consolas", 18)
@@ -254,13 +372,14 @@ class Game:
             self.font = pygame.font.Font(None, 30);
             self.small_font = pygame.font.Font(None, 24)
 
-        self.particle_system = ParticleSystem()
+        self.particle_system = ParticleSystem(rng=self.rng)
+        self.profiler = NULL_PROFILER
         self.reset_game()
 
     def reset_game(self):
-        self.snake = Snake()
-        self.food = Food()
-        self.food.spawn_randomly([seg.position for seg in self.snake.body])
+        self.snake = Snake(self.rng)
+        self.food = Food(self.rng)
+        self.food.spawn_randomly(self.snake.positions)
         self.score = 0
         self.game_over_flag = False;
         self.paused = False;
@@ -271,10 +390,10 @@ class Game:
         score_text = self.font.render(f"Score: {self.score}", True, WHITE)
         self.screen.blit(score_text, (10, 10))
         if self.snake.body:
-            avg_happiness = sum(s.happiness for s in self.snake.body) / len(self.snake.body)
+            avg_happiness = self.snake.body.average()
             avg_happy_text = self.small_font.render(f"Avg Happiness: {avg_happiness:.1f}%", True, WHITE)
             self.screen.blit(avg_happy_text, (10, 40))
-            head_happy_text = self.small_font.render(f"Head Happiness: {self.snake.body[0].happiness:.1f}%", True,
+            head_happy_text = self.small_font.render(f"Head Happiness: {self.snake.body.happiness[0]:.1f}%", True,
                                                      WHITE)
             self.screen.blit(head_happy_text, (10, 70))
         # Display current speed modifier
@@ -292,135 +411,144 @@ class Game:
         self.screen.blit(reason_text, (SCREEN_WIDTH // 2 - reason_text.get_width() // 2, SCREEN_HEIGHT // 3 + 20))
         self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 3 + 70))
         self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 3 + 120))
-        pygame.display.flip()
-        waiting = True
-        while waiting:
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT: pygame.event.post(pygame.event.Event(pygame.QUIT)); return
-                if ev.type == pygame.KEYDOWN:
-                    if ev.key == pygame.K_q: self.game_over_flag = True; waiting = False
-                    if ev.key == pygame.K_r: self.reset_game(); waiting = False
-            self.clock.tick(FPS)
 
-    def run(self):
-        running = True
-        while running:
-            food_eaten_this_tick = False
-            food_type_eaten_this_tick = None
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: running = False
-                if event.type == pygame.KEYDOWN:
-                    if self.game_over_flag:
-                        if event.key == pygame.K_r:
-                            self.reset_game()
-                        elif event.key == pygame.K_q:
-                            running = False
-                        continue
-                    if event.key == pygame.K_p: self.paused = not self.paused
-                    if self.paused: continue
-                    if event.key == pygame.K_UP and self.snake.direction != DOWN:
-                        self.snake.direction = UP
-                    elif event.key == pygame.K_DOWN and self.snake.direction != UP:
-                        self.snake.direction = DOWN
-                    elif event.key == pygame.K_LEFT and self.snake.direction != RIGHT:
-                        self.snake.direction = LEFT
-                    elif event.key == pygame.K_RIGHT and self.snake.direction != LEFT:
-                        self.snake.direction = RIGHT
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False
-
-            if not running: break
+    def step(self, inputs):
+        # Advances the simulation by one tick. Returns False when the player leaves for the menu.
+        if inputs.quit: return False
+        self.profiler = handle_profiler_keys(self.profiler, inputs.keydowns)
+        food_eaten_this_tick = False
+        food_type_eaten_this_tick = None
+        for key in inputs.keydowns:
             if self.game_over_flag:
-                self.game_over_screen()
-                if self.game_over_flag: running = False; break  # If Q pressed in game_over
-                continue  # If R pressed, loop continues
-
-            if self.paused:
-                pause_text = self.font.render("PAUSED", True, COLOR_UNIVERSAL_FOOD)
-                self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
-                                              SCREEN_HEIGHT // 2 - pause_text.get_height() // 2))
-                pygame.display.flip();
-                self.clock.tick(FPS);
-                continue
-
-            # Food eaten check
-            if self.snake.body and self.snake.body[0].position == self.food.position:  # Check if snake body exists
-                food_eaten_this_tick = True
-                food_type_eaten_this_tick = self.food.type
-                self.snake.set_grow_flag(self.food.type)
-                self.score += 10
-                # Food eat particles
-                food_center_x = self.food.position[0] * GRID_SIZE + GRID_SIZE // 2
-                food_center_y = self.food.position[1] * GRID_SIZE + GRID_SIZE // 2
-                p_color = list(self.food.color)
-                if len(p_color) == 3:
-                    p_color.append(200)
-                else:
-                    p_color[3] = 200
-                self.particle_system.emit(food_center_x, food_center_y, 15, p_color, 4, 15,
-                                          velocity_x_range=(-1.5, 1.5), velocity_y_range=(-1.5, 1.5), gravity=0.05)
-                self.food.spawn_randomly([seg.position for seg in self.snake.body])
-
-            if not self.snake.body:  # If snake somehow became empty (shouldn't happen if head death is game over)
-                self.game_over_flag = True;
-                self.game_over_reason = "Snake vanished entirely!";
+                if key == pygame.K_r:
+                    self.reset_game()
+                elif key == pygame.K_q:
+                    return False
                 continue
-
-            snake_alive, bonus_score_signal, detached_segments, snake_events = self.snake.move_and_update(
-                food_eaten_this_tick, food_type_eaten_this_tick)
-            if bonus_score_signal: self.score += 20
-            if detached_segments > 0: self.score = max(0, self.score - detached_segments * 5)
-
-            # Process snake events for particles
-            for event_data in snake_events:
-                if event_data["type"] == "detach_poof":
-                    base_poof_color = event_data["color"][:3]  # Get RGB from segment
-                    mixed_color = tuple((base_poof_color[i] + DETACH_POOF_BASE_COLOR[i]) // 2 for i in range(3))
-                    self.particle_system.emit(
-                        event_data["pos"][0], event_data["pos"][1],
-                        count=25, color=mixed_color + (180,), base_size=5, base_lifespan=25,
-                        velocity_x_range=(-2, 2), velocity_y_range=(-2, 2), gravity=0.02,
-                        shrink_rate=0.2, fade_rate=8
-                    )
-
-            # Happiness/Unhappiness particles for segments
-            for seg in self.snake.body:
-                if seg.is_head: continue
-                center_x = seg.position[0] * GRID_SIZE + GRID_SIZE // 2
-                center_y = seg.position[1] * GRID_SIZE + GRID_SIZE // 2
-
-                if seg.happiness > seg.happiness_max * 0.85 and random.random() < 0.15:  # Very happy, more particles
-                    self.particle_system.emit(center_x, center_y, 1, seg.get_color()[:3] + (80,),
-                                              random.uniform(1.5, 2.5), 8, velocity_y_range=(-0.6, -0.2),
-                                              shrink_rate=0.15, fade_rate=12)
-                elif seg.happiness < seg.happiness_max * 0.15 and random.random() < 0.2:  # Very unhappy, smoky
-                    self.particle_system.emit(center_x, center_y, 1, UNHAPPY_SMOKE_COLOR,
-                                              random.uniform(2, 4), 20, velocity_y_range=(0.05, 0.2),
-                                              shrink_rate=0.05, fade_rate=5)
-
-            if not snake_alive: self.game_over_flag = True; self.game_over_reason = "Head segment perished from unhappiness!"
-            if self.snake.check_collision_self(): self.game_over_flag = True; self.game_over_reason = "Snake collided with itself!"
-            if not self.snake.body and not self.game_over_flag:  # Should be caught by head death first
+            if key == pygame.K_p: self.paused = not self.paused
+            if self.paused: continue
+            if key == pygame.K_UP and self.snake.direction != DOWN:
+                self.snake.direction = UP
+            elif key == pygame.K_DOWN and self.snake.direction != UP:
+                self.snake.direction = DOWN
+            elif key == pygame.K_LEFT and self.snake.direction != RIGHT:
+                self.snake.direction = LEFT
+            elif key == pygame.K_RIGHT and self.snake.direction != LEFT:
+                self.snake.direction = RIGHT
+            elif key == pygame.K_ESCAPE:
+                return False
+
+        if self.game_over_flag or self.paused: return True
+
+        self.profiler.begin()
+        # Food eaten check
+        if self.snake.body and self.snake.positions[0] == self.food.position:  # Check if snake body exists
+            food_eaten_this_tick = True
+            food_type_eaten_this_tick = self.food.type
+            self.snake.set_grow_flag(self.food.type)
+            self.score += 10
+            # Food eat particles
+            food_center_x = self.food.position[0] * GRID_SIZE + GRID_SIZE // 2
+            food_center_y = self.food.position[1] * GRID_SIZE + GRID_SIZE // 2
+            p_color = list(self.food.color)
+            if len(p_color) == 3:
+                p_color.append(200)
+            else:
+                p_color[3] = 200
+            self.particle_system.emit(food_center_x, food_center_y, 15, p_color, 4, 15,
+                                      velocity_x_range=(-1.5, 1.5), velocity_y_range=(-1.5, 1.5), gravity=0.05)
+            if not self.food.spawn_randomly(self.snake.positions):
                 self.game_over_flag = True;
-                self.game_over_reason = "Snake completely disbanded!"
-
-            self.particle_system.update()
+                self.game_over_reason = "The board is full!"
+        self.profiler.lap("collision.food")
+
+        if not self.snake.body:  # If snake somehow became empty (shouldn't happen if head death is game over)
+            self.game_over_flag = True;
+            self.game_over_reason = "Snake vanished entirely!";
+            return True
+
+        snake_alive, bonus_score_signal, detached_segments, snake_events = self.snake.move_and_update(
+            food_eaten_this_tick, food_type_eaten_this_tick)
+        if bonus_score_signal: self.score += 20
+        if detached_segments > 0: self.score = max(0, self.score - detached_segments * 5)
+        self.profiler.lap("update.snake")
+
+        # Process snake events for particles
+        for event_data in snake_events:
+            if event_data["type"] == "detach_poof":
+                base_poof_color = event_data["color"][:3]  # Get RGB from segment
+                mixed_color = tuple((base_poof_color[i] + DETACH_POOF_BASE_COLOR[i]) // 2 for i in range(3))
+                self.particle_system.emit(
+                    event_data["pos"][0], event_data["pos"][1],
+                    count=25, color=mixed_color + (180,), base_size=5, base_lifespan=25,
+                    velocity_x_range=(-2, 2), velocity_y_range=(-2, 2), gravity=0.02,
+                    shrink_rate=0.2, fade_rate=8
+                )
+
+        # Happiness/Unhappiness particles for segments
+        mood = self.snake.body
+        for i in mood.restless():  # Content segments neither sparkle nor smoke
+            happiness = mood.happiness[i]
+            seg_x, seg_y = self.snake.positions[i]
+            center_x = seg_x * GRID_SIZE + GRID_SIZE // 2
+            center_y = seg_y * GRID_SIZE + GRID_SIZE // 2
+
+            if happiness > HAPPINESS_MAX * 0.85 and self.rng.random() < 0.15:  # Very happy, more particles
+                self.particle_system.emit(center_x, center_y, 1, mood.colors()[i][0] + (80,),
+                                          self.rng.uniform(1.5, 2.5), 8, velocity_y_range=(-0.6, -0.2),
+                                          shrink_rate=0.15, fade_rate=12)
+            elif happiness < HAPPINESS_MAX * 0.15 and self.rng.random() < 0.2:  # Very unhappy, smoky
+                self.particle_system.emit(center_x, center_y, 1, UNHAPPY_SMOKE_COLOR,
+                                          self.rng.uniform(2, 4), 20, velocity_y_range=(0.05, 0.2),
+                                          shrink_rate=0.05, fade_rate=5)
+        self.profiler.lap("update.mood_particles")
+
+        if not snake_alive: self.game_over_flag = True; self.game_over_reason = "Head segment perished from unhappiness!"
+        if self.snake.check_collision_self(): self.game_over_flag = True; self.game_over_reason = "Snake collided with itself!"
+        if not self.snake.body and not self.game_over_flag:  # Should be caught by head death first
+            self.game_over_flag = True;
+            self.game_over_reason = "Snake completely disbanded!"
+        self.profiler.lap("collision.self")
+
+        self.particle_system.update()
+        self.food.update_animation()  # Advanced per tick rather than per drawn frame
+        self.profiler.lap("particles.update")
+        return True
+
+    def render(self, alpha=1.0):
+        if self.game_over_flag:
+            self.game_over_screen()
+            self.dirty.invalidate()
+            return
+        if self.paused:
+            pause_text = self.font.render("PAUSED", True, COLOR_UNIVERSAL_FOOD)
+            self.dirty.mark(self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
+                                                          SCREEN_HEIGHT // 2 - pause_text.get_height() // 2)))
+            return
+
+        self.profiler.begin()
+        # Subtle background pattern: faint lines every other cell, built once
+        self.screen.blit(grid_background(self.screen.get_size(), BLACK, GRID_SIZE * 2, (20, 20, 20, 100)), (0, 0))
+        self.profiler.lap("draw.background")
+
+        self.dirty.mark_rects(self.particle_system.draw(self.screen, return_rects=True))
+        self.profiler.lap("draw.particles")
+        self.food.draw(self.screen)
+        if self.snake.body: self.snake.draw(self.screen, alpha)  # Check if snake body exists before drawing
+        # Everything else is static. The whole body is marked, not just head and tail: segments slide between
+        # ticks, and each segment's mood colour moves with it and pulses every tick
+        self.dirty.mark_cells([self.food.position], GRID_SIZE, FOOD_GLOW_MARGIN)
+        self.dirty.mark_cells(self.snake.positions, GRID_SIZE)
+        self.dirty.mark_cells(self.snake.previous_positions, GRID_SIZE)
+        self.profiler.lap("draw.entities")
+
+        self.display_ui()
+        self.dirty.mark(HUD_RECT)
+        self.profiler.lap("draw.ui")
+
+    def debug_counts(self):
+        return {"particles": len(self.particle_system), "segments": len(self.snake.body)}
 
-            self.screen.fill(BLACK)
-            # Optional subtle background pattern
-            bg_pattern_surf = pygame.Surface((GRID_SIZE * 2, GRID_SIZE * 2), pygame.SRCALPHA)
-            pygame.draw.line(bg_pattern_surf, (20, 20, 20, 100), (0, GRID_SIZE), (GRID_SIZE * 2, GRID_SIZE))
-            pygame.draw.line(bg_pattern_surf, (20, 20, 20, 100), (GRID_SIZE, 0), (GRID_SIZE, GRID_SIZE * 2))
-            for x_bg in range(-GRID_SIZE, SCREEN_WIDTH, GRID_SIZE * 2):
-                for y_bg in range(-GRID_SIZE, SCREEN_HEIGHT, GRID_SIZE * 2):
-                    self.screen.blit(bg_pattern_surf, (x_bg, y_bg))
-
-            self.particle_system.draw(self.screen)
-            self.food.draw(self.screen)
-            if self.snake.body: self.snake.draw(self.screen)  # Check if snake body exists before drawing
-
-            self.display_ui()
-            pygame.display.flip()
-
-            current_fps = FPS * self.snake.get_passive_speed_modifier()
-            self.clock.tick(current_fps)
\ No newline at end of file
+    def run(self):
+        # Happy RED segments speed the simulation up, so the tick rate is re-read every tick
+        run_fixed_timestep(self, lambda: FPS * self.snake.get_passive_speed_modifier())
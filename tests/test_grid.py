@@ -0,0 +1,156 @@
+import random
+from collections import Counter
+
+import pytest
+
+from grid import FreeCellIndex, OccupancyGrid, SnakeBody
+
+
+def check_free_index(free, size):
+    # cells and slots must describe the same set, each free cell pointing at its own slot
+    assert sorted(free.cells) == sorted(set(free.cells))
+    for slot, index in enumerate(free.cells): assert free.slots[index] == slot
+    taken = [index for index in range(size) if free.slots[index] < 0]
+    assert len(taken) + len(free) == size
+
+
+def check_occupancy(grid, cells):
+    counts = Counter(cells)
+    for index in range(grid.width * grid.height):
+        cell = (index % grid.width, index // grid.width)
+        assert grid.count(cell) == counts[cell]
+        assert (grid.free.slots[index] >= 0) == (counts[cell] == 0)
+    check_free_index(grid.free, grid.width * grid.height)
+
+
+def test_take_swaps_last_free_cell_into_the_vacated_slot():
+    free = FreeCellIndex(5)
+    free.take(1)
+    assert free.cells == [0, 4, 2, 3]
+    assert free.slots[4] == 1 and free.slots[1] == -1
+    free.take(3)  # Already the last slot, nothing to swap
+    assert free.cells == [0, 4, 2]
+    check_free_index(free, 5)
+
+
+def test_take_and_release_are_idempotent():
+    free = FreeCellIndex(4)
+    free.take(2)
+    free.take(2)
+    assert len(free) == 3
+    free.release(2)
+    free.release(2)
+    free.release(0)  # Never taken
+    assert len(free) == 4
+    check_free_index(free, 4)
+
+
+def test_free_index_stays_consistent_under_random_churn():
+    rng = random.Random(7)
+    free = FreeCellIndex(50)
+    for _ in range(2000):
+        index = rng.randrange(50)
+        free.take(index) if rng.random() < 0.5 else free.release(index)
+        check_free_index(free, 50)
+    copy = free.copy()
+    copy.take(copy.cells[0])
+    assert len(copy) == len(free) - 1
+
+
+def test_sample_only_returns_free_cells():
+    rng = random.Random(1)
+    free = FreeCellIndex(10)
+    for index in range(9): free.take(index)
+    assert {free.sample(rng) for _ in range(20)} == {9}
+    free.take(9)
+    assert free.sample(rng) is None
+
+
+def test_occupancy_counts_stacked_cells():
+    grid = OccupancyGrid(3, 2, [(0, 0), (0, 0), (2, 1)])
+    assert grid.count((0, 0)) == 2 and (2, 1) in grid and (1, 1) not in grid
+    grid.remove((0, 0))
+    assert (0, 0) in grid
+    grid.remove((0, 0))
+    assert (0, 0) not in grid
+    check_occupancy(grid, [(2, 1)])
+
+
+def test_random_free_cell_is_none_on_a_full_board():
+    rng = random.Random(3)
+    cells = [(x, y) for y in range(3) for x in range(4)]
+    grid = OccupancyGrid(4, 3, cells[:-1])
+    assert grid.random_free_cell(rng) == cells[-1]
+    grid.add(cells[-1])
+    assert grid.random_free_cell(rng) is None
+    body = SnakeBody(4, 3, cells)
+    assert body.random_free_cell(rng) is None
+    grid.clear()
+    assert grid.random_free_cell(rng) is not None
+
+
+def test_a_cell_holds_at_most_255_occupants():
+    grid = OccupancyGrid(2, 2, [(1, 1)] * 255)
+    assert grid.count((1, 1)) == 255
+    with pytest.raises(ValueError):
+        grid.add((1, 1))
+
+
+def test_previous_is_the_body_before_the_last_advance():
+    body = SnakeBody(10, 10, [(3, 0), (2, 0), (1, 0)])
+    assert body.previous() == [(3, 0), (2, 0), (1, 0)]  # No advance yet
+    assert body.advance((4, 0)) == (1, 0)
+    assert list(body) == [(4, 0), (3, 0), (2, 0)]
+    assert body.previous() == [(3, 0), (2, 0), (1, 0)]
+    check_occupancy(body.occupancy, body)
+
+
+def test_previous_after_a_grow_has_no_entry_for_the_new_segment():
+    body = SnakeBody(10, 10, [(3, 0), (2, 0), (1, 0)])
+    assert body.advance((4, 0), grow=True) is None
+    assert list(body) == [(4, 0), (3, 0), (2, 0), (1, 0)]
+    assert body.previous() == [(3, 0), (2, 0), (1, 0)]
+    check_occupancy(body.occupancy, body)
+
+
+def test_remove_at_drops_the_segment_from_both_bodies():
+    body = SnakeBody(10, 10, [(3, 0), (2, 0), (1, 0), (0, 0)])
+    body.advance((4, 0))
+    assert body.remove_at(1) == (3, 0)
+    assert list(body) == [(4, 0), (2, 0), (1, 0)]
+    assert body.previous() == [(3, 0), (1, 0), (0, 0)]
+    assert (3, 0) not in body
+    body.remove_at(2)
+    assert body.previous() == [(3, 0), (1, 0)]
+    body.advance((5, 0))  # The next advance rebuilds previous() from the cells again
+    assert body.previous() == [(4, 0), (2, 0)]
+    check_occupancy(body.occupancy, body)
+
+
+def test_remove_at_a_grown_segment_leaves_previous_alone():
+    body = SnakeBody(10, 10, [(2, 0), (1, 0)])
+    body.advance((3, 0), grow=True)
+    body.remove_at(2)
+    assert list(body) == [(3, 0), (2, 0)]
+    assert body.previous() == [(2, 0), (1, 0)]
+
+
+def test_truncate_resets_previous_to_the_current_body():
+    body = SnakeBody(10, 10, [(3, 0), (2, 0), (1, 0), (0, 0)])
+    body.advance((4, 0))
+    body.truncate(2)
+    assert list(body) == [(4, 0), (3, 0)]
+    assert body.previous() == [(4, 0), (3, 0)]
+    check_occupancy(body.occupancy, body)
+
+
+def test_occupancy_follows_a_wandering_snake():
+    rng = random.Random(11)
+    body = SnakeBody(6, 5, [(0, 0)])
+    for _ in range(500):
+        x, y = body[0]
+        dx, dy = rng.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))
+        body.advance(((x + dx) % 6, (y + dy) % 5), grow=rng.random() < 0.05 and len(body) < 20)
+        if rng.random() < 0.02 and len(body) > 2: body.remove_at(rng.randrange(1, len(body)))
+        check_occupancy(body.occupancy, body)
+        assert len(body.previous()) <= len(body)
@@ -0,0 +1,143 @@
+import time
+from contextlib import contextmanager
+
+import pygame
+
+from collision import wrap_delta
+from headless import InputFrame, poll_input
+
+RENDER_FPS = 60  # Frame cap for drawing; the simulation keeps each mode's own tick rate
+MAX_FRAME_TIME = 0.25  # Longest frame fed to the accumulator; a longer stall is dropped, not fast-forwarded
+
+
+class FixedTimestep:
+    """Accumulator that decouples simulation ticks from render frames.
+
+    advance() adds the wall time since the previous call; due() then returns True once per whole tick
+    owed, so a slow frame runs several ticks instead of slowing the game down. alpha is how far the
+    clock is into the next tick (0..1), for drawing between the last two simulation states.
+    tick_rate is ticks per second, or a callable returning it for modes whose speed changes as they play.
+    """
+
+    def __init__(self, tick_rate, max_frame_time=MAX_FRAME_TIME, clock=time.perf_counter):
+        self.tick_rate = tick_rate
+        self.max_frame_time = max_frame_time
+        self.clock = clock
+        self.accumulator = 0.0
+        self._last = clock()
+
+    def tick_time(self):
+        rate = self.tick_rate() if callable(self.tick_rate) else self.tick_rate
+        return 1.0 / rate
+
+    def advance(self):
+        now = self.clock()
+        self.accumulator += min(now - self._last, self.max_frame_time)
+        self._last = now
+
+    def due(self):
+        tick_time = self.tick_time()
+        if self.accumulator < tick_time: return False
+        self.accumulator -= tick_time
+        return True
+
+    @property
+    def alpha(self):
+        return min(1.0, self.accumulator / self.tick_time())
+
+
+def run_fixed_timestep(game, tick_rate, render_fps=RENDER_FPS):
+    """Play a game window with a fixed simulation rate and interpolated drawing.
+
+    Input is polled every frame; key presses are queued until the next tick so each one reaches
+    step() exactly once. Closing the window is passed on at once. Returns when step() returns False.
+    """
+    timestep = FixedTimestep(tick_rate)
+    pending_keys = []
+    while True:
+        frame = poll_input()
+        pending_keys.extend(frame.keydowns)
+        if frame.quit:
+            game.step(frame)
+            return
+        timestep.advance()
+        while timestep.due():
+            if not game.step(InputFrame(pending_keys, frame.held)): return
+            pending_keys = []
+        game.render(timestep.alpha)
+        game.profiler.draw_overlay(game.screen, game.debug_counts)
+        game.profiler.begin()
+        dirty = getattr(game, "dirty", None)  # Modes that track their changed areas push only those
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            if game.profiler.enabled: dirty.invalidate()  # The overlay is drawn over the frame
+            dirty.present()
+        game.profiler.lap("flip")
+        game.profiler.end_frame()
+        game.clock.tick(render_fps)
+
+
+def lerp_wrapped(previous, current, alpha, size=None):
+    # alpha of the way from previous to current, the short way round if the axis wraps every size units
+    delta = current - previous
+    if size: delta = wrap_delta(delta, size)
+    return previous + delta * alpha
+
+
+def interpolate_cells(previous, current, alpha, grid_width, grid_height):
+    """Cell positions (as floats) of a grid body drawn alpha of the way from its previous tick.
+
+    Entry i slides from previous[i] to current[i] the short way round the wrapping grid. Entries with
+    no previous position (just grown) or that jumped more than one cell (detached, respawned) are
+    drawn where they are now.
+    """
+    if alpha >= 1.0: return list(current)
+    positions = []
+    for i, (x, y) in enumerate(current):
+        if i >= len(previous):
+            positions.append((x, y));
+            continue
+        dx = wrap_delta(x - previous[i][0], grid_width);
+        dy = wrap_delta(y - previous[i][1], grid_height)
+        if abs(dx) > 1 or abs(dy) > 1:
+            positions.append((x, y))
+        else:
+            positions.append((x - dx * (1 - alpha), y - dy * (1 - alpha)))
+    return positions
+
+
+class PositionHistory:
+    """Previous-tick positions of objects with x/y attributes, for drawing them between ticks.
+
+    record(objects) runs at the start of a tick. interpolated(alpha, objects) is a context manager
+    that moves every recorded object alpha of the way from its recorded position to its current one
+    for the duration of a draw, then puts the current positions back. Objects created since the
+    record are drawn where they are. Positions wrap like the world when its size is given.
+    """
+
+    def __init__(self, world_width=None, world_height=None):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.previous = {}
+
+    def record(self, objects):
+        self.previous = {obj: (obj.x, obj.y) for obj in objects}
+
+    @contextmanager
+    def interpolated(self, alpha, objects):
+        moved = []
+        if alpha < 1.0:
+            for obj in objects:
+                previous = self.previous.get(obj)
+                if previous is None: continue
+                current = (obj.x, obj.y)
+                moved.append((obj, current))
+                obj.x = lerp_wrapped(previous[0], current[0], alpha, self.world_width);
+                obj.y = lerp_wrapped(previous[1], current[1], alpha, self.world_height)
+        try:
+            yield
+        finally:
+            for obj, (x, y) in moved:
+                obj.x = x;
+                obj.y = y